@@ -1,13 +1,49 @@
 #include <pybind11/pybind11.h>
 #include <pybind11/stl.h>
 
+#include "bit_bfs.h"
 #include "flow_planner.h"
 
+#include <optional>
+
 namespace py = pybind11;
 
+namespace {
+
+// deadline_s: seconds from now (None = no budget). The caller's cancel_token
+// argument keeps the token alive for the duration of the call.
+StopCondition make_stop(const std::optional<double>& deadline_s, const std::shared_ptr<CancelToken>& cancel_token) {
+    StopCondition stop;
+    if (deadline_s) {
+        stop = StopCondition::after_seconds(*deadline_s);
+    }
+    stop.token = cancel_token.get();
+    return stop;
+}
+
+}  // namespace
+
 PYBIND11_MODULE(flow_planner_cpp, m) {
     m.doc() = "Time-expanded max-flow planner bindings";
 
+    py::class_<CancelToken, std::shared_ptr<CancelToken>>(m, "CancelToken")
+        .def(py::init<>())
+        .def("cancel", &CancelToken::cancel)
+        .def_property_readonly("cancelled", &CancelToken::cancelled);
+
+    py::class_<BitGrid>(m, "BitGrid")
+        .def(py::init<const std::vector<std::vector<int>>&>(), py::arg("grid"))
+        .def_property_readonly("width", &BitGrid::width)
+        .def_property_readonly("height", &BitGrid::height)
+        .def("distances", [](const BitGrid& bits, const std::vector<std::pair<int, int>>& sources) {
+            std::vector<int> dist;
+            {
+                py::gil_scoped_release release;
+                dist = bits.distances(sources);
+            }
+            return dist;
+        }, py::arg("sources"));
+
     m.def("plan_flow", [](const std::vector<std::vector<int>>& grid,
                            const std::vector<std::pair<int, int>>& starts,
                            const std::vector<std::pair<int, int>>& targets,
@@ -15,19 +51,34 @@ PYBIND11_MODULE(flow_planner_cpp, m) {
                            int T,
                            const std::vector<std::tuple<int, int, int>>& reserved,
                            const std::vector<std::tuple<int, int, int, int, int>>& reserved_edges,
-                           const std::string& method) {
+                           const std::string& method,
+                           bool compact,
+                           std::optional<double> deadline_s,
+                           std::shared_ptr<CancelToken> cancel_token) {
+        StopCondition stop = make_stop(deadline_s, cancel_token);
         PlanResult result;
         {
             py::gil_scoped_release release;
             result = plan_flow_with_method(
-                grid, starts, targets, target_caps, T, reserved, reserved_edges, method);
+                grid, starts, targets, target_caps, T, reserved, reserved_edges, method, compact, stop);
         }
         py::dict out;
         out["feasible"] = result.feasible;
         out["paths"] = result.paths;
+        out["num_nodes"] = result.num_nodes;
+        out["num_arcs"] = result.num_arcs;
+        out["flow"] = result.flow_value;
+        out["timed_out"] = result.timed_out;
+        out["cancelled"] = result.cancelled;
         return out;
-    }, py::arg("grid"), py::arg("starts"), py::arg("targets"), py::arg("target_caps"), py::arg("T"),
-       py::arg("reserved"), py::arg("reserved_edges"), py::arg("method") = "dinic");
+    },
+       "Plan robots from starts to targets in T steps by max-flow.\n\n"
+       "With compact=False robots leave the network on reaching a target, up to target_caps[i] per target.\n"
+       "With compact=True they park on the target until T, so each target holds one robot and caps above 1\n"
+       "raise ValueError.",
+       py::arg("grid"), py::arg("starts"), py::arg("targets"), py::arg("target_caps"), py::arg("T"),
+       py::arg("reserved"), py::arg("reserved_edges"), py::arg("method") = "dinic", py::arg("compact") = false,
+       py::arg("deadline_s") = py::none(), py::arg("cancel_token") = nullptr);
 
     m.def("plan_flow_rot", [](const std::vector<std::vector<int>>& grid,
                                const std::vector<std::pair<int, int>>& starts,
@@ -37,20 +88,29 @@ PYBIND11_MODULE(flow_planner_cpp, m) {
                                int T,
                                const std::vector<std::tuple<int, int, int>>& reserved,
                                const std::vector<std::tuple<int, int, int, int, int>>& reserved_edges,
-                               const std::string& method) {
+                               const std::string& method,
+                               std::optional<double> deadline_s,
+                               std::shared_ptr<CancelToken> cancel_token) {
+        StopCondition stop = make_stop(deadline_s, cancel_token);
         PlanResult result;
         {
             py::gil_scoped_release release;
             result = plan_flow_rot_with_method(
-                grid, starts, start_dirs, targets, target_caps, T, reserved, reserved_edges, method);
+                grid, starts, start_dirs, targets, target_caps, T, reserved, reserved_edges, method, stop);
         }
         py::dict out;
         out["feasible"] = result.feasible;
         out["paths"] = result.paths;
         out["path_dirs"] = result.path_dirs;
+        out["num_nodes"] = result.num_nodes;
+        out["num_arcs"] = result.num_arcs;
+        out["flow"] = result.flow_value;
+        out["timed_out"] = result.timed_out;
+        out["cancelled"] = result.cancelled;
         return out;
     }, py::arg("grid"), py::arg("starts"), py::arg("start_dirs"), py::arg("targets"), py::arg("target_caps"), py::arg("T"),
-       py::arg("reserved"), py::arg("reserved_edges"), py::arg("method") = "dinic");
+       py::arg("reserved"), py::arg("reserved_edges"), py::arg("method") = "dinic",
+       py::arg("deadline_s") = py::none(), py::arg("cancel_token") = nullptr);
 
     m.def("plan_flow_sync", [](const std::vector<std::vector<int>>& grid,
                                 const std::vector<std::pair<int, int>>& starts,
@@ -59,17 +119,25 @@ PYBIND11_MODULE(flow_planner_cpp, m) {
                                 const std::vector<int>& drop_caps,
                                 int T,
                                 int tau,
-                                const std::string& method) {
+                                const std::string& method,
+                                std::optional<double> deadline_s,
+                                std::shared_ptr<CancelToken> cancel_token) {
+        StopCondition stop = make_stop(deadline_s, cancel_token);
         PlanResult result;
         {
             py::gil_scoped_release release;
             result = plan_flow_sync_with_method(
-                grid, starts, pickups, drops, drop_caps, T, tau, method);
+                grid, starts, pickups, drops, drop_caps, T, tau, method, stop);
         }
         py::dict out;
         out["feasible"] = result.feasible;
         out["paths"] = result.paths;
+        out["num_nodes"] = result.num_nodes;
+        out["num_arcs"] = result.num_arcs;
+        out["flow"] = result.flow_value;
+        out["timed_out"] = result.timed_out;
+        out["cancelled"] = result.cancelled;
         return out;
     }, py::arg("grid"), py::arg("starts"), py::arg("pickups"), py::arg("drops"), py::arg("drop_caps"),
-       py::arg("T"), py::arg("tau"), py::arg("method") = "dinic");
+       py::arg("T"), py::arg("tau"), py::arg("method") = "dinic", py::arg("deadline_s") = py::none(), py::arg("cancel_token") = nullptr);
 }
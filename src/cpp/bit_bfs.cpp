@@ -0,0 +1,127 @@
+#include "bit_bfs.h"
+
+#include <algorithm>
+#include <stdexcept>
+#include <string>
+
+#if defined(_MSC_VER) && !defined(__clang__)
+#include <intrin.h>
+#endif
+
+namespace {
+
+int lowest_bit(uint64_t word) {
+#if defined(_MSC_VER) && !defined(__clang__)
+    unsigned long index;
+    _BitScanForward64(&index, word);
+    return static_cast<int>(index);
+#else
+    return __builtin_ctzll(word);
+#endif
+}
+
+std::string cell_str(int x, int y) {
+    return "(" + std::to_string(x) + ", " + std::to_string(y) + ")";
+}
+
+}  // namespace
+
+BitGrid::BitGrid(const std::vector<std::vector<int>>& grid)
+    : width_(0), height_(0), words_(0) {
+    height_ = static_cast<int>(grid.size());
+    width_ = height_ > 0 ? static_cast<int>(grid[0].size()) : 0;
+    words_ = (width_ + 63) / 64;
+    free_.assign(static_cast<size_t>(height_) * words_, 0);
+    for (int y = 0; y < height_; ++y) {
+        if (static_cast<int>(grid[y].size()) != width_) {
+            throw std::runtime_error("Grid rows must have equal width");
+        }
+        uint64_t* row = free_.data() + static_cast<size_t>(y) * words_;
+        for (int x = 0; x < width_; ++x) {
+            if (grid[y][x] == 0) {
+                row[x >> 6] |= uint64_t{1} << (x & 63);
+            }
+        }
+    }
+}
+
+std::vector<int> BitGrid::distances(const std::vector<std::pair<int, int>>& sources) const {
+    std::vector<int> dist(static_cast<size_t>(width_) * height_, -1);
+    std::vector<uint64_t> visited(free_.size(), 0);
+    std::vector<uint64_t> frontier(free_.size(), 0);
+    std::vector<uint64_t> next(free_.size(), 0);
+
+    // Rows [lo, hi] hold the current frontier; every other row is zero.
+    int lo = height_;
+    int hi = -1;
+    for (const auto& s : sources) {
+        int x = s.first;
+        int y = s.second;
+        if (x < 0 || y < 0 || x >= width_ || y >= height_) {
+            throw std::invalid_argument("Source out of bounds: " + cell_str(x, y));
+        }
+        size_t w = static_cast<size_t>(y) * words_ + (x >> 6);
+        uint64_t bit = uint64_t{1} << (x & 63);
+        if (!(free_[w] & bit)) {
+            throw std::invalid_argument("Source on blocked cell: " + cell_str(x, y));
+        }
+        if (visited[w] & bit) {
+            continue;
+        }
+        visited[w] |= bit;
+        frontier[w] |= bit;
+        dist[static_cast<size_t>(y) * width_ + x] = 0;
+        lo = std::min(lo, y);
+        hi = std::max(hi, y);
+    }
+
+    for (int d = 1; lo <= hi; ++d) {
+        int next_lo = height_;
+        int next_hi = -1;
+        int y_begin = std::max(0, lo - 1);
+        int y_end = std::min(height_ - 1, hi + 1);
+        for (int y = y_begin; y <= y_end; ++y) {
+            const uint64_t* cur = frontier.data() + static_cast<size_t>(y) * words_;
+            const uint64_t* up = y > 0 ? cur - words_ : nullptr;
+            const uint64_t* down = y + 1 < height_ ? cur + words_ : nullptr;
+            size_t base = static_cast<size_t>(y) * words_;
+            for (int k = 0; k < words_; ++k) {
+                uint64_t f = cur[k];
+                // Horizontal moves, carrying the edge bit across word boundaries;
+                // bits past the row end are cleared by the free mask.
+                uint64_t grow = (f << 1) | (f >> 1);
+                if (k > 0) {
+                    grow |= cur[k - 1] >> 63;
+                }
+                if (k + 1 < words_) {
+                    grow |= cur[k + 1] << 63;
+                }
+                if (up) {
+                    grow |= up[k];
+                }
+                if (down) {
+                    grow |= down[k];
+                }
+                uint64_t fresh = grow & free_[base + k] & ~visited[base + k];
+                next[base + k] = fresh;
+                if (!fresh) {
+                    continue;
+                }
+                visited[base + k] |= fresh;
+                next_lo = std::min(next_lo, y);
+                next_hi = std::max(next_hi, y);
+                int* row_dist = dist.data() + static_cast<size_t>(y) * width_ + k * 64;
+                while (fresh) {
+                    row_dist[lowest_bit(fresh)] = d;
+                    fresh &= fresh - 1;
+                }
+            }
+        }
+        std::fill(frontier.begin() + static_cast<size_t>(lo) * words_,
+                  frontier.begin() + static_cast<size_t>(hi + 1) * words_, 0);
+        frontier.swap(next);
+        lo = next_lo;
+        hi = next_hi;
+    }
+    return dist;
+}
@@ -0,0 +1,28 @@
+#pragma once
+
+#include <cstdint>
+#include <utility>
+#include <vector>
+
+// Multi-source 4-connected grid BFS on bitboards. Each row is packed into
+// 64-bit words and a whole wavefront layer is grown with shifts and masks a
+// word at a time, so open floors cost O(layers * rows * width / 64) word
+// operations instead of a queue push per cell.
+class BitGrid {
+public:
+    explicit BitGrid(const std::vector<std::vector<int>>& grid);
+
+    int width() const { return width_; }
+    int height() const { return height_; }
+
+    // Row-major (y * width + x) distance to the nearest source, -1 where
+    // unreachable. Throws std::invalid_argument for a source outside the grid
+    // or on a blocked cell.
+    std::vector<int> distances(const std::vector<std::pair<int, int>>& sources) const;
+
+private:
+    int width_;
+    int height_;
+    int words_;                   // 64-bit words per row
+    std::vector<uint64_t> free_;  // bit x of row y set when the cell is passable
+};
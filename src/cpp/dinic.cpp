@@ -50,17 +50,41 @@ int Dinic::dfs(int v, int t, int f) {
     return 0;
 }
 
+void Dinic::set_stop(const StopCondition* stop) {
+    stop_ = stop;
+}
+
+bool Dinic::stopped() const {
+    return stopped_;
+}
+
 int Dinic::max_flow(int s, int t) {
     int flow = 0;
     const int kInf = 1'000'000'000;
-    while (bfs(s, t)) {
+    // Augmenting paths between deadline checks inside one blocking-flow phase.
+    const int kCheckEvery = 256;
+    const bool check = stop_ != nullptr && stop_->active();
+    stopped_ = false;
+    while (true) {
+        if (check && stop_->expired()) {
+            stopped_ = true;
+            return flow;
+        }
+        if (!bfs(s, t)) {
+            break;
+        }
         std::fill(it_.begin(), it_.end(), 0);
+        int augments = 0;
         while (true) {
             int pushed = dfs(s, t, kInf);
             if (pushed == 0) {
                 break;
             }
             flow += pushed;
+            if (check && ++augments % kCheckEvery == 0 && stop_->expired()) {
+                stopped_ = true;
+                return flow;
+            }
         }
     }
     return flow;
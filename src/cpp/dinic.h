@@ -1,5 +1,7 @@
 #pragma once
 
+#include "stop_condition.h"
+
 #include <vector>
 
 struct Edge {
@@ -16,6 +18,10 @@ public:
     void add_edge(int u, int v, int cap);
     int max_flow(int s, int t);
 
+    // Checked between phases; max_flow then returns the flow pushed so far.
+    void set_stop(const StopCondition* stop);
+    bool stopped() const;
+
     std::vector<std::vector<Edge>>& graph();
     const std::vector<std::vector<Edge>>& graph() const;
 
@@ -27,4 +33,6 @@ private:
     std::vector<std::vector<Edge>> g_;
     std::vector<int> level_;
     std::vector<int> it_;
+    const StopCondition* stop_ = nullptr;
+    bool stopped_ = false;
 };
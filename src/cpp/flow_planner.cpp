@@ -1,12 +1,12 @@
 #include "flow_planner.h"
 
+#include "bit_bfs.h"
 #include "dinic.h"
 #include "grid_graph.h"
 #include "hlpp.h"
 
 #include <algorithm>
 #include <cctype>
-#include <queue>
 #include <stdexcept>
 #include <unordered_map>
 
@@ -40,6 +40,15 @@ struct TimeNodeIndex {
     }
 };
 
+// Records why a probe gave up early; an explicit cancel wins over the deadline.
+void mark_stopped(PlanResult& result, const StopCondition& stop) {
+    if (stop.cancel_requested()) {
+        result.cancelled = true;
+    } else {
+        result.timed_out = true;
+    }
+}
+
 int used_flow(const Edge& e) {
     if (e.original_cap <= 0) {
         return 0;
@@ -47,32 +56,23 @@ int used_flow(const Edge& e) {
     return e.original_cap - e.cap;
 }
 
-std::vector<int> multi_source_dist(const GridGraph& graph, const std::vector<int>& sources) {
+// Distance (indexed by node id) to the nearest of ``sources``; invalid ids are
+// skipped. The BFS itself runs on the bitboard copy of the grid.
+std::vector<int> multi_source_dist(const GridGraph& graph, const BitGrid& bits, const std::vector<int>& sources) {
     int n = graph.node_count();
-    std::vector<int> dist(n, -1);
-    std::queue<int> q;
+    std::vector<std::pair<int, int>> cells;
+    cells.reserve(sources.size());
     for (int s : sources) {
-        if (s < 0 || s >= n) {
-            continue;
-        }
-        if (dist[s] == 0) {
-            continue;
-        }
-        dist[s] = 0;
-        q.push(s);
-    }
-    while (!q.empty()) {
-        int cur = q.front();
-        q.pop();
-        int d = dist[cur];
-        for (int nb : graph.neighbors(cur)) {
-            if (dist[nb] != -1) {
-                continue;
-            }
-            dist[nb] = d + 1;
-            q.push(nb);
+        if (s >= 0 && s < n) {
+            cells.push_back(graph.xy(s));
         }
     }
+    std::vector<int> by_cell = bits.distances(cells);
+    std::vector<int> dist(n, -1);
+    for (int id = 0; id < n; ++id) {
+        auto [x, y] = graph.xy(id);
+        dist[id] = by_cell[static_cast<size_t>(y) * bits.width() + x];
+    }
     return dist;
 }
 
@@ -133,6 +133,25 @@ std::vector<std::vector<std::pair<int, int>>> extract_paths(
     return paths;
 }
 
+template <typename FlowAlgo>
+void count_network(const FlowAlgo& flow, PlanResult& result) {
+    const auto& g = flow.graph();
+    int nodes = 0;
+    int arcs = 0;
+    for (const auto& adj : g) {
+        if (!adj.empty()) {
+            ++nodes;
+        }
+        for (const auto& e : adj) {
+            if (e.original_cap > 0) {
+                ++arcs;
+            }
+        }
+    }
+    result.num_nodes = nodes;
+    result.num_arcs = arcs;
+}
+
 template <typename FlowAlgo>
 PlanResult plan_flow_impl(
     const std::vector<std::vector<int>>& grid,
@@ -141,7 +160,9 @@ PlanResult plan_flow_impl(
     const std::vector<int>& target_caps,
     int T,
     const std::vector<std::tuple<int, int, int>>& reserved,
-    const std::vector<std::tuple<int, int, int, int, int>>& reserved_edges) {
+    const std::vector<std::tuple<int, int, int, int, int>>& reserved_edges,
+    bool compact,
+    const StopCondition& stop) {
     PlanResult result;
     result.feasible = false;
 
@@ -151,6 +172,7 @@ PlanResult plan_flow_impl(
     }
 
     GridGraph graph(grid);
+    BitGrid bits(grid);
     int num_cells = graph.node_count();
     if (num_cells == 0) {
         return result;
@@ -163,6 +185,13 @@ PlanResult plan_flow_impl(
     if (caps.size() != targets.size()) {
         return result;
     }
+    if (compact) {
+        for (int cap : caps) {
+            if (cap > 1) {
+                throw std::invalid_argument("Compact targets park one robot each; target cap must be at most 1");
+            }
+        }
+    }
 
     std::vector<int> start_ids;
     start_ids.reserve(starts.size());
@@ -187,8 +216,8 @@ PlanResult plan_flow_impl(
         return result;
     }
 
-    auto dist_start = multi_source_dist(graph, start_ids);
-    auto dist_target = multi_source_dist(graph, target_ids);
+    auto dist_start = multi_source_dist(graph, bits, start_ids);
+    auto dist_target = multi_source_dist(graph, bits, target_ids);
     std::vector<int> earliest(num_cells, -1);
     std::vector<int> latest(num_cells, -1);
     for (int cell = 0; cell < num_cells; ++cell) {
@@ -226,14 +255,6 @@ PlanResult plan_flow_impl(
     }
     int num_edges = static_cast<int>(undirected_edges.size());
 
-    int time_nodes = (T + 1) * num_cells * 2;
-    int edge_offset = time_nodes;
-    int edge_nodes = T * num_edges * 2;
-    int sink = edge_offset + edge_nodes;
-    int source = sink + 1;
-
-    FlowAlgo flow(source + 1);
-
     std::vector<char> blocked((T + 1) * num_cells, 0);
     for (const auto& r : reserved) {
         int x, y, t;
@@ -248,36 +269,209 @@ PlanResult plan_flow_impl(
         blocked[t * num_cells + cid] = 1;
     }
 
+    // A reserved edge closes the undirected edge at time t in both directions
+    // (the swap gadget below is shared by the two directions).
+    std::vector<char> edge_blocked(static_cast<size_t>(T) * num_edges, 0);
+    if (!reserved_edges.empty()) {
+        std::unordered_map<long long, int> edge_index;
+        edge_index.reserve(num_edges * 2);
+        for (int i = 0; i < num_edges; ++i) {
+            int a = undirected_edges[i].first;
+            int b = undirected_edges[i].second;
+            long long key = (static_cast<long long>(a) << 32) | static_cast<unsigned int>(b);
+            edge_index[key] = i;
+        }
+        for (const auto& e : reserved_edges) {
+            int x1, y1, x2, y2, t;
+            std::tie(x1, y1, x2, y2, t) = e;
+            if (t < 0 || t >= T) {
+                continue;
+            }
+            int id1 = graph.id(x1, y1);
+            int id2 = graph.id(x2, y2);
+            if (id1 < 0 || id2 < 0) {
+                continue;
+            }
+            int a = std::min(id1, id2);
+            int b = std::max(id1, id2);
+            long long key = (static_cast<long long>(a) << 32) | static_cast<unsigned int>(b);
+            auto it = edge_index.find(key);
+            if (it == edge_index.end()) {
+                continue;
+            }
+            edge_blocked[t * num_edges + it->second] = 1;
+        }
+    }
+
+    std::vector<char> absorbs(num_cells, 0);
+    for (size_t i = 0; i < target_ids.size(); ++i) {
+        if (caps[i] > 0) {
+            absorbs[target_ids[i]] = 1;
+        }
+    }
+
+    // Reservation-aware reachability over the time-expanded graph: keep only
+    // nodes reachable from a start (forward sweep) that can still reach an
+    // absorbing target (backward sweep). Distance windows alone ignore the
+    // space-time blocked by reservations.
+    std::vector<char> live((T + 1) * num_cells, 0);
+    {
+        auto usable = [&](int cell, int t) {
+            return active(cell, t) && !blocked[t * num_cells + cell];
+        };
+        std::vector<char>& fwd = live;
+        for (int sid : start_ids) {
+            if (usable(sid, 0)) {
+                fwd[sid] = 1;
+            }
+        }
+        for (int t = 0; t < T; ++t) {
+            const char* cur = &fwd[t * num_cells];
+            char* nxt = &fwd[(t + 1) * num_cells];
+            for (int cell = 0; cell < num_cells; ++cell) {
+                if (cur[cell] && usable(cell, t + 1)) {
+                    nxt[cell] = 1;
+                }
+            }
+            const char* eblk = edge_blocked.data() + static_cast<size_t>(t) * num_edges;
+            for (int eidx = 0; eidx < num_edges; ++eidx) {
+                if (eblk[eidx]) {
+                    continue;
+                }
+                int a = undirected_edges[eidx].first;
+                int b = undirected_edges[eidx].second;
+                if (cur[a] && !nxt[b] && usable(b, t + 1)) {
+                    nxt[b] = 1;
+                }
+                if (cur[b] && !nxt[a] && usable(a, t + 1)) {
+                    nxt[a] = 1;
+                }
+            }
+        }
+
+        std::vector<char> bwd_next(num_cells, 0);
+        std::vector<char> bwd_cur(num_cells, 0);
+        for (int t = T; t >= 0; --t) {
+            char* layer = &fwd[t * num_cells];
+            for (int cell = 0; cell < num_cells; ++cell) {
+                bwd_cur[cell] = layer[cell] && ((absorbs[cell] && (!compact || t == T)) || (t < T && bwd_next[cell]));
+            }
+            if (t < T) {
+                const char* eblk = edge_blocked.data() + static_cast<size_t>(t) * num_edges;
+                for (int eidx = 0; eidx < num_edges; ++eidx) {
+                    if (eblk[eidx]) {
+                        continue;
+                    }
+                    int a = undirected_edges[eidx].first;
+                    int b = undirected_edges[eidx].second;
+                    if (layer[a] && bwd_next[b]) {
+                        bwd_cur[a] = 1;
+                    }
+                    if (layer[b] && bwd_next[a]) {
+                        bwd_cur[b] = 1;
+                    }
+                }
+            }
+            for (int cell = 0; cell < num_cells; ++cell) {
+                layer[cell] = bwd_cur[cell];
+            }
+            std::swap(bwd_cur, bwd_next);
+        }
+    }
+    auto is_live = [&](int cell, int t) {
+        return live[t * num_cells + cell] != 0;
+    };
+    for (int sid : start_ids) {
+        if (!is_live(sid, 0)) {
+            return result;
+        }
+    }
+
+    // Compact mode numbers swap gadgets densely: only (t, edge) pairs where
+    // both directions are live need one; one-way moves become direct arcs.
+    std::vector<int> gadget_id;
+    int edge_nodes = T * num_edges * 2;
+    if (compact) {
+        gadget_id.assign(static_cast<size_t>(T) * num_edges, -1);
+        int gadgets = 0;
+        for (int t = 0; t < T; ++t) {
+            for (int eidx = 0; eidx < num_edges; ++eidx) {
+                if (edge_blocked[t * num_edges + eidx]) {
+                    continue;
+                }
+                int a = undirected_edges[eidx].first;
+                int b = undirected_edges[eidx].second;
+                if (is_live(a, t) && is_live(b, t + 1) && is_live(b, t) && is_live(a, t + 1)) {
+                    gadget_id[t * num_edges + eidx] = gadgets++;
+                }
+            }
+        }
+        edge_nodes = gadgets * 2;
+    }
+
+    int time_nodes = (T + 1) * num_cells * 2;
+    int edge_offset = time_nodes;
+    int sink = edge_offset + edge_nodes;
+    int source = sink + 1;
+
+    if (stop.expired()) {
+        mark_stopped(result, stop);
+        return result;
+    }
+    FlowAlgo flow(source + 1);
+    flow.set_stop(&stop);
+
     for (int t = 0; t <= T; ++t) {
+        if (stop.expired()) {
+            mark_stopped(result, stop);
+            return result;
+        }
         for (int cell = 0; cell < num_cells; ++cell) {
-            if (!active(cell, t)) {
+            if (!is_live(cell, t)) {
                 continue;
             }
-            int cap = blocked[t * num_cells + cell] ? 0 : 1;
             int in = indexer.in_node(cell, t);
             int out = indexer.out_node(cell, t);
-            if (cap > 0) {
-                flow.add_edge(in, out, cap);
-            }
+            flow.add_edge(in, out, 1);
             if (t == T) {
                 continue;
             }
-            if (active(cell, t + 1)) {
+            if (is_live(cell, t + 1)) {
                 flow.add_edge(out, indexer.in_node(cell, t + 1), 1);
             }
         }
     }
 
     for (int t = 0; t < T; ++t) {
+        if (stop.expired()) {
+            mark_stopped(result, stop);
+            return result;
+        }
         for (int eidx = 0; eidx < num_edges; ++eidx) {
+            if (edge_blocked[t * num_edges + eidx]) {
+                continue;
+            }
             int a = undirected_edges[eidx].first;
             int b = undirected_edges[eidx].second;
-            bool move_ab = active(a, t) && active(b, t + 1);
-            bool move_ba = active(b, t) && active(a, t + 1);
+            bool move_ab = is_live(a, t) && is_live(b, t + 1);
+            bool move_ba = is_live(b, t) && is_live(a, t + 1);
             if (!move_ab && !move_ba) {
                 continue;
             }
             int edge_in = edge_offset + (t * num_edges + eidx) * 2;
+            if (compact) {
+                int gid = gadget_id[t * num_edges + eidx];
+                if (gid < 0) {
+                    // One direction only: no swap is possible, a plain arc suffices.
+                    if (move_ab) {
+                        flow.add_edge(indexer.out_node(a, t), indexer.in_node(b, t + 1), 1);
+                    } else {
+                        flow.add_edge(indexer.out_node(b, t), indexer.in_node(a, t + 1), 1);
+                    }
+                    continue;
+                }
+                edge_in = edge_offset + gid * 2;
+            }
             int edge_out = edge_in + 1;
             if (move_ab) {
                 flow.add_edge(indexer.out_node(a, t), edge_in, 1);
@@ -295,46 +489,6 @@ PlanResult plan_flow_impl(
         }
     }
 
-    if (!reserved_edges.empty()) {
-        std::unordered_map<long long, int> edge_index;
-        edge_index.reserve(num_edges * 2);
-        for (int i = 0; i < num_edges; ++i) {
-            int a = undirected_edges[i].first;
-            int b = undirected_edges[i].second;
-            long long key = (static_cast<long long>(a) << 32) | static_cast<unsigned int>(b);
-            edge_index[key] = i;
-        }
-        auto& g = flow.graph();
-        for (const auto& e : reserved_edges) {
-            int x1, y1, x2, y2, t;
-            std::tie(x1, y1, x2, y2, t) = e;
-            if (t < 0 || t >= T) {
-                continue;
-            }
-            int id1 = graph.id(x1, y1);
-            int id2 = graph.id(x2, y2);
-            if (id1 < 0 || id2 < 0) {
-                continue;
-            }
-            int a = std::min(id1, id2);
-            int b = std::max(id1, id2);
-            long long key = (static_cast<long long>(a) << 32) | static_cast<unsigned int>(b);
-            auto it = edge_index.find(key);
-            if (it == edge_index.end()) {
-                continue;
-            }
-            int eidx = it->second;
-            int edge_in = edge_offset + (t * num_edges + eidx) * 2;
-            int edge_out = edge_in + 1;
-            for (auto& edge : g[edge_in]) {
-                if (edge.to == edge_out && edge.original_cap > 0) {
-                    edge.cap = 0;
-                    break;
-                }
-            }
-        }
-    }
-
     for (int sid : start_ids) {
         flow.add_edge(source, indexer.in_node(sid, 0), 1);
     }
@@ -345,12 +499,32 @@ PlanResult plan_flow_impl(
         if (cap <= 0) {
             continue;
         }
+        if (compact) {
+            // Robots park on the target's wait-chain until T; one sink arc per target.
+            if (is_live(tid, T)) {
+                flow.add_edge(indexer.out_node(tid, T), sink, cap);
+            }
+            continue;
+        }
         for (int t = 0; t <= T; ++t) {
+            if (!is_live(tid, t)) {
+                continue;
+            }
             flow.add_edge(indexer.out_node(tid, t), sink, cap);
         }
     }
 
+    count_network(flow, result);
+    if (stop.expired()) {
+        mark_stopped(result, stop);
+        return result;
+    }
     int flow_value = flow.max_flow(source, sink);
+    result.flow_value = flow_value;
+    if (flow.stopped()) {
+        mark_stopped(result, stop);
+        return result;
+    }
     if (flow_value != static_cast<int>(starts.size())) {
         return result;
     }
@@ -368,7 +542,8 @@ PlanResult plan_flow_sync_impl(
     const std::vector<std::pair<int, int>>& drops,
     const std::vector<int>& drop_caps,
     int T,
-    int tau) {
+    int tau,
+    const StopCondition& stop) {
     PlanResult result;
     result.feasible = false;
 
@@ -381,6 +556,7 @@ PlanResult plan_flow_sync_impl(
     }
 
     GridGraph graph(grid);
+    BitGrid bits(grid);
     int num_cells = graph.node_count();
     if (num_cells == 0) {
         return result;
@@ -442,10 +618,15 @@ PlanResult plan_flow_sync_impl(
     int sink = target_offset + static_cast<int>(drops.size());
     int source = sink + 1;
 
+    if (stop.expired()) {
+        mark_stopped(result, stop);
+        return result;
+    }
     FlowAlgo flow(source + 1);
+    flow.set_stop(&stop);
 
-    auto dist_start = multi_source_dist(graph, start_ids);
-    auto dist_drop = multi_source_dist(graph, drop_ids);
+    auto dist_start = multi_source_dist(graph, bits, start_ids);
+    auto dist_drop = multi_source_dist(graph, bits, drop_ids);
     if (pickups.empty()) {
         return result;
     }
@@ -458,7 +639,7 @@ PlanResult plan_flow_sync_impl(
         }
         pick_ids.push_back(pid);
     }
-    auto dist_pick = multi_source_dist(graph, pick_ids);
+    auto dist_pick = multi_source_dist(graph, bits, pick_ids);
 
     std::vector<int> earliest(num_cells, -1);
     std::vector<int> latest(num_cells, -1);
@@ -494,6 +675,10 @@ PlanResult plan_flow_sync_impl(
     }
 
     for (int t = 0; t <= T; ++t) {
+        if (stop.expired()) {
+            mark_stopped(result, stop);
+            return result;
+        }
         for (int cell = 0; cell < num_cells; ++cell) {
             if (!active(cell, t)) {
                 continue;
@@ -517,6 +702,10 @@ PlanResult plan_flow_sync_impl(
     }
 
     for (int t = 0; t < T; ++t) {
+        if (stop.expired()) {
+            mark_stopped(result, stop);
+            return result;
+        }
         for (int eidx = 0; eidx < num_edges; ++eidx) {
             int a = undirected_edges[eidx].first;
             int b = undirected_edges[eidx].second;
@@ -558,7 +747,17 @@ PlanResult plan_flow_sync_impl(
         flow.add_edge(indexer.out_node(tid, T), tnode, 1);
     }
 
+    count_network(flow, result);
+    if (stop.expired()) {
+        mark_stopped(result, stop);
+        return result;
+    }
     int flow_value = flow.max_flow(source, sink);
+    result.flow_value = flow_value;
+    if (flow.stopped()) {
+        mark_stopped(result, stop);
+        return result;
+    }
     if (flow_value != static_cast<int>(starts.size())) {
         return result;
     }
@@ -587,6 +786,52 @@ int delta_to_dir(int dx, int dy) {
     return -1;
 }
 
+// step[cell * 4 + dir]: cell reached by moving one step along dir, or -1.
+std::vector<int> rot_step_table(const GridGraph& graph) {
+    int n = graph.node_count();
+    std::vector<int> step(static_cast<size_t>(n) * 4, -1);
+    for (int cell = 0; cell < n; ++cell) {
+        auto [x, y] = graph.xy(cell);
+        for (int dir = 0; dir < 4; ++dir) {
+            step[cell * 4 + dir] = graph.id(x + DIR_DX[dir], y + DIR_DY[dir]);
+        }
+    }
+    return step;
+}
+
+// BFS over (cell, dir) states: a step either rotates 90 degrees in place or
+// moves one cell along the current heading. reverse=true walks the moves
+// backwards (distance *to* the sources); rotations are symmetric.
+std::vector<int> rot_state_dist(const std::vector<int>& step, const std::vector<int>& sources, bool reverse) {
+    int n = static_cast<int>(step.size());
+    std::vector<int> dist(n, -1);
+    std::vector<int> queue;
+    queue.reserve(n);
+    for (int s : sources) {
+        if (s < 0 || s >= n || dist[s] == 0) continue;
+        dist[s] = 0;
+        queue.push_back(s);
+    }
+    static constexpr int kOpposite[4] = {1, 0, 3, 2};
+    for (size_t head = 0; head < queue.size(); ++head) {
+        int state = queue[head];
+        int cell = state >> 2;
+        int dir = state & 3;
+        int d = dist[state] + 1;
+        int next[3];
+        next[0] = cell * 4 + ROT_NEIGHBORS[dir][0];
+        next[1] = cell * 4 + ROT_NEIGHBORS[dir][1];
+        int moved = step[cell * 4 + (reverse ? kOpposite[dir] : dir)];
+        next[2] = moved >= 0 ? moved * 4 + dir : -1;
+        for (int ns : next) {
+            if (ns < 0 || dist[ns] != -1) continue;
+            dist[ns] = d;
+            queue.push_back(ns);
+        }
+    }
+    return dist;
+}
+
 struct RotTimeNodeIndex {
     int num_cells;
     int T;
@@ -679,7 +924,8 @@ PlanResult plan_flow_rot_impl(
     const std::vector<int>& target_caps,
     int T,
     const std::vector<std::tuple<int, int, int>>& reserved,
-    const std::vector<std::tuple<int, int, int, int, int>>& reserved_edges) {
+    const std::vector<std::tuple<int, int, int, int, int>>& reserved_edges,
+    const StopCondition& stop) {
 
     PlanResult result;
     result.feasible = false;
@@ -715,24 +961,37 @@ PlanResult plan_flow_rot_impl(
     }
     if (target_ids.empty()) return result;
 
-    // Active cell pruning (position-based, still valid lower bounds)
-    auto dist_start = multi_source_dist(graph, start_ids);
-    auto dist_target = multi_source_dist(graph, target_ids);
-    std::vector<int> earliest(num_cells, -1);
-    std::vector<int> latest(num_cells, -1);
-    for (int cell = 0; cell < num_cells; ++cell) {
-        if (dist_start[cell] < 0 || dist_target[cell] < 0) continue;
-        int l = T - dist_target[cell];
-        if (l < 0) continue;
-        earliest[cell] = dist_start[cell];
-        latest[cell] = l;
+    // Orientation-aware pruning: BFS over (cell, dir) states so turning cost
+    // counts towards the earliest/latest time windows of every direction.
+    std::vector<int> norm_dirs(start_dirs.size());
+    for (size_t i = 0; i < start_dirs.size(); ++i) {
+        int sd = start_dirs[i];
+        norm_dirs[i] = (sd < 0 || sd >= 4) ? 0 : sd;
     }
-    auto active = [&](int cell, int t) {
-        if (earliest[cell] < 0) return false;
-        return t >= earliest[cell] && t <= latest[cell];
+    auto step = rot_step_table(graph);
+    std::vector<int> fwd_sources;
+    fwd_sources.reserve(start_ids.size());
+    for (size_t i = 0; i < start_ids.size(); ++i) {
+        fwd_sources.push_back(start_ids[i] * 4 + norm_dirs[i]);
+    }
+    std::vector<int> bwd_sources;
+    bwd_sources.reserve(target_ids.size() * 4);
+    for (int tid : target_ids) {
+        for (int dir = 0; dir < 4; ++dir) {
+            bwd_sources.push_back(tid * 4 + dir);
+        }
+    }
+    auto dist_start = rot_state_dist(step, fwd_sources, false);
+    auto dist_target = rot_state_dist(step, bwd_sources, true);
+    auto active = [&](int cell, int dir, int t) {
+        int state = cell * 4 + dir;
+        int ds = dist_start[state];
+        int dt = dist_target[state];
+        if (ds < 0 || dt < 0) return false;
+        return t >= ds && t <= T - dt;
     };
-    for (int sid : start_ids) {
-        if (!active(sid, 0)) return result;
+    for (size_t i = 0; i < start_ids.size(); ++i) {
+        if (!active(start_ids[i], norm_dirs[i], 0)) return result;
     }
 
     RotTimeNodeIndex indexer{num_cells, T};
@@ -763,7 +1022,12 @@ PlanResult plan_flow_rot_impl(
     int sink = edge_offset + edge_nodes;
     int source = sink + 1;
 
+    if (stop.expired()) {
+        mark_stopped(result, stop);
+        return result;
+    }
     FlowAlgo flow(source + 1);
+    flow.set_stop(&stop);
 
     // Blocked cells from reservations (position-based, blocks all 4 dirs)
     std::vector<char> blocked((T + 1) * num_cells, 0);
@@ -778,32 +1042,39 @@ PlanResult plan_flow_rot_impl(
 
     // Vertex capacity + wait + rotation edges
     for (int t = 0; t <= T; ++t) {
+        if (stop.expired()) { mark_stopped(result, stop); return result; }
         for (int cell = 0; cell < num_cells; ++cell) {
-            if (!active(cell, t)) continue;
             bool is_blocked = blocked[t * num_cells + cell] != 0;
             for (int dir = 0; dir < 4; ++dir) {
+                if (!active(cell, dir, t)) continue;
                 int in = indexer.in_node(cell, dir, t);
                 int out = indexer.out_node(cell, dir, t);
                 if (!is_blocked) {
                     flow.add_edge(in, out, 1);
                 }
                 if (t == T) continue;
-                if (!active(cell, t + 1)) continue;
                 // Wait: same direction
-                flow.add_edge(out, indexer.in_node(cell, dir, t + 1), 1);
+                if (active(cell, dir, t + 1)) {
+                    flow.add_edge(out, indexer.in_node(cell, dir, t + 1), 1);
+                }
                 // Rotate 90 degrees
-                flow.add_edge(out, indexer.in_node(cell, ROT_NEIGHBORS[dir][0], t + 1), 1);
-                flow.add_edge(out, indexer.in_node(cell, ROT_NEIGHBORS[dir][1], t + 1), 1);
+                for (int k = 0; k < 2; ++k) {
+                    int nd = ROT_NEIGHBORS[dir][k];
+                    if (active(cell, nd, t + 1)) {
+                        flow.add_edge(out, indexer.in_node(cell, nd, t + 1), 1);
+                    }
+                }
             }
         }
     }
 
     // Move edges through undirected edge intermediaries
     for (int t = 0; t < T; ++t) {
+        if (stop.expired()) { mark_stopped(result, stop); return result; }
         for (int eidx = 0; eidx < num_edges; ++eidx) {
             const auto& ue = undirected_edges[eidx];
-            bool move_ab = active(ue.a, t) && active(ue.b, t + 1);
-            bool move_ba = active(ue.b, t) && active(ue.a, t + 1);
+            bool move_ab = active(ue.a, ue.dir_ab, t) && active(ue.b, ue.dir_ab, t + 1);
+            bool move_ba = active(ue.b, ue.dir_ba, t) && active(ue.a, ue.dir_ba, t + 1);
             if (!move_ab && !move_ba) continue;
 
             int edge_in = edge_offset + (t * num_edges + eidx) * 2;
@@ -862,9 +1133,7 @@ PlanResult plan_flow_rot_impl(
 
     // Source edges
     for (size_t i = 0; i < start_ids.size(); ++i) {
-        int sd = start_dirs[i];
-        if (sd < 0 || sd >= 4) sd = 0;
-        flow.add_edge(source, indexer.in_node(start_ids[i], sd, 0), 1);
+        flow.add_edge(source, indexer.in_node(start_ids[i], norm_dirs[i], 0), 1);
     }
 
     // Sink edges: any direction at target is acceptable
@@ -874,15 +1143,26 @@ PlanResult plan_flow_rot_impl(
         if (cap <= 0) continue;
         for (int t = 0; t <= T; ++t) {
             for (int dir = 0; dir < 4; ++dir) {
+                if (!active(tid, dir, t)) continue;
                 flow.add_edge(indexer.out_node(tid, dir, t), sink, cap);
             }
         }
     }
 
+    count_network(flow, result);
+    if (stop.expired()) {
+        mark_stopped(result, stop);
+        return result;
+    }
     int flow_value = flow.max_flow(source, sink);
+    result.flow_value = flow_value;
+    if (flow.stopped()) {
+        mark_stopped(result, stop);
+        return result;
+    }
     if (flow_value != static_cast<int>(starts.size())) return result;
 
-    auto [paths, path_dirs] = extract_paths_rot(flow, graph, indexer, start_ids, start_dirs, source, sink);
+    auto [paths, path_dirs] = extract_paths_rot(flow, graph, indexer, start_ids, norm_dirs, source, sink);
     result.paths = std::move(paths);
     result.path_dirs = std::move(path_dirs);
     result.feasible = true;
@@ -899,7 +1179,7 @@ PlanResult plan_flow(
     int T,
     const std::vector<std::tuple<int, int, int>>& reserved,
     const std::vector<std::tuple<int, int, int, int, int>>& reserved_edges) {
-    return plan_flow_impl<Dinic>(grid, starts, targets, target_caps, T, reserved, reserved_edges);
+    return plan_flow_impl<Dinic>(grid, starts, targets, target_caps, T, reserved, reserved_edges, false, StopCondition());
 }
 
 PlanResult plan_flow_with_method(
@@ -910,13 +1190,15 @@ PlanResult plan_flow_with_method(
     int T,
     const std::vector<std::tuple<int, int, int>>& reserved,
     const std::vector<std::tuple<int, int, int, int, int>>& reserved_edges,
-    const std::string& method) {
+    const std::string& method,
+    bool compact,
+    const StopCondition& stop) {
     std::string key = normalize_method(method);
     if (key.empty() || key == "dinic") {
-        return plan_flow_impl<Dinic>(grid, starts, targets, target_caps, T, reserved, reserved_edges);
+        return plan_flow_impl<Dinic>(grid, starts, targets, target_caps, T, reserved, reserved_edges, compact, stop);
     }
     if (key == "hlpp") {
-        return plan_flow_impl<HLPP>(grid, starts, targets, target_caps, T, reserved, reserved_edges);
+        return plan_flow_impl<HLPP>(grid, starts, targets, target_caps, T, reserved, reserved_edges, compact, stop);
     }
     throw std::invalid_argument("Unknown max-flow method: " + method);
 }
@@ -929,7 +1211,7 @@ PlanResult plan_flow_sync(
     const std::vector<int>& drop_caps,
     int T,
     int tau) {
-    return plan_flow_sync_impl<Dinic>(grid, starts, pickups, drops, drop_caps, T, tau);
+    return plan_flow_sync_impl<Dinic>(grid, starts, pickups, drops, drop_caps, T, tau, StopCondition());
 }
 
 PlanResult plan_flow_sync_with_method(
@@ -940,13 +1222,14 @@ PlanResult plan_flow_sync_with_method(
     const std::vector<int>& drop_caps,
     int T,
     int tau,
-    const std::string& method) {
+    const std::string& method,
+    const StopCondition& stop) {
     std::string key = normalize_method(method);
     if (key.empty() || key == "dinic") {
-        return plan_flow_sync_impl<Dinic>(grid, starts, pickups, drops, drop_caps, T, tau);
+        return plan_flow_sync_impl<Dinic>(grid, starts, pickups, drops, drop_caps, T, tau, stop);
     }
     if (key == "hlpp") {
-        return plan_flow_sync_impl<HLPP>(grid, starts, pickups, drops, drop_caps, T, tau);
+        return plan_flow_sync_impl<HLPP>(grid, starts, pickups, drops, drop_caps, T, tau, stop);
     }
     throw std::invalid_argument("Unknown max-flow method: " + method);
 }
@@ -960,7 +1243,7 @@ PlanResult plan_flow_rot(
     int T,
     const std::vector<std::tuple<int, int, int>>& reserved,
     const std::vector<std::tuple<int, int, int, int, int>>& reserved_edges) {
-    return plan_flow_rot_impl<Dinic>(grid, starts, start_dirs, targets, target_caps, T, reserved, reserved_edges);
+    return plan_flow_rot_impl<Dinic>(grid, starts, start_dirs, targets, target_caps, T, reserved, reserved_edges, StopCondition());
 }
 
 PlanResult plan_flow_rot_with_method(
@@ -972,13 +1255,14 @@ PlanResult plan_flow_rot_with_method(
     int T,
     const std::vector<std::tuple<int, int, int>>& reserved,
     const std::vector<std::tuple<int, int, int, int, int>>& reserved_edges,
-    const std::string& method) {
+    const std::string& method,
+    const StopCondition& stop) {
     std::string key = normalize_method(method);
     if (key.empty() || key == "dinic") {
-        return plan_flow_rot_impl<Dinic>(grid, starts, start_dirs, targets, target_caps, T, reserved, reserved_edges);
+        return plan_flow_rot_impl<Dinic>(grid, starts, start_dirs, targets, target_caps, T, reserved, reserved_edges, stop);
     }
     if (key == "hlpp") {
-        return plan_flow_rot_impl<HLPP>(grid, starts, start_dirs, targets, target_caps, T, reserved, reserved_edges);
+        return plan_flow_rot_impl<HLPP>(grid, starts, start_dirs, targets, target_caps, T, reserved, reserved_edges, stop);
     }
     throw std::invalid_argument("Unknown max-flow method: " + method);
 }
@@ -1,5 +1,7 @@
 #pragma once
 
+#include "stop_condition.h"
+
 #include <string>
 #include <tuple>
 #include <utility>
@@ -9,6 +11,16 @@ struct PlanResult {
     bool feasible;
     std::vector<std::vector<std::pair<int, int>>> paths;
     std::vector<std::vector<int>> path_dirs;
+    // Size of the constructed time-expanded network (nodes with arcs, forward arcs).
+    int num_nodes = 0;
+    int num_arcs = 0;
+    // Achieved max-flow value, i.e. robots routed; equals starts.size() when feasible.
+    // Stays 0 when the probe is rejected before the max-flow runs.
+    int flow_value = 0;
+    // The StopCondition fired before the probe finished; feasible is false.
+    // cancelled: its CancelToken was cancelled; timed_out: its deadline passed.
+    bool timed_out = false;
+    bool cancelled = false;
 };
 
 PlanResult plan_flow(
@@ -20,6 +32,10 @@ PlanResult plan_flow(
     const std::vector<std::tuple<int, int, int>>& reserved,
     const std::vector<std::tuple<int, int, int, int, int>>& reserved_edges);
 
+// compact=true: swap gadgets only where both directions are live, and targets
+// absorb through their wait-chain into a single sink arc at t=T (robots park).
+// A parked robot occupies the target cell, so each target holds at most one
+// robot; caps above 1 throw std::invalid_argument in compact mode.
 PlanResult plan_flow_with_method(
     const std::vector<std::vector<int>>& grid,
     const std::vector<std::pair<int, int>>& starts,
@@ -28,7 +44,9 @@ PlanResult plan_flow_with_method(
     int T,
     const std::vector<std::tuple<int, int, int>>& reserved,
     const std::vector<std::tuple<int, int, int, int, int>>& reserved_edges,
-    const std::string& method);
+    const std::string& method,
+    bool compact = false,
+    const StopCondition& stop = StopCondition());
 
 PlanResult plan_flow_sync(
     const std::vector<std::vector<int>>& grid,
@@ -47,7 +65,8 @@ PlanResult plan_flow_sync_with_method(
     const std::vector<int>& drop_caps,
     int T,
     int tau,
-    const std::string& method);
+    const std::string& method,
+    const StopCondition& stop = StopCondition());
 
 // Rotation-aware variants: state space is (cell, dir, t)
 // dir: 0=EAST, 1=WEST, 2=SOUTH, 3=NORTH
@@ -71,4 +90,5 @@ PlanResult plan_flow_rot_with_method(
     int T,
     const std::vector<std::tuple<int, int, int>>& reserved,
     const std::vector<std::tuple<int, int, int, int, int>>& reserved_edges,
-    const std::string& method);
+    const std::string& method,
+    const StopCondition& stop = StopCondition());
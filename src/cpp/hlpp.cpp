@@ -26,6 +26,14 @@ const std::vector<std::vector<Edge>>& HLPP::graph() const {
     return g_;
 }
 
+void HLPP::set_stop(const StopCondition* stop) {
+    stop_ = stop;
+}
+
+bool HLPP::stopped() const {
+    return stopped_;
+}
+
 void HLPP::add_active(int v) {
     if (v == s_ || v == t_) {
         return;
@@ -129,6 +137,7 @@ void HLPP::global_relabel(int s, int t) {
 }
 
 int HLPP::max_flow(int s, int t) {
+    stopped_ = false;
     if (s == t) {
         return 0;
     }
@@ -163,7 +172,14 @@ int HLPP::max_flow(int s, int t) {
         add_active(e.to);
     }
 
+    const int kCheckEvery = 512;
+    const bool check = stop_ != nullptr && stop_->active();
+    int discharges = 0;
     while (true) {
+        if (check && ++discharges % kCheckEvery == 0 && stop_->expired()) {
+            stopped_ = true;
+            break;
+        }
         int v = pop_active();
         if (v < 0) {
             break;
@@ -11,6 +11,10 @@ public:
     void add_edge(int u, int v, int cap);
     int max_flow(int s, int t);
 
+    // Checked every few hundred discharges; max_flow then returns the excess at t so far.
+    void set_stop(const StopCondition* stop);
+    bool stopped() const;
+
     std::vector<std::vector<Edge>>& graph();
     const std::vector<std::vector<Edge>>& graph() const;
 
@@ -34,4 +38,6 @@ private:
     std::vector<int> current_;
     std::vector<char> active_;
     std::vector<std::vector<int>> buckets_;
+    const StopCondition* stop_ = nullptr;
+    bool stopped_ = false;
 };
@@ -0,0 +1,51 @@
+#pragma once
+
+#include <atomic>
+#include <chrono>
+
+// Cooperative cancellation flag shared between Python and in-flight planner
+// calls.
+class CancelToken {
+public:
+    void cancel() {
+        flag_.store(true, std::memory_order_relaxed);
+    }
+
+    bool cancelled() const {
+        return flag_.load(std::memory_order_relaxed);
+    }
+
+private:
+    std::atomic<bool> flag_{false};
+};
+
+// Wall-clock budget and/or cancellation token for one planner call. Planners
+// and max-flow engines poll it between phases and give up with a partial
+// (infeasible) result.
+struct StopCondition {
+    using Clock = std::chrono::steady_clock;
+
+    bool has_deadline = false;
+    Clock::time_point deadline{};
+    const CancelToken* token = nullptr;
+
+    static StopCondition after_seconds(double seconds) {
+        StopCondition stop;
+        stop.has_deadline = true;
+        stop.deadline = Clock::now() + std::chrono::duration_cast<Clock::duration>(
+                                           std::chrono::duration<double>(seconds));
+        return stop;
+    }
+
+    bool active() const {
+        return has_deadline || token != nullptr;
+    }
+
+    bool cancel_requested() const {
+        return token != nullptr && token->cancelled();
+    }
+
+    bool expired() const {
+        return cancel_requested() || (has_deadline && Clock::now() >= deadline);
+    }
+};
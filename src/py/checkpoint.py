@@ -0,0 +1,38 @@
+"""Checkpoint files for resuming long simulations.
+
+A checkpoint is one pickle of the simulator's state between two rounds.
+``save_checkpoint`` writes it to a temporary file, fsyncs it and renames
+it over the previous one, so a preemption during the write leaves the
+last complete checkpoint in place. ``load_checkpoint`` refuses a file
+written for a different run configuration, since resuming it could not
+reproduce the original run.
+"""
+
+import os
+import pickle
+from typing import Dict
+
+CHECKPOINT_VERSION = 1
+
+
+def save_checkpoint(path: str, state: Dict) -> None:
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump({"version": CHECKPOINT_VERSION, **state}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+
+def load_checkpoint(path: str, config: Dict) -> Dict:
+    """Load ``path``; raises ``ValueError`` if it was written with another ``config``."""
+    with open(path, "rb") as f:
+        state = pickle.load(f)
+    if state.get("version") != CHECKPOINT_VERSION:
+        raise ValueError(f"{path}: unsupported checkpoint version {state.get('version')}")
+    saved = state["config"]
+    mismatched = sorted(k for k in set(saved) | set(config) if saved.get(k) != config.get(k))
+    if mismatched:
+        details = ", ".join(f"{k}: {saved.get(k)!r} != {config.get(k)!r}" for k in mismatched)
+        raise ValueError(f"{path} was written by a different run ({details})")
+    return state
@@ -0,0 +1,151 @@
+"""Vertex and swap collision checks over whole trajectories.
+
+With NumPy the trajectories form an ``(agents, T, 2)`` integer array.
+Cells are encoded as ``y * width + x``. A vertex collision is a repeated
+id in one timestep column, found by sorting each column. A swap is a
+repeated undirected edge ``(min, max)`` among the agents that move in one
+step: two agents on the same directed edge already collide on a vertex
+one step earlier, so any other repeat is a swap. Columns are processed
+in chunks to bound memory. ``TrajectoryValidator`` checks one round's new
+segment at a time against the last checked positions. Without NumPy the
+same checks run per timestep on Python dicts.
+
+Trajectories shorter than the longest one wait at their last cell, as
+in the simulators' output.
+"""
+
+from typing import Dict, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised only without numpy
+    np = None
+
+HAVE_NUMPY = np is not None
+
+# Cells per chunk of timestep columns (agents * steps).
+_CHUNK_CELLS = 1 << 22
+
+
+def _step_conflict(
+    ids: Sequence[int],
+    prev: Optional[Sequence[Tuple[int, int]]],
+    curr: Sequence[Tuple[int, int]],
+    t: int,
+) -> Optional[str]:
+    """Error message for the first vertex or swap collision at step ``t``, else ``None``."""
+    occupied: Dict[Tuple[int, int], int] = {}
+    for rid, pos in zip(ids, curr):
+        if pos in occupied:
+            return f"Vertex collision at t={t} between agents {occupied[pos]} and {rid}"
+        occupied[pos] = rid
+    if prev is None:
+        return None
+    edge_used: Dict[Tuple[Tuple[int, int], Tuple[int, int]], int] = {}
+    for rid, p, c in zip(ids, prev, curr):
+        rev = (c, p)
+        if rev in edge_used and edge_used[rev] != rid:
+            return f"Edge collision at t={t} between agents {edge_used[rev]} and {rid}"
+        edge_used[(p, c)] = rid
+    return None
+
+
+def _first_repeat(keys) -> Optional[int]:
+    """Index of the first column of ``keys`` (rows = agents) holding a repeated value."""
+    if keys.shape[0] < 2 or keys.shape[1] == 0:
+        return None
+    ordered = np.sort(keys, axis=0)
+    hit = (ordered[1:] == ordered[:-1]).any(axis=0)
+    idx = np.flatnonzero(hit)
+    return int(idx[0]) if idx.size else None
+
+
+def _segment_conflict(cells, prev_cells, t0: int) -> Optional[int]:
+    """First step ``t0 + j`` with a collision in ``cells`` (agents x k), given the column before it."""
+    agents = cells.shape[0]
+    vertex = _first_repeat(cells)
+    before = np.concatenate([prev_cells[:, None], cells[:, :-1]], axis=1)
+    moving = before != cells
+    lo = np.minimum(before, cells)
+    hi = np.maximum(before, cells)
+    size = int(max(cells.max(), before.max())) + 1
+    # Agents that wait get a unique negative key so they never match.
+    idle = -1 - np.arange(agents, dtype=np.int64)[:, None]
+    edge = _first_repeat(np.where(moving, lo * size + hi, idle))
+    hits = [j for j in (vertex, edge) if j is not None]
+    return t0 + min(hits) if hits else None
+
+
+class TrajectoryValidator:
+    """Incremental collision check; ``extend`` takes each agent's next positions."""
+
+    def __init__(self, agent_ids: Sequence[int], starts: Sequence[Tuple[int, int]], width: int):
+        self.agent_ids = list(agent_ids)
+        self.width = max(1, width)
+        self.t = 0
+        self._last = [tuple(p) for p in starts]
+        message = _step_conflict(self.agent_ids, None, self._last, 0)
+        if message:
+            raise RuntimeError(message)
+
+    def extend(self, segments) -> None:
+        """Append ``segments[i]`` to agent ``i``; shorter segments wait at their last cell.
+
+        ``segments`` is a list of per-agent position lists or, with NumPy,
+        an ``(agents, k, 2)`` integer array. Raises ``RuntimeError`` (same
+        messages as the per-step check) on the first collision; the
+        validator is not advanced in that case.
+        """
+        if np is not None and isinstance(segments, np.ndarray):
+            self._extend_array(segments.reshape(len(self.agent_ids), -1, 2))
+            return
+        steps = max((len(s) for s in segments), default=0)
+        if steps == 0:
+            return
+        padded = [
+            [tuple(p) for p in seg] + [tuple(seg[-1]) if seg else last] * (steps - len(seg))
+            for seg, last in zip(segments, self._last)
+        ]
+        if np is not None:
+            self._extend_array(np.asarray(padded, dtype=np.int64).reshape(len(padded), steps, 2))
+            return
+        prev = self._last
+        for j in range(steps):
+            curr = [seg[j] for seg in padded]
+            message = _step_conflict(self.agent_ids, prev, curr, self.t + j + 1)
+            if message:
+                raise RuntimeError(message)
+            prev = curr
+        self._last = prev
+        self.t += steps
+
+    def _extend_array(self, arr) -> None:
+        steps = arr.shape[1]
+        if steps == 0:
+            return
+        cells = arr[..., 1].astype(np.int64) * self.width + arr[..., 0]
+        prev_cells = np.array([y * self.width + x for x, y in self._last], dtype=np.int64)
+        chunk = max(1, _CHUNK_CELLS // max(1, len(self.agent_ids)))
+        for j0 in range(0, steps, chunk):
+            block = cells[:, j0 : j0 + chunk]
+            t = _segment_conflict(block, prev_cells, self.t + j0 + 1)
+            if t is not None:
+                j = t - self.t - 1
+                prev = self._last if j == 0 else [tuple(map(int, p)) for p in arr[:, j - 1]]
+                curr = [tuple(map(int, p)) for p in arr[:, j]]
+                raise RuntimeError(_step_conflict(self.agent_ids, prev, curr, t))
+            prev_cells = block[:, -1]
+        self._last = [tuple(map(int, p)) for p in arr[:, -1]]
+        self.t += steps
+
+
+def validate_collision_free(trajectories: Dict[int, List[Tuple[int, int]]]) -> None:
+    """Raise ``RuntimeError`` on the first vertex or swap collision in ``trajectories``."""
+    if not trajectories:
+        return
+    ids = list(trajectories.keys())
+    trajs = [[tuple(p) for p in trajectories[rid]] for rid in ids]
+    width = 1 + max((x for traj in trajs for x, _ in traj), default=0)
+    starts = [traj[0] if traj else (0, 0) for traj in trajs]
+    validator = TrajectoryValidator(ids, starts, width)
+    validator.extend([traj[1:] for traj in trajs])
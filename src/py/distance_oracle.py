@@ -0,0 +1,115 @@
+"""Precomputed BFS distance fields for the fixed cells of a map.
+
+Shelf cells and goals never move during a simulation, so the per-round
+multi-source BFS over the whole grid can be replaced by a lookup: the
+oracle stores one single-source distance field per fixed cell as a compact
+unsigned array, and the distance to the nearest cell of any subset is the
+elementwise minimum of their rows. Fields are saved next to the solver
+calibration table, keyed by a hash of the map and the source list, and
+memory-mapped on load.
+
+NumPy is optional: without it ``HAVE_NUMPY`` is False and the planner keeps
+running its own BFS.
+"""
+
+import hashlib
+import os
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised only without numpy
+    np = None
+
+from planner_cache import map_fingerprint
+from solver_select import cache_dir
+
+HAVE_NUMPY = np is not None
+
+
+class DistanceOracle:
+    """Single-source BFS fields for ``sources``; unreachable cells hold ``unreachable``."""
+
+    def __init__(self, width: int, height: int, sources: Sequence[Tuple[int, int]], fields):
+        self.width = width
+        self.height = height
+        self.sources = [tuple(p) for p in sources]
+        self.fields = fields
+        self.unreachable = int(np.iinfo(fields.dtype).max)
+        self._row: Dict[Tuple[int, int], int] = {p: i for i, p in enumerate(self.sources)}
+
+    @classmethod
+    def build(cls, grid: List[List[int]], sources: Iterable[Tuple[int, int]]) -> "DistanceOracle":
+        if np is None:
+            raise ImportError("DistanceOracle requires numpy")
+        from planner import flow_planner_cpp
+
+        bits = flow_planner_cpp.BitGrid(grid)
+        width, height = bits.width, bits.height
+        sources = sorted(set(tuple(p) for p in sources))
+        n = width * height
+        dtype = np.uint16 if n < np.iinfo(np.uint16).max else np.uint32
+        fields = np.full((len(sources), n), np.iinfo(dtype).max, dtype=dtype)
+        for row, source in enumerate(sources):
+            dist = np.array(bits.distances([source]), dtype=np.int64)
+            reached = dist >= 0
+            fields[row, reached] = dist[reached]
+        return cls(width, height, sources, fields)
+
+    @classmethod
+    def for_map(
+        cls,
+        grid: List[List[int]],
+        sources: Iterable[Tuple[int, int]],
+        directory: Optional[str] = None,
+    ) -> "DistanceOracle":
+        """Load the persisted oracle for ``(grid, sources)`` or build and save it."""
+        if np is None:
+            raise ImportError("DistanceOracle requires numpy")
+        sources = sorted(set(tuple(p) for p in sources))
+        path = oracle_path(grid, sources, directory)
+        height, width, _ = map_fingerprint(grid)
+        if os.path.exists(path):
+            try:
+                fields = np.load(path, mmap_mode="r")
+            except (OSError, ValueError):
+                fields = None
+            if fields is not None and fields.shape == (len(sources), width * height):
+                return cls(width, height, sources, fields)
+        oracle = cls.build(grid, sources)
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp_path = path + ".tmp.npy"
+        np.save(tmp_path, oracle.fields)
+        os.replace(tmp_path, path)
+        return oracle
+
+    def covers(self, cells: Iterable[Tuple[int, int]]) -> bool:
+        return all(tuple(p) in self._row for p in cells)
+
+    def distances_to(self, sources: Sequence[Tuple[int, int]], cells: Sequence[Tuple[int, int]]) -> List[int]:
+        """Distance from each of ``cells`` to its nearest cell of ``sources``; -1 if unreachable.
+
+        Every source must be covered by the oracle.
+        """
+        if not sources:
+            return [-1] * len(cells)
+        rows = [self._row[tuple(p)] for p in sources]
+        cols = [y * self.width + x for x, y in cells]
+        nearest = self.fields[np.ix_(rows, cols)].min(axis=0)
+        return [-1 if d == self.unreachable else int(d) for d in nearest.tolist()]
+
+    def distance_matrix(self, sources: Sequence[Tuple[int, int]], cells: Sequence[Tuple[int, int]]) -> List[List[int]]:
+        """``[i][j]`` = distance from ``sources[i]`` to ``cells[j]``; -1 if unreachable."""
+        rows = [self._row[tuple(p)] for p in sources]
+        cols = [y * self.width + x for x, y in cells]
+        block = self.fields[np.ix_(rows, cols)].tolist()
+        return [[-1 if d == self.unreachable else int(d) for d in row] for row in block]
+
+
+def oracle_path(grid: List[List[int]], sources: Sequence[Tuple[int, int]], directory: Optional[str] = None) -> str:
+    height, width, digest = map_fingerprint(grid)
+    key = hashlib.blake2b(digest, digest_size=16)
+    key.update(f"{height}x{width}".encode())
+    for x, y in sources:
+        key.update(f";{x},{y}".encode())
+    return os.path.join(directory or cache_dir(), f"distance_oracle_{key.hexdigest()}.npy")
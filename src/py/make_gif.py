@@ -14,6 +14,8 @@ from matplotlib.patches import FancyArrowPatch
 from PIL import Image
 import io
 
+from sim_output import load_sim_output, trajectories_of
+
 # Direction constants
 DIR_EAST = 0
 DIR_WEST = 1
@@ -37,8 +39,7 @@ AGENT_COLORS = [
 
 
 def load_sim(path: str) -> Dict:
-    with open(path, "r") as f:
-        return json.load(f)
+    return load_sim_output(path)
 
 
 def load_map_data(map_path: str) -> Dict:
@@ -136,12 +137,7 @@ def make_gif(
     cells = map_data["cells"]
     goals = [tuple(g) for g in map_data.get("goals", [])]
 
-    agents_data = sim["agents"]
-    trajectories: Dict[int, List[Tuple[int, int]]] = {}
-    for rid_str, adata in agents_data.items():
-        rid = int(rid_str)
-        traj = [tuple(p) for p in adata["trajectory"]]
-        trajectories[rid] = traj
+    trajectories = trajectories_of(sim)
 
     max_len = max(len(t) for t in trajectories.values()) if trajectories else 0
 
@@ -207,7 +203,7 @@ def make_gif(
 
 def main():
     parser = argparse.ArgumentParser(description="Generate GIF from simulation output")
-    parser.add_argument("--sim", required=True, help="Path to simulation output JSON")
+    parser.add_argument("--sim", required=True, help="Path to simulation output (.json or .simbin)")
     parser.add_argument("--output", required=True, help="Output GIF path")
     parser.add_argument("--max_frames", type=int, default=60, help="Max frames in GIF")
     parser.add_argument("--duration", type=int, default=300, help="Frame duration in ms")
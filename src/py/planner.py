@@ -1,11 +1,17 @@
-from typing import Dict, List, Tuple
+from typing import Dict, List, Optional, Tuple
 
-from concurrent.futures import ThreadPoolExecutor
-from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+import math
 import os
 import sys
-
-from data_types import RobotState, DIR_EAST
+import threading
+import time
+
+from data_types import RobotState, DELTA_TO_DIR, DIR_EAST, DIR_NORTH, DIR_SOUTH, DIR_WEST
+from distance_oracle import DistanceOracle
+from planner_cache import LRUCache, map_fingerprint
+from planner_pool import PlannerPool
+from solver_select import resolve_method
 from utils import pad_path
 
 
@@ -38,60 +44,81 @@ def _import_flow_planner():
 
 flow_planner_cpp = _import_flow_planner()
 
-_GRID_CACHE: Dict[Tuple, Dict] = {}
-_DIST_CACHE: Dict[Tuple, List[int]] = {}
+# A list costs one pointer per element plus its header. CPython shares ints
+# up to 256 (and the -1 of unreachable cells); larger distances are separate
+# 28-byte objects.
+def _list_bytes(values: List) -> int:
+    return 56 + 8 * len(values) + 28 * sum(map((256).__lt__, values))
 
 
-def _grid_key(grid: List[List[int]]) -> Tuple:
-    height = len(grid)
-    width = len(grid[0]) if height > 0 else 0
-    rows = tuple(tuple(row) for row in grid)
-    return (height, width, rows)
+_GRID_CACHE: LRUCache[Dict] = LRUCache(max_entries=16)
+_DIST_CACHE: LRUCache[List[int]] = LRUCache(max_bytes=64 << 20, sizeof=_list_bytes)
+
+
+def cache_stats() -> Dict[str, Dict[str, int]]:
+    """Entry, byte, hit, miss and eviction counters of the planner caches."""
+    return {"grid": _GRID_CACHE.stats(), "dist": _DIST_CACHE.stats()}
+
+
+def clear_caches() -> None:
+    _GRID_CACHE.clear()
+    _DIST_CACHE.clear()
+
+
+def cache_snapshot() -> Dict:
+    """Picklable state of the planner caches (grid entries hold C++ objects, so only their keys)."""
+    grid = _GRID_CACHE.snapshot(entries=False)
+    grid["keys"] = _GRID_CACHE.keys()
+    return {"grid": grid, "dist": _DIST_CACHE.snapshot()}
+
+
+def restore_cache_snapshot(snapshot: Dict, grids: List[List[List[int]]]) -> None:
+    """Restore ``cache_snapshot()`` output; grid entries are rebuilt from ``grids``."""
+    by_key = {map_fingerprint(grid): grid for grid in grids}
+    grid = dict(snapshot["grid"])
+    grid["entries"] = [(key, _build_grid_cache(by_key[key])) for key in grid["keys"] if key in by_key]
+    _GRID_CACHE.restore(grid)
+    _DIST_CACHE.restore(snapshot["dist"])
 
 
 def _get_grid_cache(grid: List[List[int]]) -> Dict:
-    key = _grid_key(grid)
+    key = map_fingerprint(grid)
     cached = _GRID_CACHE.get(key)
     if cached is not None:
         return cached
-    height = len(grid)
-    width = len(grid[0]) if height > 0 else 0
-    passable = []
-    for y in range(height):
-        for x in range(width):
-            passable.append(grid[y][x] == 0)
-    neighbors: List[List[int]] = [[] for _ in range(height * width)]
-    for y in range(height):
-        for x in range(width):
-            idx = y * width + x
-            if not passable[idx]:
-                continue
-            for dx, dy in ((1, 0), (-1, 0), (0, 1), (0, -1)):
-                nx = x + dx
-                ny = y + dy
-                if nx < 0 or ny < 0 or nx >= width or ny >= height:
-                    continue
-                nidx = ny * width + nx
-                if not passable[nidx]:
-                    continue
-                neighbors[idx].append(nidx)
-    cached = {
+    cached = _build_grid_cache(grid, key)
+    _GRID_CACHE.put(key, cached)
+    return cached
+
+
+def _build_grid_cache(grid: List[List[int]], key: Optional[Tuple[int, int, bytes]] = None) -> Dict:
+    key = key or map_fingerprint(grid)
+    height, width, _ = key
+    return {
         "key": key,
         "width": width,
         "height": height,
-        "passable": passable,
-        "neighbors": neighbors,
+        "num_passable": sum(1 for row in grid for cell in row if cell == 0),
+        "bits": flow_planner_cpp.BitGrid(grid),
     }
-    _GRID_CACHE[key] = cached
-    return cached
+
+
+def _resolve_method(
+    method: str,
+    grid: List[List[int]],
+    robots: int,
+    targets: int,
+    T: int,
+    layers: int = 1,
+) -> str:
+    if (method or "").lower() != "auto":
+        return method
+    active_cells = _get_grid_cache(grid)["num_passable"] * layers
+    return resolve_method(method, active_cells, robots, targets, T)
 
 
 def _bfs_multi_source(grid_cache: Dict, sources: List[Tuple[int, int]], use_cache: bool = True) -> List[int]:
-    width = grid_cache["width"]
-    height = grid_cache["height"]
-    neighbors = grid_cache["neighbors"]
-    passable = grid_cache["passable"]
-    n = width * height
+    n = grid_cache["width"] * grid_cache["height"]
     if not sources:
         return [-1] * n
     src_key = tuple(sorted(sources))
@@ -100,30 +127,143 @@ def _bfs_multi_source(grid_cache: Dict, sources: List[Tuple[int, int]], use_cach
         cached = _DIST_CACHE.get(cache_key)
         if cached is not None:
             return cached
-    dist = [-1] * n
-    q = deque()
-    for x, y in sources:
-        if x < 0 or y < 0 or x >= width or y >= height:
-            raise ValueError(f"Source out of bounds: {(x, y)}")
-        idx = y * width + x
-        if not passable[idx]:
-            raise ValueError(f"Source on blocked cell: {(x, y)}")
-        if dist[idx] == 0:
-            continue
-        dist[idx] = 0
-        q.append(idx)
-    while q:
-        cur = q.popleft()
-        for nb in neighbors[cur]:
-            if dist[nb] != -1:
-                continue
-            dist[nb] = dist[cur] + 1
-            q.append(nb)
+    dist = grid_cache["bits"].distances(list(src_key))
     if use_cache:
-        _DIST_CACHE[cache_key] = dist
+        _DIST_CACHE.put(cache_key, dist)
     return dist
 
 
+def _nearest_distances(
+    grid: List[List[int]],
+    sources: List[Tuple[int, int]],
+    cells: List[Tuple[int, int]],
+    oracle: Optional[DistanceOracle] = None,
+    use_cache: bool = True,
+) -> List[int]:
+    """Distance from each of ``cells`` to its nearest source; -1 if unreachable.
+
+    Looked up in ``oracle`` when it holds every source, otherwise by BFS.
+    """
+    if oracle is not None and oracle.covers(sources):
+        return oracle.distances_to(sources, cells)
+    grid_cache = _get_grid_cache(grid)
+    dist = _bfs_multi_source(grid_cache, sources, use_cache=use_cache)
+    width = grid_cache["width"]
+    return [dist[y * width + x] for x, y in cells]
+
+
+def _start_target_distances(
+    grid: List[List[int]],
+    starts: List[Tuple[int, int]],
+    targets: List[Tuple[int, int]],
+    oracle: Optional[DistanceOracle] = None,
+) -> List[List[int]]:
+    """``[i][j]`` = distance from ``starts[i]`` to ``targets[j]``; -1 if unreachable."""
+    if oracle is not None and oracle.covers(targets):
+        return [list(row) for row in zip(*oracle.distance_matrix(targets, starts))]
+    bits = _get_grid_cache(grid)["bits"]
+    width = bits.width
+    out = []
+    for start in starts:
+        dist = bits.distances([start])
+        out.append([dist[y * width + x] for x, y in targets])
+    return out
+
+
+def _has_matching(adj: List[List[int]]) -> bool:
+    """True if every left vertex can be matched to a distinct right vertex (Kuhn)."""
+    owner: Dict[int, int] = {}
+
+    def augment(i: int, seen: set) -> bool:
+        for j in adj[i]:
+            if j in seen:
+                continue
+            seen.add(j)
+            if j not in owner or augment(owner[j], seen):
+                owner[j] = i
+                return True
+        return False
+
+    return all(augment(i, set()) for i in range(len(adj)))
+
+
+def candidate_targets(
+    grid: List[List[int]],
+    starts: List[Tuple[int, int]],
+    targets: List[Tuple[int, int]],
+    k: int,
+    oracle: Optional[DistanceOracle] = None,
+    onward: Optional[List[int]] = None,
+) -> List[Tuple[int, int]]:
+    """Union of the ``k`` nearest reachable targets of each start, in ``targets`` order.
+
+    ``onward[j]`` (if given) is added to the distance of ``targets[j]`` when
+    ranking, e.g. the pickup-to-drop leg in the sync model; -1 drops the
+    target. ``k`` is doubled until every start can be matched to a distinct
+    reachable candidate (Hall's condition), which the unit-capacity target
+    stage needs. Returns all targets when the subset would not be smaller.
+    """
+    if k <= 0 or len(targets) <= k or not starts:
+        return list(targets)
+    if onward is None:
+        onward = [0] * len(targets)
+    ranked = [
+        sorted((d + onward[j], j) for j, d in enumerate(row) if d >= 0 and onward[j] >= 0)
+        for row in _start_target_distances(grid, starts, targets, oracle)
+    ]
+    if any(not r for r in ranked):
+        # Some start reaches no target at all; leave the verdict to the planner.
+        return list(targets)
+    longest = max(len(r) for r in ranked)
+    while True:
+        chosen = {j for r in ranked for _, j in r[:k]}
+        adj = [[j for _, j in r if j in chosen] for r in ranked]
+        if k >= longest or _has_matching(adj):
+            break
+        k *= 2
+    if len(chosen) >= len(targets):
+        return list(targets)
+    return [t for j, t in enumerate(targets) if j in chosen]
+
+
+def _plan_on_candidates(
+    plan,
+    grid: List[List[int]],
+    starts: List[Tuple[int, int]],
+    pickup_points: List[Tuple[int, int]],
+    candidate_k: Optional[int],
+    oracle: Optional[DistanceOracle],
+    deadline_s: Optional[float],
+    search_info: Optional[Dict],
+    onward: Optional[List[int]] = None,
+):
+    """Run ``plan(pickups, deadline_s, info)`` on candidate pickups, widening on failure.
+
+    A search that finds no plan on a strict subset is retried with twice the
+    candidates per start, ending with every pickup, so pruning never turns a
+    feasible round infeasible. ``deadline_s`` covers all attempts.
+    """
+    if not candidate_k or candidate_k <= 0:
+        return plan(pickup_points, deadline_s, search_info)
+    deadline = _deadline_at(deadline_s)
+    start = time.monotonic()
+    k = candidate_k
+    while True:
+        subset = candidate_targets(grid, starts, pickup_points, k, oracle, onward)
+        strict = len(subset) < len(pickup_points)
+        left = None if deadline is None else max(0.0, deadline - time.monotonic())
+        info: Dict = {}
+        result = plan(subset if strict else pickup_points, left, info)
+        if result[0] is not None or not strict or info.get("status") == "timeout":
+            break
+        k *= 2
+    if search_info is not None:
+        search_info.update(info)
+        search_info["elapsed_s"] = time.monotonic() - start
+        search_info["candidates"] = len(subset)
+    return result
+
+
 def build_reserved_vertices(paths: List[List[Tuple[int, int]]]) -> List[Tuple[int, int, int]]:
     reserved = []
     for path in paths:
@@ -144,57 +284,305 @@ def build_reserved_edges(paths: List[List[Tuple[int, int]]]) -> List[Tuple[int,
     return reserved
 
 
-def _find_min_T_single(
-    grid: List[List[int]],
-    starts: List[Tuple[int, int]],
-    targets: List[Tuple[int, int]],
-    caps: List[int],
-    reserved_v: List[Tuple[int, int, int]],
-    reserved_e: List[Tuple[int, int, int, int, int]],
-    T_max: int,
-    method: str = "dinic",
-    verbose: bool = False,
-):
-    if not starts:
-        return 0, []
-    if T_max < 0:
-        return None, []
+class _SearchCancelled(Exception):
+    """Raised by a flow probe whose ``CancelToken`` was cancelled (its result is no longer needed)."""
 
-    def feasible(T: int):
-        if verbose:
-            print(f"[flow] T={T}")
-        res = flow_planner_cpp.plan_flow(grid, starts, targets, caps, T, reserved_v, reserved_e, method)
-        return res["feasible"], res["paths"]
 
-    low = 0
-    high = 1
-    best_paths = []
+def _run_orders(plan_order, pool: Optional[ThreadPoolExecutor] = None):
+    """Try loaded-first, then empty-first; ``plan_order(first_loaded, cancel)``.
+
+    With a ``pool`` both orderings run concurrently (the C++ calls release the
+    GIL). Loaded-first still wins whenever it is feasible, so the plan matches
+    the serial order; the empty-first search is then cancelled, including its
+    in-flight flow call.
+    """
+    if pool is None:
+        result = plan_order(True, None)
+        if result[0]:
+            return result
+        return plan_order(False, None)
+
+    cancel = flow_planner_cpp.CancelToken()
+
+    def run(first_loaded: bool):
+        try:
+            return plan_order(first_loaded, cancel)
+        except _SearchCancelled:
+            return None
+
+    loaded_first = pool.submit(run, True)
+    empty_first = pool.submit(run, False)
+    try:
+        # ``None`` is a cancelled ordering; it gives no plan.
+        result = loaded_first.result()
+        if result is not None and result[0]:
+            return result
+        result = empty_first.result()
+        if result is None:
+            raise _SearchCancelled()
+        return result
+    finally:
+        # Whatever ends the wait (a plan, an error), the other ordering's work is moot.
+        cancel.cancel()
+
+
+class _DeadlineExceeded(Exception):
+    """Raised by a flow probe once the search's wall-clock budget is spent."""
+
+
+def _deadline_at(deadline_s: Optional[float]) -> Optional[float]:
+    """Absolute ``time.monotonic()`` deadline for a budget in seconds; None means unbounded."""
+    if deadline_s is None:
+        return None
+    return time.monotonic() + max(0.0, deadline_s)
+
+
+def _time_left(deadline: Optional[float]) -> Optional[float]:
+    """Seconds left to pass as ``deadline_s``; raises ``_DeadlineExceeded`` once it has passed."""
+    if deadline is None:
+        return None
+    left = deadline - time.monotonic()
+    if left <= 0:
+        raise _DeadlineExceeded()
+    return left
+
+
+def _check_stopped(res) -> None:
+    if res["cancelled"]:
+        raise _SearchCancelled()
+    if res["timed_out"]:
+        raise _DeadlineExceeded()
+
+
+class _Incumbent:
+    """Smallest feasible T probed so far; probes may report from several threads."""
+
+    def __init__(self, empty):
+        self._lock = threading.Lock()
+        self.T: Optional[int] = None
+        self.result = empty
+
+    def offer(self, T: int, result) -> None:
+        with self._lock:
+            if self.T is None or T < self.T:
+                self.T = T
+                self.result = result
+
+
+def _run_anytime(search, incumbent: _Incumbent, info: Optional[Dict]):
+    """Run ``search()`` -> ``(T, result)``, falling back to the incumbent on deadline.
+
+    ``info["status"]`` is ``"optimal"`` (T proven minimal), ``"infeasible"``
+    (no T up to T_max), ``"feasible"`` (deadline hit; plan at a T that may not
+    be minimal) or ``"timeout"`` (deadline hit before any feasible probe).
+    ``info["elapsed_s"]`` is the wall time of the search.
+    """
+    start = time.monotonic()
+    try:
+        T, result = search()
+        status = "infeasible" if T is None else "optimal"
+    except _DeadlineExceeded:
+        T, result = incumbent.T, incumbent.result
+        status = "timeout" if T is None else "feasible"
+    if info is not None:
+        info["status"] = status
+        info["elapsed_s"] = time.monotonic() - start
+    return T, result
+
+
+T_POLICIES = ("double", "flow")
+
+
+def _search_min_feasible(probe, T_max: int, empty, T_low: int = 0):
+    """Smallest feasible T in ``[T_low, T_max]`` by doubling, then bisection.
+
+    ``probe(T)`` returns ``(ok, result)``; the search returns ``(T, result)``
+    or ``(None, empty)`` when even ``T_max`` is infeasible.
+    """
+    if T_low > T_max:
+        return None, empty
+    low = T_low
+    high = max(1, T_low)
+    best = empty
 
     while high <= T_max:
-        ok, paths = feasible(high)
+        ok, result = probe(high)
         if ok:
-            best_paths = paths
+            best = result
             break
         low = high + 1
         high *= 2
 
     if high > T_max:
-        ok, paths = feasible(T_max)
+        if low > T_max:
+            return None, empty
+        ok, result = probe(T_max)
         if not ok:
-            return None, []
+            return None, empty
         high = T_max
-        best_paths = paths
+        best = result
+
+    # ``high`` is known feasible; bisect below it.
+    high -= 1
+    while low <= high:
+        mid = (low + high) // 2
+        ok, result = probe(mid)
+        if ok:
+            best = result
+            high = mid - 1
+        else:
+            low = mid + 1
 
+    return low, best
+
+
+def _next_T_from_flow(history: List[Tuple[int, int]], need: int, T_max: int) -> int:
+    """Next probe after infeasible probes ``history`` = [(T, flow), ...] (increasing T).
+
+    The routed-robot count is extrapolated linearly in T to where it reaches
+    ``need``: through the two latest probes, or through the origin with a
+    single probe. Steps are at least one and at most a doubling, so a poor fit
+    costs no more than the plain doubling search.
+    """
+    T_last, flow_last = history[-1]
+    guess = None
+    if len(history) >= 2:
+        T_prev, flow_prev = history[-2]
+        if flow_last > flow_prev and T_last > T_prev:
+            slope = (flow_last - flow_prev) / (T_last - T_prev)
+            guess = T_last + math.ceil((need - flow_last) / slope)
+    elif flow_last > 0 and T_last > 0:
+        guess = math.ceil(T_last * need / flow_last)
+    ceiling = 2 * max(T_last, 1)
+    if guess is None:
+        guess = ceiling
+    return min(T_max, max(T_last + 1, min(guess, ceiling)))
+
+
+def _search_min_feasible_flow(probe, need: int, T_max: int, empty, T_low: int = 0, T_hint: Optional[int] = None):
+    """Smallest feasible T, stepping up by the max-flow deficit instead of doubling.
+
+    ``probe(T)`` returns ``(ok, flow, result)``. The first probe is ``T_low``
+    (callers pass a distance lower bound) or ``T_hint`` when given, e.g. the
+    previous round's makespan. After the first feasible probe it bisects.
+    """
+    if T_low > T_max:
+        return None, empty
+    low = T_low
+    T = low if T_hint is None else min(T_max, max(low, T_hint))
+    history: List[Tuple[int, int]] = []
+    while True:
+        ok, flow, result = probe(T)
+        if ok:
+            best = result
+            break
+        low = T + 1
+        if T >= T_max:
+            return None, empty
+        history.append((T, flow))
+        T = _next_T_from_flow(history, need, T_max)
+
+    high = T - 1
     while low <= high:
         mid = (low + high) // 2
-        ok, paths = feasible(mid)
+        ok, _, result = probe(mid)
         if ok:
-            best_paths = paths
+            best = result
             high = mid - 1
         else:
             low = mid + 1
 
-    return low, best_paths
+    return low, best
+
+
+def _distance_lower_bound(grid: List[List[int]], starts: List[Tuple[int, int]], targets: List[Tuple[int, int]]):
+    """max_i dist(start_i, nearest target); None when some start cannot reach any target."""
+    grid_cache = _get_grid_cache(grid)
+    dist = _bfs_multi_source(grid_cache, targets)
+    width = grid_cache["width"]
+    bound = 0
+    for x, y in starts:
+        d = dist[y * width + x]
+        if d < 0:
+            return None
+        bound = max(bound, d)
+    return bound
+
+
+def _drop_flow(probe_result):
+    ok, _, result = probe_result
+    return ok, result
+
+
+def _find_min_T_single(
+    grid: List[List[int]],
+    starts: List[Tuple[int, int]],
+    targets: List[Tuple[int, int]],
+    caps: List[int],
+    reserved_v: List[Tuple[int, int, int]],
+    reserved_e: List[Tuple[int, int, int, int, int]],
+    T_max: int,
+    method: str = "dinic",
+    verbose: bool = False,
+    compact: bool = False,
+    T_low: int = 0,
+    cancel: Optional[flow_planner_cpp.CancelToken] = None,
+    t_policy: str = "double",
+    T_hint: Optional[int] = None,
+    deadline: Optional[float] = None,
+):
+    if not starts:
+        return 0, []
+    if T_max < 0 or T_low > T_max:
+        return None, []
+
+    def probe(T: int):
+        if cancel is not None and cancel.cancelled:
+            raise _SearchCancelled()
+        if verbose:
+            print(f"[flow] T={T}")
+        engine = _resolve_method(method, grid, len(starts), len(targets), T)
+        res = flow_planner_cpp.plan_flow(
+            grid, starts, targets, caps, T, reserved_v, reserved_e, engine, compact,
+            deadline_s=_time_left(deadline), cancel_token=cancel,
+        )
+        _check_stopped(res)
+        return res["feasible"], res["flow"], res["paths"]
+
+    if t_policy == "flow":
+        bound = _distance_lower_bound(grid, starts, targets)
+        if bound is None:
+            return None, []
+        return _search_min_feasible_flow(probe, len(starts), T_max, [], max(T_low, bound), T_hint)
+    return _search_min_feasible(lambda T: _drop_flow(probe(T)), T_max, [], T_low)
+
+
+def _stage_min_T(stage_cache: Optional[Dict], key: Tuple, T_cap: int, solve):
+    """Minimum-T stage solve, memoised across the outer makespan search.
+
+    Stage feasibility is monotone in T, so one entry per (stage, reservations)
+    key answers every cap: either the minimum T with its paths, or the largest
+    cap proven infeasible (later probes resume the search above it).
+    ``solve(T_low, T_cap)`` returns ``(T, result)`` with ``T=None`` when infeasible.
+    """
+    if stage_cache is None:
+        return solve(0, T_cap)
+    T_low = 0
+    entry = stage_cache.get(key)
+    if entry is not None:
+        if entry["T"] is not None:
+            if entry["T"] <= T_cap:
+                return entry["T"], entry["result"]
+            return None, None
+        if T_cap <= entry["infeasible_upto"]:
+            return None, None
+        T_low = entry["infeasible_upto"] + 1
+    T_min, result = solve(T_low, T_cap)
+    if T_min is None:
+        stage_cache[key] = {"T": None, "infeasible_upto": T_cap}
+    else:
+        stage_cache[key] = {"T": T_min, "result": result}
+    return T_min, result
 
 
 def _plan_with_order(
@@ -206,6 +594,11 @@ def _plan_with_order(
     T: int,
     first_loaded: bool,
     method: str = "dinic",
+    stage_cache: Optional[Dict] = None,
+    cancel: Optional[flow_planner_cpp.CancelToken] = None,
+    t_policy: str = "double",
+    T_hint: Optional[int] = None,
+    deadline: Optional[float] = None,
 ):
     loaded = [r for r in robots if r.state == "Loaded"]
     empty = [r for r in robots if r.state == "Empty"]
@@ -214,15 +607,25 @@ def _plan_with_order(
     def plan_loaded(reserved_v, reserved_e):
         if not loaded:
             return True, [], [], []
-        t_loaded, paths_loaded = _find_min_T_single(
-            grid,
-            [r.pos for r in loaded],
-            drop_points,
-            drop_caps_list,
-            reserved_v,
-            reserved_e,
+        t_loaded, paths_loaded = _stage_min_T(
+            stage_cache,
+            ("loaded", tuple(reserved_v), tuple(reserved_e)),
             T,
-            method=method,
+            lambda T_low, T_cap: _find_min_T_single(
+                grid,
+                [r.pos for r in loaded],
+                drop_points,
+                drop_caps_list,
+                reserved_v,
+                reserved_e,
+                T_cap,
+                method=method,
+                T_low=T_low,
+                cancel=cancel,
+                t_policy=t_policy,
+                T_hint=T_hint,
+                deadline=deadline,
+            ),
         )
         if t_loaded is None:
             return False, [], [], []
@@ -231,15 +634,25 @@ def _plan_with_order(
     def plan_empty(reserved_v, reserved_e):
         if not empty:
             return True, []
-        t_empty, paths_empty = _find_min_T_single(
-            grid,
-            [r.pos for r in empty],
-            pickup_points,
-            [1] * len(pickup_points),
-            reserved_v,
-            reserved_e,
+        t_empty, paths_empty = _stage_min_T(
+            stage_cache,
+            ("empty", tuple(reserved_v), tuple(reserved_e)),
             T,
-            method=method,
+            lambda T_low, T_cap: _find_min_T_single(
+                grid,
+                [r.pos for r in empty],
+                pickup_points,
+                [1] * len(pickup_points),
+                reserved_v,
+                reserved_e,
+                T_cap,
+                method=method,
+                T_low=T_low,
+                cancel=cancel,
+                t_policy=t_policy,
+                T_hint=T_hint,
+                deadline=deadline,
+            ),
         )
         if t_empty is None:
             return False, []
@@ -285,13 +698,15 @@ def explain_infeasible(
     loaded_only = True
     empty_only = True
     if loaded:
+        engine = _resolve_method(method, grid, len(loaded), len(drop_points), T)
         res_l = flow_planner_cpp.plan_flow(
-            grid, [r.pos for r in loaded], drop_points, drop_caps_list, T, [], [], method
+            grid, [r.pos for r in loaded], drop_points, drop_caps_list, T, [], [], engine
         )
         loaded_only = res_l["feasible"]
     if empty:
+        engine = _resolve_method(method, grid, len(empty), len(pickup_points), T)
         res_e = flow_planner_cpp.plan_flow(
-            grid, [r.pos for r in empty], pickup_points, [1] * len(pickup_points), T, [], [], method
+            grid, [r.pos for r in empty], pickup_points, [1] * len(pickup_points), T, [], [], engine
         )
         empty_only = res_e["feasible"]
     ok1, _, reason1 = _plan_with_order(grid, robots, pickup_points, drop_points, drop_caps, T, True, method)
@@ -353,63 +768,232 @@ def search_min_T(
     drop_caps: Dict[Tuple[int, int], int],
     T_max: int,
     method: str = "dinic",
+    concurrent_orders: bool = False,
+    t_policy: str = "double",
+    T_hint: Optional[int] = None,
+    deadline_s: Optional[float] = None,
+    search_info: Optional[Dict] = None,
 ):
-    loaded = [r for r in robots if r.state == "Loaded"]
-    empty = [r for r in robots if r.state == "Empty"]
+    """Minimum-makespan two-stage plan: ``(T, paths)`` or ``(None, {})``.
+
+    ``deadline_s`` bounds the wall time: on expiry the smallest feasible T
+    probed so far is returned, possibly above the optimum. The outcome is
+    written to ``search_info`` (see ``_run_anytime``).
+    """
+    if t_policy not in T_POLICIES:
+        raise ValueError(f"Unknown t_policy: {t_policy}")
+    if T_max < 0:
+        return _run_anytime(lambda: (None, {}), _Incumbent({}), search_info)
 
-    drop_caps_list = [drop_caps.get(p, 1) for p in drop_points]
+    deadline = _deadline_at(deadline_s)
+    incumbent = _Incumbent({})
+
+    # Stage results are reused across outer T probes (see _stage_min_T). With the
+    # "flow" policy stage searches start at a distance lower bound, so outer
+    # probes below it cost no flow call.
+    stage_cache: Dict = {}
+    pool = ThreadPoolExecutor(max_workers=2) if concurrent_orders else None
 
     def try_T(T: int):
-        ok, paths, _ = _plan_with_order(grid, robots, pickup_points, drop_points, drop_caps, T, True, method)
+        ok, paths, _ = _run_orders(
+            lambda first_loaded, cancel: _plan_with_order(
+                grid, robots, pickup_points, drop_points, drop_caps, T, first_loaded, method,
+                stage_cache, cancel, t_policy, T_hint, deadline,
+            ),
+            pool,
+        )
         if ok:
-            return True, paths
-        ok, paths, _ = _plan_with_order(grid, robots, pickup_points, drop_points, drop_caps, T, False, method)
+            incumbent.offer(T, paths)
         return ok, paths
 
-    if T_max < 0:
-        return None, {}
+    try:
+        return _run_anytime(lambda: _search_min_feasible(try_T, T_max, {}), incumbent, search_info)
+    finally:
+        if pool is not None:
+            pool.shutdown(wait=False)
 
-    low = 0
-    high = 1
-    best_paths: Dict[int, List[Tuple[int, int]]] = {}
 
-    while high <= T_max:
-        ok, paths = try_T(high)
-        if ok:
-            best_paths = paths
-            break
-        low = high + 1
-        high *= 2
+def plan_round(
+    grid: List[List[int]],
+    robots: List[RobotState],
+    pickup_points: List[Tuple[int, int]],
+    drop_points: List[Tuple[int, int]],
+    drop_caps: Dict[Tuple[int, int], int],
+    T_max: int,
+    method: str = "dinic",
+    concurrent_orders: bool = False,
+    t_policy: str = "double",
+    T_hint: Optional[int] = None,
+    deadline_s: Optional[float] = None,
+    search_info: Optional[Dict] = None,
+    candidate_k: Optional[int] = None,
+):
+    """``candidate_k`` restricts pickups as in ``candidate_targets``, widening on failure."""
+    return _plan_on_candidates(
+        lambda pickups, budget, info: search_min_T(
+            grid, robots, pickups, drop_points, drop_caps, T_max, method=method,
+            concurrent_orders=concurrent_orders, t_policy=t_policy, T_hint=T_hint,
+            deadline_s=budget, search_info=info,
+        ),
+        grid, [r.pos for r in robots if r.state == "Empty"], pickup_points, candidate_k, None,
+        deadline_s, search_info,
+    )
 
-    if high > T_max:
-        ok, paths = try_T(T_max)
-        if not ok:
-            return None, {}
-        high = T_max
-        best_paths = paths
 
-    while low <= high:
-        mid = (low + high) // 2
-        ok, paths = try_T(mid)
-        if ok:
-            best_paths = paths
-            high = mid - 1
-        else:
-            low = mid + 1
+def _last_move(path: List[Tuple[int, int]]) -> int:
+    """Index after which ``path`` only waits in place."""
+    t = len(path) - 1
+    while t > 0 and path[t] == path[t - 1]:
+        t -= 1
+    return max(t, 0)
+
+
+def _replan_subset(
+    grid: List[List[int]],
+    robots: List[RobotState],
+    fixed_paths: Dict[int, List[Tuple[int, int]]],
+    pickup_points: List[Tuple[int, int]],
+    drop_points: List[Tuple[int, int]],
+    drop_caps: Dict[Tuple[int, int], int],
+    T_max: int,
+    method: str = "dinic",
+    t_policy: str = "double",
+    deadline: Optional[float] = None,
+):
+    """Two-stage plan (Loaded first) for ``robots`` around the fixed paths.
+
+    Fixed robots keep their paths and then wait at the last cell, so they are
+    reserved up to ``T_max``. Repaired robots use ``compact`` targets (they
+    park instead of leaving the network) so every plan can be padded. A
+    stage whose parked robots would be run into by a later reserved move is
+    re-solved from the last such move, where nothing moves any more.
+    Returns ``(T, paths)`` or ``(None, {})``.
+    """
+    moving = [p for p in fixed_paths.values()]
+    loaded = [r for r in robots if r.state == "Loaded"]
+    empty = [r for r in robots if r.state == "Empty"]
+    planned: Dict[int, List[Tuple[int, int]]] = {}
+    # A parked robot fills its target cell, so compact drops take one robot
+    # each whatever their capacity (plan_flow rejects caps above 1).
+    stages = (
+        (loaded, drop_points, [min(drop_caps.get(p, 1), 1) for p in drop_points]),
+        (empty, pickup_points, [1] * len(pickup_points)),
+    )
+    for group, targets, caps in stages:
+        if not group:
+            continue
+        reserved_paths = [pad_path(p, T_max) for p in moving]
+        reserved_v = build_reserved_vertices(reserved_paths)
+        reserved_e = build_reserved_edges(reserved_paths)
+        horizon = max((_last_move(p) for p in moving), default=0)
+        T_low = 0
+        while True:
+            t_stage, paths = _find_min_T_single(
+                grid,
+                [r.pos for r in group],
+                targets,
+                caps,
+                reserved_v,
+                reserved_e,
+                T_max,
+                method=method,
+                compact=True,
+                T_low=T_low,
+                t_policy=t_policy,
+                deadline=deadline,
+            )
+            if t_stage is None:
+                return None, {}
+            parked = {path[-1] for path in paths}
+            if t_stage >= horizon or not any(
+                p[t] in parked for p in moving for t in range(t_stage + 1, min(len(p), _last_move(p) + 1))
+            ):
+                break
+            T_low = horizon
+        for robot, path in zip(group, paths):
+            planned[robot.id] = path
+            moving.append(path)
 
-    return low, best_paths
+    T = max((len(p) - 1 for p in moving), default=0)
+    out = {rid: pad_path(path, T) for rid, path in fixed_paths.items()}
+    out.update({rid: pad_path(path, T) for rid, path in planned.items()})
+    return T, out
 
 
-def plan_round(
+def repair_round(
     grid: List[List[int]],
     robots: List[RobotState],
+    kept_paths: Dict[int, List[Tuple[int, int]]],
     pickup_points: List[Tuple[int, int]],
     drop_points: List[Tuple[int, int]],
     drop_caps: Dict[Tuple[int, int], int],
     T_max: int,
     method: str = "dinic",
+    t_policy: str = "double",
+    radius: int = 2,
+    deadline_s: Optional[float] = None,
+    search_info: Optional[Dict] = None,
 ):
-    return search_min_T(grid, robots, pickup_points, drop_points, drop_caps, T_max, method=method)
+    """Re-plan only the robots without a path in ``kept_paths``.
+
+    ``kept_paths`` maps a robot id to its still-valid remaining path (index
+    0 = now). Other robots are planned around these paths, together with
+    the kept robots within ``radius`` (Manhattan) of one of them; kept
+    Empty robots keep their pickup. When the repair is infeasible the radius
+    doubles. Returns ``(T, paths)`` for every robot, or ``(None, {})`` once
+    the neighbourhood would cover the whole fleet or the deadline passes;
+    the caller then falls back to a fleet-wide ``plan_round``. The repaired
+    T is not minimal, so the status is ``"feasible"``.
+    """
+    info = search_info if search_info is not None else {}
+    deadline = _deadline_at(deadline_s)
+    height = len(grid)
+    width = len(grid[0]) if height > 0 else 0
+    changed = [r for r in robots if r.id not in kept_paths]
+    info["replanned"] = 0
+    if not changed:
+        T = max((len(p) - 1 for p in kept_paths.values()), default=0)
+        info["status"] = "feasible"
+        return T, {rid: pad_path(p, T) for rid, p in kept_paths.items()}
+    tried = None
+
+    while True:
+        released = {
+            r.id
+            for r in robots
+            if r.id in kept_paths
+            and any(abs(r.pos[0] - c.pos[0]) + abs(r.pos[1] - c.pos[1]) <= radius for c in changed)
+        }
+        replan = changed + [r for r in robots if r.id in released]
+        if len(replan) == len(robots):
+            break
+        if released == tried:
+            radius = max(1, radius * 2)
+            continue
+        tried = released
+        fixed = {r.id: kept_paths[r.id] for r in robots if r.id in kept_paths and r.id not in released}
+        claimed = {fixed[r.id][-1] for r in robots if r.id in fixed and r.state == "Empty"}
+        pickups = [p for p in pickup_points if p not in claimed]
+        # A fixed robot never moves after its last step, so one grid crossing
+        # past that bounds a repair that is worth keeping.
+        cap = min(T_max, max((_last_move(p) for p in fixed.values()), default=0) + width + height)
+        try:
+            T, paths = _replan_subset(
+                grid, replan, fixed, pickups, drop_points, drop_caps, cap,
+                method=method, t_policy=t_policy, deadline=deadline,
+            )
+        except _DeadlineExceeded:
+            info["status"] = "timeout"
+            return None, {}
+        if T is not None:
+            info["status"] = "feasible"
+            info["replanned"] = len(replan)
+            info["radius"] = radius
+            return T, paths
+        radius = max(1, radius * 2)
+
+    info["status"] = "infeasible"
+    return None, {}
 
 
 def search_min_T_sync(
@@ -424,6 +1008,60 @@ def search_min_T_sync(
     parallel_T_workers: int = 1,
     verbose: bool = False,
     progress_every: int = 25,
+    t_policy: str = "double",
+    deadline_s: Optional[float] = None,
+    search_info: Optional[Dict] = None,
+    pool: Optional[PlannerPool] = None,
+    oracle: Optional[DistanceOracle] = None,
+):
+    """Minimum-makespan synchronous plan: ``(T, tau, paths)`` or ``(None, None, {})``.
+
+    ``deadline_s`` and ``search_info`` behave as in ``search_min_T``. Probes
+    run on ``pool`` when one is given (callers planning many rounds keep one
+    alive); otherwise ``parallel_workers > 1`` starts a pool for this call.
+    ``oracle`` (a ``DistanceOracle`` over the map's shelves and goals)
+    replaces the per-call BFS for the tau bounds.
+    """
+    if t_policy not in T_POLICIES:
+        raise ValueError(f"Unknown t_policy: {t_policy}")
+    deadline = _deadline_at(deadline_s)
+    incumbent = _Incumbent((None, {}))
+
+    def run(probe_pool: Optional[PlannerPool]):
+        return _search_min_T_sync(
+            grid, robots, pickup_points, drop_points, drop_caps, T_max, method,
+            parallel_T_workers, verbose, progress_every, t_policy,
+            deadline, incumbent, probe_pool, oracle,
+        )
+
+    def search():
+        if pool is None and parallel_workers > 1:
+            with PlannerPool(parallel_workers) as own_pool:
+                T, tau, paths = run(own_pool)
+        else:
+            T, tau, paths = run(pool)
+        return T, (tau, paths)
+
+    T, (tau, paths) = _run_anytime(search, incumbent, search_info)
+    return T, tau, paths
+
+
+def _search_min_T_sync(
+    grid: List[List[int]],
+    robots: List[RobotState],
+    pickup_points: List[Tuple[int, int]],
+    drop_points: List[Tuple[int, int]],
+    drop_caps: Dict[Tuple[int, int], int],
+    T_max: int,
+    method: str,
+    parallel_T_workers: int,
+    verbose: bool,
+    progress_every: int,
+    t_policy: str,
+    deadline: Optional[float],
+    incumbent: _Incumbent,
+    pool: Optional[PlannerPool],
+    oracle: Optional[DistanceOracle],
 ):
     if not robots:
         return 0, 0, {}
@@ -433,134 +1071,215 @@ def search_min_T_sync(
     starts = [r.pos for r in robots]
     drop_caps_list = [drop_caps.get(p, 1) for p in drop_points]
 
-    grid_cache = _get_grid_cache(grid)
-    dist_to_pick = _bfs_multi_source(grid_cache, pickup_points, use_cache=False)
-    dist_to_drop = _bfs_multi_source(grid_cache, drop_points, use_cache=True)
-
-    width = grid_cache["width"]
-    tau_min = 0
-    for sx, sy in starts:
-        idx = sy * width + sx
-        if dist_to_pick[idx] < 0:
-            return None, None, {}
-        tau_min = max(tau_min, dist_to_pick[idx])
+    start_to_pick = _nearest_distances(grid, pickup_points, starts, oracle, use_cache=False)
+    if any(d < 0 for d in start_to_pick):
+        return None, None, {}
+    tau_min = max(start_to_pick)
 
-    pickup_drop_dists = []
-    for px, py in pickup_points:
-        idx = py * width + px
-        if dist_to_drop[idx] >= 0:
-            pickup_drop_dists.append(dist_to_drop[idx])
-    pickup_drop_dists.sort()
+    pickup_drop_dists = sorted(
+        d for d in _nearest_distances(grid, drop_points, pickup_points, oracle) if d >= 0
+    )
     if len(pickup_drop_dists) < len(robots):
         return None, None, {}
     min_drop_needed = pickup_drop_dists[len(robots) - 1]
 
-    total_workers = max(1, parallel_workers)
-    t_workers = max(1, min(parallel_T_workers, total_workers))
-
-    def _tau_workers_for(active_Ts: int, t_parallel: bool) -> int:
-        if active_Ts <= 0:
-            return 0
-        if t_parallel:
-            budget = max(0, total_workers - active_Ts)
-            if budget <= 1:
-                return budget
-            return budget // active_Ts
-        budget = max(0, total_workers - 1)
-        return budget
-
-    def try_T(T: int, tau_workers: int):
+    t_workers = max(1, min(parallel_T_workers, pool.workers if pool is not None else 1))
+
+    # T -> (max flow over the probed taus, tau achieving it); drives t_policy="flow".
+    flow_at: Dict[int, Tuple[int, Optional[int]]] = {}
+
+    def record_flow(T: int, tau: int, res) -> None:
+        best = flow_at.get(T)
+        if best is None or res["flow"] > best[0]:
+            flow_at[T] = (res["flow"], tau)
+
+    def tau_order(T: int, tau_max: int) -> List[int]:
+        """Probe order of T's taus. Only the order is guided: the smallest feasible tau is accepted."""
+        taus = list(range(tau_min, tau_max + 1))
+        if t_policy != "flow":
+            return taus
+        # Start next to the tau that routed the most robots at the nearest smaller T.
+        below = [t for t in flow_at if t < T and flow_at[t][1] is not None]
+        if not below:
+            return taus
+        tau_guess = flow_at[max(below)][1]
+        return sorted(taus, key=lambda tau: (abs(tau - tau_guess), tau))
+
+    def probe(T: int, tau: int, engine: str, token: Optional[flow_planner_cpp.CancelToken] = None):
+        return flow_planner_cpp.plan_flow_sync(
+            grid, starts, pickup_points, drop_points, drop_caps_list, T, tau, engine,
+            deadline_s=_time_left(deadline), cancel_token=token,
+        )
+
+    def accept(T: int, tau: int, res):
+        paths_by_id: Dict[int, List[Tuple[int, int]]] = {}
+        for robot, path in zip(robots, res["paths"]):
+            paths_by_id[robot.id] = pad_path(path, T)
+        incumbent.offer(T, (tau, paths_by_id))
+        return True, tau, paths_by_id
+
+    def try_T(T: int):
         tau_max = T - min_drop_needed
         if tau_max < tau_min:
             return False, None, {}
         if verbose:
             print(f"[sync-search] T={T}/{T_max} tau={tau_min}..{tau_max}")
-        if tau_workers <= 1:
-            for tau in range(tau_min, tau_max + 1):
-                if verbose and progress_every > 0 and tau % progress_every == 0 and tau != 0:
-                    print(f"[sync-search] T={T} tau={tau}/{T}")
-                res = flow_planner_cpp.plan_flow_sync(
-                    grid, starts, pickup_points, drop_points, drop_caps_list, T, tau, method
-                )
-                if not res["feasible"]:
-                    continue
-                paths_by_id: Dict[int, List[Tuple[int, int]]] = {}
-                for robot, path in zip(robots, res["paths"]):
-                    paths_by_id[robot.id] = pad_path(path, T)
-                return True, tau, paths_by_id
+        engine = _resolve_method(method, grid, len(starts), len(pickup_points) + len(drop_points), T)
+        probed = set()
+        found = None
+        for tau in tau_order(T, tau_max):
+            if verbose and progress_every > 0 and tau % progress_every == 0 and tau != 0:
+                print(f"[sync-search] T={T} tau={tau}/{T}")
+            res = probe(T, tau, engine)
+            _check_stopped(res)
+            record_flow(T, tau, res)
+            probed.add(tau)
+            if res["feasible"]:
+                found = (tau, res)
+                break
+        if found is None:
             return False, None, {}
+        # A guided order finds a witness sooner; smaller taus it skipped still come first.
+        for tau in range(tau_min, found[0]):
+            if tau in probed:
+                continue
+            res = probe(T, tau, engine)
+            _check_stopped(res)
+            record_flow(T, tau, res)
+            if res["feasible"]:
+                return accept(T, tau, res)
+        return accept(T, *found)
 
-        def solve_tau(tau: int):
-            res = flow_planner_cpp.plan_flow_sync(
-                grid, starts, pickup_points, drop_points, drop_caps_list, T, tau, method
-            )
-            return tau, res
-
-        batch_size = max(1, tau_workers)
-        with ThreadPoolExecutor(max_workers=tau_workers) as executor:
-            for batch_start in range(tau_min, tau_max + 1, batch_size):
-                batch_end = min(tau_max + 1, batch_start + batch_size)
-                batch = list(range(batch_start, batch_end))
-                if verbose and progress_every > 0 and batch_start % progress_every == 0 and batch_start != 0:
-                    print(f"[sync-search] T={T} tau={batch_start}/{T}")
-                results = list(executor.map(solve_tau, batch))
-                for tau, res in results:
-                    if not res["feasible"]:
+    def eval_batch(values: List[int]):
+        """Decide the Ts in ``values`` from (T, tau) probes queued on ``pool`` at once.
+
+        Probes run in (tau rank, T) order and each T is settled by walking its
+        taus in ascending order, so the chosen tau is the smallest feasible
+        one, as in the serial scan.
+        Results a decision makes irrelevant are cancelled: the taus above a
+        feasible one, and every T on the decided side of a settled T (larger
+        Ts when it is feasible, smaller when not). Those Ts are left out of
+        the returned dict.
+        """
+        probes: Dict[int, List[Tuple[int, Future, flow_planner_cpp.CancelToken]]] = {}
+        owner: Dict[Future, Tuple[int, int]] = {}
+        for T in values:
+            tau_max = T - min_drop_needed
+            taus = tau_order(T, tau_max) if tau_max >= tau_min else []
+            if verbose and taus:
+                print(f"[sync-search] T={T}/{T_max} tau={tau_min}..{tau_max}")
+            engine = _resolve_method(method, grid, len(starts), len(pickup_points) + len(drop_points), T)
+            probes[T] = []
+            for rank, tau in enumerate(taus):
+                token = flow_planner_cpp.CancelToken()
+                fut = pool.submit(probe, T, tau, engine, token, priority=(rank, T))
+                probes[T].append((tau, fut, token))
+            probes[T].sort(key=lambda entry: entry[0])
+            for index, (_, fut, _) in enumerate(probes[T]):
+                owner[fut] = (T, index)
+
+        def drop(entries) -> None:
+            for _, fut, token in entries:
+                fut.cancel()
+                token.cancel()
+
+        settled = {T: 0 for T in values}  # leading taus of T known to be infeasible
+
+        def settle(T: int):
+            entries = probes[T]
+            while settled[T] < len(entries):
+                tau, fut, _ = entries[settled[T]]
+                if not fut.done():
+                    return None
+                res = fut.result()
+                _check_stopped(res)
+                record_flow(T, tau, res)
+                if res["feasible"]:
+                    return accept(T, tau, res)
+                settled[T] += 1
+            return False, None, {}
+
+        results = {}
+        undecided = set(values)
+        try:
+            while undecided:
+                for T in sorted(undecided):
+                    if T not in undecided:
                         continue
-                    paths_by_id: Dict[int, List[Tuple[int, int]]] = {}
-                    for robot, path in zip(robots, res["paths"]):
-                        paths_by_id[robot.id] = pad_path(path, T)
-                    return True, tau, paths_by_id
-        return False, None, {}
+                    decided = settle(T)
+                    if decided is None:
+                        continue
+                    results[T] = decided
+                    undecided.discard(T)
+                    drop(probes[T])
+                    # Feasibility is monotone in T, so this result decides every
+                    # T on one side of it.
+                    for other in list(undecided):
+                        if (decided[0] and other > T) or (not decided[0] and other < T):
+                            undecided.discard(other)
+                            drop(probes[other])
+                if not undecided:
+                    break
+                running = [fut for T in undecided for _, fut, _ in probes[T] if not fut.done()]
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for fut in done:
+                    if fut.cancelled() or fut.exception() is not None:
+                        continue
+                    if fut.result()["feasible"]:
+                        T, index = owner[fut]
+                        drop(probes[T][index + 1 :])
+        except BaseException:
+            for entries in probes.values():
+                drop(entries)
+            raise
+        return results
+
+    def decide(T: int):
+        if pool is None:
+            return try_T(T)
+        return eval_batch([T])[T]
 
     lower_T = max(tau_min + min_drop_needed, 0)
     if lower_T > T_max:
         return None, None, {}
 
     if t_workers <= 1:
-        tau_workers = _tau_workers_for(1, False)
         if lower_T == 0:
-            ok, tau, paths = try_T(0, tau_workers)
+            ok, tau, paths = decide(0)
             if ok:
                 return 0, tau, paths
         last_fail = lower_T - 1
         high = max(1, lower_T)
+        history: List[Tuple[int, int]] = []
 
         while high <= T_max:
-            ok, tau, paths = try_T(high, tau_workers)
+            ok, tau, paths = decide(high)
             if ok:
                 break
             last_fail = high
-            high *= 2
+            if t_policy == "flow" and high < T_max:
+                history.append((high, flow_at.get(high, (0, None))[0]))
+                high = _next_T_from_flow(history, len(robots), T_max)
+            else:
+                high *= 2
 
         if high > T_max:
-            ok, tau, paths = try_T(T_max, tau_workers)
+            if last_fail >= T_max:
+                return None, None, {}
+            ok, tau, paths = decide(T_max)
             if not ok:
                 return None, None, {}
             high = T_max
 
         for T in range(last_fail + 1, high + 1):
-            ok, tau, paths = try_T(T, tau_workers)
+            ok, tau, paths = decide(T)
             if ok:
                 return T, tau, paths
 
         return None, None, {}
 
-    def eval_batch(values: List[int]):
-        results = {}
-        if not values:
-            return results
-        active_Ts = len(values)
-        tau_workers = _tau_workers_for(active_Ts, True)
-        with ThreadPoolExecutor(max_workers=min(t_workers, active_Ts)) as executor:
-            futures = {executor.submit(try_T, T, tau_workers): T for T in values}
-            for fut, T in futures.items():
-                ok, tau, paths = fut.result()
-                results[T] = (ok, tau, paths)
-        return results
-
     if lower_T == 0:
-        ok, tau, paths = try_T(0, _tau_workers_for(1, False))
+        ok, tau, paths = decide(0)
         if ok:
             return 0, tau, paths
         low = 0
@@ -578,10 +1297,11 @@ def search_min_T_sync(
             return None, None, {}
         candidates = []
         val = start
-        for _ in range(t_workers):
-            if val > T_max:
+        while len(candidates) < t_workers:
+            # Clamp the last doubling step to T_max, as the serial search does.
+            candidates.append(min(val, T_max))
+            if val >= T_max:
                 break
-            candidates.append(val)
             val *= 2
         results = eval_batch(candidates)
         min_feasible = None
@@ -602,7 +1322,9 @@ def search_min_T_sync(
             break
         if max_infeasible is not None:
             low = max(low, max_infeasible)
-        start = val
+        if candidates[-1] >= T_max:
+            return None, None, {}
+        start = min(val, T_max)
 
     while low + 1 < high:
         candidates = []
@@ -644,23 +1366,40 @@ def plan_round_sync(
     parallel_T_workers: int = 1,
     verbose: bool = False,
     progress_every: int = 25,
+    t_policy: str = "double",
+    deadline_s: Optional[float] = None,
+    search_info: Optional[Dict] = None,
+    pool: Optional[PlannerPool] = None,
+    oracle: Optional[DistanceOracle] = None,
+    candidate_k: Optional[int] = None,
 ):
     if len(drop_points) < len(robots):
         raise RuntimeError(
             f"Sync model requires goals >= agents (goals={len(drop_points)}, agents={len(robots)})"
         )
-    return search_min_T_sync(
-        grid,
-        robots,
-        pickup_points,
-        drop_points,
-        drop_caps,
-        T_max,
-        method=method,
-        parallel_workers=parallel_workers,
-        parallel_T_workers=parallel_T_workers,
-        verbose=verbose,
-        progress_every=progress_every,
+    return _plan_on_candidates(
+        lambda pickups, budget, info: search_min_T_sync(
+            grid,
+            robots,
+            pickups,
+            drop_points,
+            drop_caps,
+            T_max,
+            method=method,
+            parallel_workers=parallel_workers,
+            parallel_T_workers=parallel_T_workers,
+            verbose=verbose,
+            progress_every=progress_every,
+            t_policy=t_policy,
+            deadline_s=budget,
+            search_info=info,
+            pool=pool,
+            oracle=oracle,
+        ),
+        grid, [r.pos for r in robots], pickup_points, candidate_k, oracle,
+        deadline_s, search_info,
+        # Every robot also carries its pickup to a drop within the same T.
+        onward=_nearest_distances(grid, drop_points, pickup_points, oracle) if candidate_k else None,
     )
 
 
@@ -678,53 +1417,40 @@ def _find_min_T_single_rot(
     T_max: int,
     method: str = "dinic",
     verbose: bool = False,
+    T_low: int = 0,
+    cancel: Optional[flow_planner_cpp.CancelToken] = None,
+    t_policy: str = "double",
+    T_hint: Optional[int] = None,
+    deadline: Optional[float] = None,
 ):
     if not starts:
         return 0, [], []
-    if T_max < 0:
+    if T_max < 0 or T_low > T_max:
         return None, [], []
 
-    def feasible(T: int):
+    def probe(T: int):
+        if cancel is not None and cancel.cancelled:
+            raise _SearchCancelled()
         if verbose:
             print(f"[flow-rot] T={T}")
+        engine = _resolve_method(method, grid, len(starts), len(targets), T, layers=4)
         res = flow_planner_cpp.plan_flow_rot(
-            grid, starts, start_dirs, targets, caps, T, reserved_v, reserved_e, method
+            grid, starts, start_dirs, targets, caps, T, reserved_v, reserved_e, engine,
+            deadline_s=_time_left(deadline), cancel_token=cancel,
         )
-        return res["feasible"], res["paths"], res["path_dirs"]
-
-    low = 0
-    high = 1
-    best_paths: List = []
-    best_dirs: List = []
+        _check_stopped(res)
+        return res["feasible"], res["flow"], (res["paths"], res["path_dirs"])
 
-    while high <= T_max:
-        ok, paths, dirs = feasible(high)
-        if ok:
-            best_paths = paths
-            best_dirs = dirs
-            break
-        low = high + 1
-        high *= 2
-
-    if high > T_max:
-        ok, paths, dirs = feasible(T_max)
-        if not ok:
+    if t_policy == "flow":
+        bound = _distance_lower_bound(grid, starts, targets)
+        if bound is None:
             return None, [], []
-        high = T_max
-        best_paths = paths
-        best_dirs = dirs
-
-    while low <= high:
-        mid = (low + high) // 2
-        ok, paths, dirs = feasible(mid)
-        if ok:
-            best_paths = paths
-            best_dirs = dirs
-            high = mid - 1
-        else:
-            low = mid + 1
-
-    return low, best_paths, best_dirs
+        T, (paths, dirs) = _search_min_feasible_flow(
+            probe, len(starts), T_max, ([], []), max(T_low, bound), T_hint
+        )
+    else:
+        T, (paths, dirs) = _search_min_feasible(lambda T: _drop_flow(probe(T)), T_max, ([], []), T_low)
+    return T, paths, dirs
 
 
 def _plan_with_order_rot(
@@ -736,27 +1462,46 @@ def _plan_with_order_rot(
     T: int,
     first_loaded: bool,
     method: str = "dinic",
+    stage_cache: Optional[Dict] = None,
+    cancel: Optional[flow_planner_cpp.CancelToken] = None,
+    t_policy: str = "double",
+    T_hint: Optional[int] = None,
+    deadline: Optional[float] = None,
 ):
     loaded = [r for r in robots if r.state == "Loaded"]
     empty = [r for r in robots if r.state == "Empty"]
     drop_caps_list = [drop_caps.get(p, 1) for p in drop_points]
 
+    def solve_rot(starts, start_dirs, targets, caps, reserved_v, reserved_e):
+        def solve(T_low: int, T_cap: int):
+            T_min, paths, dirs = _find_min_T_single_rot(
+                grid, starts, start_dirs, targets, caps, reserved_v, reserved_e, T_cap,
+                method=method, T_low=T_low, cancel=cancel, t_policy=t_policy, T_hint=T_hint,
+                deadline=deadline,
+            )
+            return T_min, (paths, dirs)
+
+        return solve
+
     def plan_loaded(reserved_v, reserved_e):
         if not loaded:
             return True, [], [], [], []
-        t_loaded, paths_loaded, dirs_loaded = _find_min_T_single_rot(
-            grid,
-            [r.pos for r in loaded],
-            [r.facing for r in loaded],
-            drop_points,
-            drop_caps_list,
-            reserved_v,
-            reserved_e,
+        t_loaded, result = _stage_min_T(
+            stage_cache,
+            ("loaded", tuple(reserved_v), tuple(reserved_e)),
             T,
-            method=method,
+            solve_rot(
+                [r.pos for r in loaded],
+                [r.facing for r in loaded],
+                drop_points,
+                drop_caps_list,
+                reserved_v,
+                reserved_e,
+            ),
         )
         if t_loaded is None:
             return False, [], [], [], []
+        paths_loaded, dirs_loaded = result
         return (
             True,
             paths_loaded,
@@ -768,19 +1513,22 @@ def _plan_with_order_rot(
     def plan_empty(reserved_v, reserved_e):
         if not empty:
             return True, [], []
-        t_empty, paths_empty, dirs_empty = _find_min_T_single_rot(
-            grid,
-            [r.pos for r in empty],
-            [r.facing for r in empty],
-            pickup_points,
-            [1] * len(pickup_points),
-            reserved_v,
-            reserved_e,
+        t_empty, result = _stage_min_T(
+            stage_cache,
+            ("empty", tuple(reserved_v), tuple(reserved_e)),
             T,
-            method=method,
+            solve_rot(
+                [r.pos for r in empty],
+                [r.facing for r in empty],
+                pickup_points,
+                [1] * len(pickup_points),
+                reserved_v,
+                reserved_e,
+            ),
         )
         if t_empty is None:
             return False, [], []
+        paths_empty, dirs_empty = result
         return True, paths_empty, dirs_empty
 
     if first_loaded:
@@ -828,57 +1576,262 @@ def search_min_T_rot(
     drop_caps: Dict[Tuple[int, int], int],
     T_max: int,
     method: str = "dinic",
+    concurrent_orders: bool = False,
+    t_policy: str = "double",
+    T_hint: Optional[int] = None,
+    deadline_s: Optional[float] = None,
+    search_info: Optional[Dict] = None,
 ):
+    if t_policy not in T_POLICIES:
+        raise ValueError(f"Unknown t_policy: {t_policy}")
+    if T_max < 0:
+        _run_anytime(lambda: (None, None), _Incumbent(None), search_info)
+        return None, {}, {}
+
+    deadline = _deadline_at(deadline_s)
+    incumbent = _Incumbent(({}, {}))
+    stage_cache: Dict = {}
+    pool = ThreadPoolExecutor(max_workers=2) if concurrent_orders else None
+
     def try_T(T: int):
-        ok, paths, dirs, _ = _plan_with_order_rot(
-            grid, robots, pickup_points, drop_points, drop_caps, T, True, method
+        ok, paths, dirs, _ = _run_orders(
+            lambda first_loaded, cancel: _plan_with_order_rot(
+                grid, robots, pickup_points, drop_points, drop_caps, T, first_loaded, method,
+                stage_cache, cancel, t_policy, T_hint, deadline,
+            ),
+            pool,
         )
         if ok:
-            return True, paths, dirs
-        ok, paths, dirs, _ = _plan_with_order_rot(
-            grid, robots, pickup_points, drop_points, drop_caps, T, False, method
+            incumbent.offer(T, (paths, dirs))
+        return ok, (paths, dirs)
+
+    try:
+        T, (paths, dirs) = _run_anytime(
+            lambda: _search_min_feasible(try_T, T_max, ({}, {})), incumbent, search_info
         )
-        return ok, paths, dirs
+    finally:
+        if pool is not None:
+            pool.shutdown(wait=False)
+    return T, paths, dirs
 
-    if T_max < 0:
-        return None, {}, {}
 
-    low = 0
-    high = 1
-    best_paths: Dict[int, List[Tuple[int, int]]] = {}
-    best_dirs: Dict[int, List[int]] = {}
+def plan_round_rot(
+    grid: List[List[int]],
+    robots: List[RobotState],
+    pickup_points: List[Tuple[int, int]],
+    drop_points: List[Tuple[int, int]],
+    drop_caps: Dict[Tuple[int, int], int],
+    T_max: int,
+    method: str = "dinic",
+    lazy: bool = False,
+    concurrent_orders: bool = False,
+    t_policy: str = "double",
+    T_hint: Optional[int] = None,
+    deadline_s: Optional[float] = None,
+    search_info: Optional[Dict] = None,
+    candidate_k: Optional[int] = None,
+):
+    search = search_min_T_rot_lazy if lazy else search_min_T_rot
+    return _plan_on_candidates(
+        lambda pickups, budget, info: search(
+            grid, robots, pickups, drop_points, drop_caps, T_max, method=method,
+            concurrent_orders=concurrent_orders, t_policy=t_policy, T_hint=T_hint,
+            deadline_s=budget, search_info=info,
+        ),
+        grid, [r.pos for r in robots if r.state == "Empty"], pickup_points, candidate_k, None,
+        deadline_s, search_info,
+    )
 
-    while high <= T_max:
-        ok, paths, dirs = try_T(high)
-        if ok:
-            best_paths = paths
-            best_dirs = dirs
-            break
-        low = high + 1
-        high *= 2
 
-    if high > T_max:
-        ok, paths, dirs = try_T(T_max)
-        if not ok:
-            return None, {}, {}
-        high = T_max
-        best_paths = paths
-        best_dirs = dirs
+# --- Lazy rotation: position-only plan, turn insertion, local repair ---
+
+_OPPOSITE_DIR = {
+    DIR_EAST: DIR_WEST,
+    DIR_WEST: DIR_EAST,
+    DIR_SOUTH: DIR_NORTH,
+    DIR_NORTH: DIR_SOUTH,
+}
+
+
+def _turn_toward(facing: int, want: int) -> int:
+    """One 90-degree turn from ``facing`` toward ``want``."""
+    if facing == want:
+        return facing
+    if _OPPOSITE_DIR[facing] == want:
+        return DIR_SOUTH if facing in (DIR_EAST, DIR_WEST) else DIR_EAST
+    return want
+
+
+def expand_turns(path: List[Tuple[int, int]], facing: int) -> Tuple[List[Tuple[int, int]], List[int]]:
+    """Turn a position-only path into a rotation-consistent one.
+
+    Waits already in the path are spent turning toward the next move; any
+    turns still missing are inserted as extra waits right before the move.
+    """
+    if not path:
+        return [], []
+    next_dir: List = [None] * len(path)
+    upcoming = None
+    for t in range(len(path) - 2, -1, -1):
+        (x1, y1), (x2, y2) = path[t], path[t + 1]
+        if (x1, y1) != (x2, y2):
+            upcoming = DELTA_TO_DIR[(x2 - x1, y2 - y1)]
+        next_dir[t] = upcoming
+
+    out_path = [path[0]]
+    out_dirs = [facing]
+    for t in range(len(path) - 1):
+        cur, nxt = path[t], path[t + 1]
+        want = next_dir[t]
+        if cur == nxt:
+            if want is not None:
+                facing = _turn_toward(facing, want)
+            out_path.append(nxt)
+            out_dirs.append(facing)
+            continue
+        while facing != want:
+            facing = _turn_toward(facing, want)
+            out_path.append(cur)
+            out_dirs.append(facing)
+        out_path.append(nxt)
+        out_dirs.append(facing)
+    return out_path, out_dirs
+
+
+def _pad_dirs(dirs: List[int], T: int) -> List[int]:
+    padded = list(dirs)
+    if padded:
+        while len(padded) < T + 1:
+            padded.append(padded[-1])
+    return padded
+
+
+def _conflict_groups(paths_by_id: Dict[int, List[Tuple[int, int]]]) -> List[List[int]]:
+    """Connected components of robots with vertex or swap conflicts.
+
+    Paths are taken unpadded: as in the flow model, a robot leaves the network
+    once it is absorbed at its target.
+    """
+    parent = {rid: rid for rid in paths_by_id}
+
+    def find(rid: int) -> int:
+        while parent[rid] != rid:
+            parent[rid] = parent[parent[rid]]
+            rid = parent[rid]
+        return rid
+
+    conflicted = set()
+
+    def union(a: int, b: int) -> None:
+        conflicted.add(a)
+        conflicted.add(b)
+        ra, rb = find(a), find(b)
+        if ra != rb:
+            parent[rb] = ra
+
+    horizon = max((len(p) for p in paths_by_id.values()), default=0)
+    for t in range(horizon):
+        occupied: Dict[Tuple[int, int], int] = {}
+        moves: Dict[Tuple[Tuple[int, int], Tuple[int, int]], int] = {}
+        for rid, path in paths_by_id.items():
+            if t >= len(path):
+                continue
+            pos = path[t]
+            other = occupied.get(pos)
+            if other is not None:
+                union(other, rid)
+            occupied[pos] = rid
+            if t == 0 or path[t - 1] == pos:
+                continue
+            other = moves.get((pos, path[t - 1]))
+            if other is not None:
+                union(other, rid)
+            moves[(path[t - 1], pos)] = rid
 
-    while low <= high:
-        mid = (low + high) // 2
-        ok, paths, dirs = try_T(mid)
-        if ok:
-            best_paths = paths
-            best_dirs = dirs
-            high = mid - 1
-        else:
-            low = mid + 1
+    groups: Dict[int, List[int]] = {}
+    for rid in conflicted:
+        groups.setdefault(find(rid), []).append(rid)
+    return [sorted(g) for g in sorted(groups.values(), key=min)]
 
-    return low, best_paths, best_dirs
 
+def _repair_group_rot(
+    grid: List[List[int]],
+    robots_by_id: Dict[int, RobotState],
+    group: List[int],
+    paths_by_id: Dict[int, List[Tuple[int, int]]],
+    dirs_by_id: Dict[int, List[int]],
+    T_max: int,
+    margin: int,
+    method: str = "dinic",
+    deadline: Optional[float] = None,
+) -> bool:
+    """Replan ``group`` with ``plan_flow_rot`` on a cropped window around its paths.
+
+    Robots are replanned one at a time (Loaded first) toward the target they
+    already had, reserving everyone else inside the window. A joint flow is
+    avoided because the rotation network caps (cell, dir) nodes, so it may
+    put two robots with different headings on one cell. Paths are updated in
+    place only when the whole group succeeds.
+    """
+    height = len(grid)
+    width = len(grid[0]) if height > 0 else 0
+    xs = [x for rid in group for x, _ in paths_by_id[rid]]
+    ys = [y for rid in group for _, y in paths_by_id[rid]]
+    x0, x1 = max(0, min(xs) - margin), min(width - 1, max(xs) + margin)
+    y0, y1 = max(0, min(ys) - margin), min(height - 1, max(ys) + margin)
+    sub_grid = [row[x0 : x1 + 1] for row in grid[y0 : y1 + 1]]
 
-def plan_round_rot(
+    def inside(pos: Tuple[int, int]) -> bool:
+        return x0 <= pos[0] <= x1 and y0 <= pos[1] <= y1
+
+    def local(pos: Tuple[int, int]) -> Tuple[int, int]:
+        return (pos[0] - x0, pos[1] - y0)
+
+    reserved_v = []
+    reserved_e = []
+
+    def reserve(path: List[Tuple[int, int]]) -> None:
+        for t, pos in enumerate(path):
+            if not inside(pos):
+                continue
+            reserved_v.append((*local(pos), t))
+            if t > 0 and path[t - 1] != pos and inside(path[t - 1]):
+                reserved_e.append((*local(path[t - 1]), *local(pos), t - 1))
+
+    for rid, path in paths_by_id.items():
+        if rid not in group:
+            reserve(path)
+
+    repaired_paths: Dict[int, List[Tuple[int, int]]] = {}
+    repaired_dirs: Dict[int, List[int]] = {}
+    order = sorted(group, key=lambda rid: (robots_by_id[rid].state != "Loaded", rid))
+    for rid in order:
+        robot = robots_by_id[rid]
+        T_sub, sub_paths, sub_dirs = _find_min_T_single_rot(
+            sub_grid,
+            [local(robot.pos)],
+            [robot.facing],
+            [local(paths_by_id[rid][-1])],
+            [1],
+            reserved_v,
+            reserved_e,
+            T_max,
+            method=method,
+            deadline=deadline,
+        )
+        if T_sub is None:
+            return False
+        path = [(x + x0, y + y0) for x, y in sub_paths[0]]
+        repaired_paths[rid] = path
+        repaired_dirs[rid] = list(sub_dirs[0])
+        reserve(path)
+
+    paths_by_id.update(repaired_paths)
+    dirs_by_id.update(repaired_dirs)
+    return True
+
+
+def search_min_T_rot_lazy(
     grid: List[List[int]],
     robots: List[RobotState],
     pickup_points: List[Tuple[int, int]],
@@ -886,7 +1839,93 @@ def plan_round_rot(
     drop_caps: Dict[Tuple[int, int], int],
     T_max: int,
     method: str = "dinic",
+    margin: int = 2,
+    max_rounds: int = 4,
+    concurrent_orders: bool = False,
+    t_policy: str = "double",
+    T_hint: Optional[int] = None,
+    deadline_s: Optional[float] = None,
+    search_info: Optional[Dict] = None,
 ):
-    return search_min_T_rot(
-        grid, robots, pickup_points, drop_points, drop_caps, T_max, method=method
+    """Rotation-aware plan built from the position-only flow.
+
+    Solves ``search_min_T`` in (cell, t) space, inserts quarter turns where the
+    heading changes (``expand_turns``) and repairs only robots that end up in
+    conflict, with ``plan_flow_rot`` on a window around them. The window grows
+    when a repair is infeasible. Falls back to ``search_min_T_rot`` when the
+    repairs do not converge or the expanded plan exceeds ``T_max``. The
+    resulting T is not guaranteed minimal, so a repaired plan reports
+    status ``"feasible"``; a deadline hit during repair reports ``"timeout"``.
+    """
+    deadline = _deadline_at(deadline_s)
+    info = search_info if search_info is not None else {}
+    T_pos, pos_paths = search_min_T(
+        grid, robots, pickup_points, drop_points, drop_caps, T_max, method=method,
+        concurrent_orders=concurrent_orders, t_policy=t_policy, T_hint=T_hint,
+        deadline_s=deadline_s, search_info=info,
+    )
+    if T_pos is None:
+        # Turning only adds time, so no rotation plan fits either.
+        return None, {}, {}
+
+    def fallback():
+        try:
+            left = _time_left(deadline)
+        except _DeadlineExceeded:
+            info["status"] = "timeout"
+            return None, {}, {}
+        return search_min_T_rot(
+            grid, robots, pickup_points, drop_points, drop_caps, T_max, method=method,
+            concurrent_orders=concurrent_orders, t_policy=t_policy, deadline_s=left, search_info=info,
+        )
+
+    robots_by_id = {r.id: r for r in robots}
+    paths_by_id: Dict[int, List[Tuple[int, int]]] = {}
+    dirs_by_id: Dict[int, List[int]] = {}
+    for robot in robots:
+        path = list(pos_paths.get(robot.id, []))
+        # Drop the padding so the robot leaves the network on arrival.
+        while len(path) > 1 and path[-1] == path[-2]:
+            path.pop()
+        path, dirs = expand_turns(path, robot.facing)
+        paths_by_id[robot.id] = path
+        dirs_by_id[robot.id] = dirs
+
+    height = len(grid)
+    width = len(grid[0]) if height > 0 else 0
+    resolved = False
+    for round_idx in range(max_rounds + 1):
+        T = max((len(p) - 1 for p in paths_by_id.values() if p), default=0)
+        if T > T_max:
+            break
+        groups = _conflict_groups(paths_by_id)
+        if not groups:
+            resolved = True
+            break
+        if round_idx == max_rounds:
+            break
+        for group in groups:
+            grow = margin
+            while True:
+                try:
+                    repaired = _repair_group_rot(
+                        grid, robots_by_id, group, paths_by_id, dirs_by_id, T_max, grow,
+                        method=method, deadline=deadline,
+                    )
+                except _DeadlineExceeded:
+                    info["status"] = "timeout"
+                    return None, {}, {}
+                if repaired:
+                    break
+                if grow >= max(width, height):
+                    return fallback()
+                grow *= 2
+
+    if not resolved:
+        return fallback()
+    info["status"] = "feasible"
+    return (
+        T,
+        {rid: pad_path(path, T) for rid, path in paths_by_id.items()},
+        {rid: _pad_dirs(dirs, T) for rid, dirs in dirs_by_id.items()},
     )
@@ -0,0 +1,145 @@
+"""Bounded, thread-safe caches shared by planner calls.
+
+The grid adjacency and BFS distance caches live for the whole process and
+are hit from the sync search's worker threads, so every access goes
+through a lock and each cache is capped by entry count and/or an estimated
+byte size, evicting the least recently used entry. Maps are keyed by a
+compact fingerprint (a digest of the cells) instead of the full grid, so
+cache keys stay small and cheap to hash.
+"""
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, Generic, Hashable, List, Optional, Tuple, TypeVar
+
+V = TypeVar("V")
+
+
+def map_fingerprint(grid: List[List[int]]) -> Tuple[int, int, bytes]:
+    """``(height, width, digest)`` of the blocked/free layout of ``grid``.
+
+    A ``KeyedGrid`` returns its stored fingerprint without rehashing.
+    """
+    fingerprint = getattr(grid, "fingerprint", None)
+    if fingerprint is not None:
+        return fingerprint
+    height = len(grid)
+    width = len(grid[0]) if height > 0 else 0
+    digest = hashlib.blake2b(digest_size=16)
+    for row in grid:
+        try:
+            digest.update(bytes(row))
+        except (TypeError, ValueError):
+            # Only "== 0" (free) vs anything else matters to the planner.
+            digest.update(bytes(0 if cell == 0 else 1 for cell in row))
+    return height, width, digest.digest()
+
+
+class KeyedGrid(list):
+    """A grid (list of rows) that carries its ``map_fingerprint``.
+
+    Planner calls look their map up by fingerprint; a caller planning many
+    rounds on one map wraps it once so the cells are hashed once per run
+    instead of once per call. The rows must not change afterwards.
+    """
+
+    def __init__(self, rows: List[List[int]]):
+        super().__init__(rows)
+        self.fingerprint = map_fingerprint(self)
+
+
+class LRUCache(Generic[V]):
+    """LRU mapping bounded by ``max_entries`` and/or ``max_bytes`` (``None`` = unbounded).
+
+    ``sizeof`` estimates an entry's size for ``max_bytes``. An entry larger
+    than ``max_bytes`` on its own is not stored.
+    """
+
+    def __init__(
+        self,
+        max_entries: Optional[int] = None,
+        max_bytes: Optional[int] = None,
+        sizeof: Optional[Callable[[V], int]] = None,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._sizeof = sizeof or (lambda value: 0)
+        self._data: "OrderedDict[Hashable, Tuple[V, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[V]:
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return item[0]
+
+    def put(self, key: Hashable, value: V) -> None:
+        size = self._sizeof(value)
+        with self._lock:
+            old = self._data.pop(key, None)
+            if old is not None:
+                self._bytes -= old[1]
+            if self.max_bytes is not None and size > self.max_bytes:
+                return
+            self._data[key] = (value, size)
+            self._bytes += size
+            while self._data and (
+                (self.max_entries is not None and len(self._data) > self.max_entries)
+                or (self.max_bytes is not None and self._bytes > self.max_bytes)
+            ):
+                _, (_, evicted_size) = self._data.popitem(last=False)
+                self._bytes -= evicted_size
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def keys(self) -> List[Hashable]:
+        """Keys from least to most recently used."""
+        with self._lock:
+            return list(self._data.keys())
+
+    def snapshot(self, entries: bool = True) -> Dict:
+        """Counters and (optionally) entries in LRU order, for checkpoints."""
+        with self._lock:
+            return {
+                "entries": [(key, value) for key, (value, _) in self._data.items()] if entries else [],
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+    def restore(self, snapshot: Dict) -> None:
+        """Replace the contents and counters with a ``snapshot``."""
+        self.clear()
+        for key, value in snapshot["entries"]:
+            self.put(key, value)
+        with self._lock:
+            self.hits = snapshot["hits"]
+            self.misses = snapshot["misses"]
+            self.evictions = snapshot["evictions"]
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._data),
+                "bytes": self._bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
@@ -0,0 +1,85 @@
+"""Long-lived worker threads for flow probes.
+
+``PlannerPool`` keeps its threads across planning rounds, so a simulator
+pays the thread start-up cost once. Probes are queued in one shared
+priority heap: an idle worker always takes the most promising pending
+probe, whichever search submitted it, so no worker sits idle while work
+is queued. The flow calls release the GIL, so the threads run in parallel.
+Superseded probes are dropped by cancelling their future (not started yet)
+and their ``CancelToken`` (already running in C++).
+"""
+
+import heapq
+import itertools
+import os
+import threading
+from concurrent.futures import Future
+from typing import Callable, List, Optional, Tuple
+
+
+class PlannerPool:
+    """Priority-ordered thread pool; lower ``priority`` tuples run first."""
+
+    def __init__(self, workers: Optional[int] = None):
+        self.workers = max(1, workers or os.cpu_count() or 1)
+        self._heap: List[Tuple] = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._closed = False
+        self._threads = [
+            threading.Thread(target=self._worker, name=f"planner-pool-{i}", daemon=True)
+            for i in range(self.workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, fn: Callable, *args, priority: Tuple = (), **kwargs) -> Future:
+        """Queue ``fn(*args, **kwargs)``; ties in ``priority`` run in submission order."""
+        future: Future = Future()
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("PlannerPool is shut down")
+            heapq.heappush(self._heap, (priority, next(self._seq), future, fn, args, kwargs))
+            self._cond.notify()
+        return future
+
+    def pending(self) -> int:
+        with self._cond:
+            return len(self._heap)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop accepting work, cancel queued probes and let the workers exit."""
+        with self._cond:
+            self._closed = True
+            queued = [item[2] for item in self._heap]
+            self._heap.clear()
+            self._cond.notify_all()
+        for future in queued:
+            future.cancel()
+        if wait:
+            for thread in self._threads:
+                thread.join()
+
+    def __enter__(self) -> "PlannerPool":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.shutdown()
+
+    def _worker(self) -> None:
+        while True:
+            with self._cond:
+                while not self._heap and not self._closed:
+                    self._cond.wait()
+                if not self._heap:
+                    return
+                _, _, future, fn, args, kwargs = heapq.heappop(self._heap)
+            # Cancelled while queued: drop it without running.
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                result = fn(*args, **kwargs)
+            except BaseException as exc:
+                future.set_exception(exc)
+            else:
+                future.set_result(result)
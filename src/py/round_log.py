@@ -0,0 +1,220 @@
+"""Streaming per-round log for long simulations.
+
+``RoundLog`` writes one compact JSON line per planning round while the run
+is in progress, so a crash loses at most the rounds still queued. Records
+are handed to a writer thread that serialises and writes them and flushes
+whenever it catches up, so planning never waits on the disk. The stream
+is:
+
+- ``{"kind": "start", ...}``: run parameters, agent ids and start cells.
+- ``{"kind": "round", ...}``: round index, timestep ``t``, ``T``, ``tau``,
+  ``delta`` (steps executed), plan latency, plan status, the round's task
+  events and each agent's new positions (``segments``).
+- ``{"kind": "end", "events": ..., "output": ...}``: task events after the
+  last round and the final output header (stats etc.).
+
+Task events come from ``TaskStore`` (``log=``) as ``["spawn", id, x, y,
+t]``, ``["pick", id, robot, t]`` and ``["deliver", id, robot, t]``.
+``reassemble`` rebuilds the monolithic output (JSON or ``.simbin``) from a
+stream, including a truncated one; run as a script it does the same from
+the command line.
+"""
+
+import argparse
+import json
+import os
+import queue
+import threading
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from sim_output import write_sim_output
+from trajectory_buffer import TrajectoryBuffer
+
+_STOP = object()
+
+
+class RoundLog:
+    def __init__(
+        self,
+        path: str,
+        header: Dict,
+        agent_ids: Sequence[int],
+        starts: Sequence[Tuple[int, int]],
+        resume: Optional[Dict] = None,
+    ):
+        """Start a new stream, or with ``resume`` (from ``checkpoint()``) continue one at its offset."""
+        self.path = path
+        self.rounds = 0
+        self._events: List[List] = []
+        self._queue: "queue.Queue" = queue.Queue()
+        self._error: Optional[BaseException] = None
+        if resume is not None:
+            os.truncate(path, resume["offset"])
+            self.rounds = resume["rounds"]
+            self._events = list(resume["events"])
+            self._file = open(path, "a", encoding="utf-8")
+        else:
+            self._file = open(path, "w", encoding="utf-8")
+        self._thread = threading.Thread(target=self._run, name="round-log", daemon=True)
+        self._thread.start()
+        if resume is None:
+            self._put({"kind": "start", **header, "agent_ids": list(agent_ids), "starts": [list(p) for p in starts]})
+
+    def task_spawned(self, task: Dict) -> None:
+        x, y = task["pos"]
+        self._events.append(["spawn", task["id"], x, y, task["spawn_time"]])
+
+    def task_picked(self, task: Dict) -> None:
+        self._events.append(["pick", task["id"], task["picked_by"], task["picked_time"]])
+
+    def task_delivered(self, task: Dict) -> None:
+        self._events.append(["deliver", task["id"], task["delivered_by"], task["delivered_time"]])
+
+    def round(self, t: int, T: Optional[int], tau: Optional[int], delta: int, plan_s: float, status: str, segments) -> None:
+        """Queue one round; ``segments[i]`` is agent ``i``'s positions for steps ``t+1 .. t+delta``."""
+        record = {
+            "kind": "round",
+            "round": self.rounds,
+            "t": t,
+            "T": T,
+            "tau": tau,
+            "delta": delta,
+            "plan_s": plan_s,
+            "status": status,
+            "events": self._events,
+            "segments": segments,
+        }
+        self._events = []
+        self.rounds += 1
+        self._put(record)
+
+    def checkpoint(self) -> Dict:
+        """Wait until every queued record is on disk; returns the state ``resume`` needs."""
+        self._queue.join()
+        if self._error is not None:
+            raise self._error
+        self._file.flush()
+        return {"offset": self._file.tell(), "rounds": self.rounds, "events": list(self._events)}
+
+    def close(self, output: Optional[Dict] = None) -> None:
+        """Write the end record (if ``output`` is given), drain the queue and close the file."""
+        if self._file is None:
+            return
+        if output is not None:
+            self._put({"kind": "end", "events": self._events, "output": output})
+            self._events = []
+        self._queue.put(_STOP)
+        self._thread.join()
+        self._file.close()
+        self._file = None
+        if self._error is not None:
+            raise self._error
+
+    def _put(self, record: Dict) -> None:
+        if self._error is not None:
+            raise self._error
+        self._queue.put(record)
+
+    def _run(self) -> None:
+        while True:
+            record = self._queue.get()
+            if record is _STOP:
+                self._queue.task_done()
+                break
+            if self._error is None:
+                try:
+                    self._file.write(json.dumps(record, separators=(",", ":")) + "\n")
+                    if self._queue.empty():
+                        self._file.flush()
+                except BaseException as exc:  # surfaced on the next write or close
+                    self._error = exc
+            self._queue.task_done()
+
+
+def reassemble(log_path: str, output_path: str) -> Dict:
+    """Rebuild the simulator's output file from a round log; returns the output header.
+
+    A stream without an end record (e.g. after a crash) gives the start
+    record's parameters plus ``"truncated": True`` instead of final stats.
+    """
+    header, end, trajectories, tasks = _read(log_path)
+    if end is None:
+        end = dict(header)
+        end["truncated"] = True
+        end["sim_end_timestep"] = trajectories.steps
+    write_sim_output(output_path, end, trajectories, [tasks[k] for k in sorted(tasks)])
+    return end
+
+
+def load_trajectories(log_path: str, offset: Optional[int] = None) -> TrajectoryBuffer:
+    """Trajectories recorded in the first ``offset`` bytes of a round log (all of it by default)."""
+    return _read(log_path, offset)[2]
+
+
+def _read(log_path: str, offset: Optional[int] = None):
+    header: Optional[Dict] = None
+    end: Optional[Dict] = None
+    trajectories: Optional[TrajectoryBuffer] = None
+    tasks: Dict[int, Dict] = {}
+    read = 0
+    with open(log_path, "rb") as f:
+        for line in f:
+            read += len(line)
+            if offset is not None and read > offset:
+                break
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+            except ValueError:
+                break  # torn last line of an interrupted run
+            kind = record.get("kind")
+            if kind == "start":
+                header = {k: v for k, v in record.items() if k not in ("kind", "agent_ids", "starts")}
+                trajectories = TrajectoryBuffer(record["agent_ids"], [tuple(p) for p in record["starts"]])
+            elif kind == "round":
+                if trajectories is None:
+                    raise ValueError(f"{log_path}: round record before start record")
+                _apply_events(tasks, record["events"])
+                trajectories.append(record["segments"])
+            elif kind == "end":
+                _apply_events(tasks, record.get("events", []))
+                end = record["output"]
+    if header is None or trajectories is None:
+        raise ValueError(f"{log_path}: missing start record")
+    return header, end, trajectories, tasks
+
+
+def _apply_events(tasks: Dict[int, Dict], events: List[List]) -> None:
+    for event in events:
+        kind, task_id = event[0], event[1]
+        if kind == "spawn":
+            tasks[task_id] = {
+                "id": task_id,
+                "pos": [event[2], event[3]],
+                "spawn_time": event[4],
+                "picked_time": None,
+                "delivered_time": None,
+                "picked_by": None,
+                "delivered_by": None,
+            }
+        elif kind == "pick":
+            tasks[task_id]["picked_by"] = event[2]
+            tasks[task_id]["picked_time"] = event[3]
+        elif kind == "deliver":
+            tasks[task_id]["delivered_by"] = event[2]
+            tasks[task_id]["delivered_time"] = event[3]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Rebuild simulation output from a round log")
+    parser.add_argument("--log", required=True, help="Round log (JSONL) written with --round_log")
+    parser.add_argument("--output", required=True, help="Output path (.json, or .simbin for the binary format)")
+    args = parser.parse_args()
+    header = reassemble(args.log, args.output)
+    if header.get("truncated"):
+        print(f"Log ends without an end record; rebuilt {header['sim_end_timestep']} timesteps")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+"""Writing and loading simulation output.
+
+Output paths ending in ``.simbin`` get a binary container instead of the
+indented JSON file:
+
+    8-byte magic | uint64 header length | JSON header | arrays
+
+The header holds every scalar output field (``meta``), the agent ids and,
+for each array, its dtype, shape and byte offset; arrays start on 64-byte
+boundaries. Positions are stored time-major as ``(T + 1, agents, 2)``
+int16 (int32 on very wide maps), so one timestep is one contiguous read,
+and tasks are stored as columns with ``-1`` for missing times/robots. The
+loader memory-maps the arrays, so opening a long run costs only the header
+and frames are read on demand. Both directions need NumPy; JSON output
+does not.
+"""
+
+import json
+import struct
+from typing import Dict, List, Optional, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised only without numpy
+    np = None
+
+SIMBIN_SUFFIX = ".simbin"
+_MAGIC = b"SIMBIN\x00\x01"
+_ALIGN = 64
+# Timesteps transposed per write when storing positions time-major.
+_CHUNK_STEPS = 4096
+_TASK_FIELDS = ("spawn_time", "picked_time", "delivered_time", "picked_by", "delivered_by")
+
+
+def is_simbin(path: str) -> bool:
+    return path.endswith(SIMBIN_SUFFIX)
+
+
+def write_sim_output(path: str, header: Dict, trajectories, tasks: List[Dict]) -> None:
+    """Write ``header`` plus the ``agents`` and ``tasks`` sections to ``path``.
+
+    ``trajectories`` is a ``TrajectoryBuffer``. The JSON layout is the
+    historical one (``agents`` and ``tasks`` last); ``.simbin`` paths get
+    the binary container.
+    """
+    if is_simbin(path):
+        _write_simbin(path, header, trajectories, tasks)
+        return
+    output = dict(header)
+    output["agents"] = {str(rid): {"trajectory": traj} for rid, traj in trajectories.to_dict().items()}
+    output["tasks"] = tasks
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(output, f, indent=2)
+
+
+def load_sim_output(path: str) -> Dict:
+    """Load either format as the JSON-shaped dict.
+
+    For ``.simbin`` files each ``agents[rid]["trajectory"]`` is a lazy
+    ``TrajectoryView`` over the memory-mapped positions rather than a list,
+    and ``data["simbin"]`` is the open ``SimBin``.
+    """
+    if not is_simbin(path):
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    run = SimBin(path)
+    data = dict(run.meta)
+    data["agents"] = {str(rid): {"trajectory": view} for rid, view in run.trajectories().items()}
+    data["tasks"] = run.tasks()
+    data["simbin"] = run
+    return data
+
+
+def trajectories_of(data: Dict) -> Dict[int, Sequence[Tuple[int, int]]]:
+    """``{rid: trajectory}`` from loaded output; simbin trajectories stay lazy."""
+    trajectories = {}
+    for rid, info in data.get("agents", {}).items():
+        traj = info.get("trajectory", [])
+        if not isinstance(traj, TrajectoryView):
+            traj = [tuple(p) for p in traj]
+        trajectories[int(rid)] = traj
+    return trajectories
+
+
+class TrajectoryView:
+    """One agent's column of a ``SimBin``; indexes like a list of ``(x, y)`` tuples."""
+
+    def __init__(self, positions, column: int):
+        self._positions = positions
+        self._column = column
+
+    def __len__(self) -> int:
+        return self._positions.shape[0]
+
+    def __getitem__(self, t):
+        if isinstance(t, slice):
+            return [tuple(p) for p in self._positions[t, self._column].tolist()]
+        x, y = self._positions[t, self._column]
+        return int(x), int(y)
+
+    def __iter__(self):
+        return iter(self[:])
+
+
+class SimBin:
+    """Read-only access to a ``.simbin`` file."""
+
+    def __init__(self, path: str):
+        if np is None:
+            raise ImportError("Reading .simbin output requires numpy")
+        with open(path, "rb") as f:
+            magic = f.read(len(_MAGIC))
+            if magic != _MAGIC:
+                raise ValueError(f"{path} is not a simbin file")
+            (size,) = struct.unpack("<Q", f.read(8))
+            header = json.loads(f.read(size).decode("utf-8"))
+        self.path = path
+        self.meta: Dict = header["meta"]
+        self.agent_ids: List[int] = header["agent_ids"]
+        self._columns = {rid: i for i, rid in enumerate(self.agent_ids)}
+        self._arrays = {name: self._map(spec) for name, spec in header["arrays"].items()}
+        self.positions = self._arrays["positions"]
+
+    def __len__(self) -> int:
+        """Number of stored timesteps (``steps + 1``)."""
+        return self.positions.shape[0]
+
+    @property
+    def steps(self) -> int:
+        return len(self) - 1
+
+    def positions_at(self, t: int) -> Dict[int, Tuple[int, int]]:
+        """Every agent's position at timestep ``t`` (clamped to the last step)."""
+        row = self.positions[min(max(t, 0), len(self) - 1)].tolist()
+        return {rid: (x, y) for rid, (x, y) in zip(self.agent_ids, row)}
+
+    def trajectory(self, rid: int) -> List[Tuple[int, int]]:
+        return [tuple(p) for p in self.positions[:, self._columns[rid]].tolist()]
+
+    def trajectories(self) -> Dict[int, TrajectoryView]:
+        return {rid: TrajectoryView(self.positions, i) for i, rid in enumerate(self.agent_ids)}
+
+    def tasks(self) -> List[Dict]:
+        columns = {name: self._arrays["task_" + name].tolist() for name in ("id",) + _TASK_FIELDS}
+        positions = self._arrays["task_pos"].tolist()
+        tasks = []
+        for i, task_id in enumerate(columns["id"]):
+            task = {"id": task_id, "pos": positions[i]}
+            for name in _TASK_FIELDS:
+                value = columns[name][i]
+                task[name] = None if value < 0 else value
+            tasks.append(task)
+        return tasks
+
+    def _map(self, spec: Dict):
+        dtype = np.dtype(spec["dtype"])
+        shape = tuple(spec["shape"])
+        if 0 in shape:
+            return np.zeros(shape, dtype=dtype)
+        return np.memmap(self.path, dtype=dtype, mode="r", offset=spec["offset"], shape=shape)
+
+
+def _write_simbin(path: str, header: Dict, trajectories, tasks: List[Dict]) -> None:
+    if np is None:
+        raise ImportError("Writing .simbin output requires numpy")
+    stored = trajectories.view()
+    agents, length = stored.shape[0], stored.shape[1]
+    pos_dtype = np.dtype(stored.dtype).newbyteorder("<")
+    arrays: List[Tuple[str, object]] = [("positions", None)]
+    columns = {"task_id": np.array([t["id"] for t in tasks], dtype="<i4")}
+    columns["task_pos"] = np.array([t["pos"] for t in tasks], dtype="<i4").reshape(-1, 2)
+    for name in _TASK_FIELDS:
+        columns["task_" + name] = np.array([_optional(t[name]) for t in tasks], dtype="<i4")
+    arrays.extend(columns.items())
+
+    specs: Dict[str, Dict] = {}
+    for name, arr in arrays:
+        if arr is None:
+            specs[name] = {"dtype": pos_dtype.str, "shape": [length, agents, 2]}
+        else:
+            specs[name] = {"dtype": arr.dtype.str, "shape": list(arr.shape)}
+    sizes = {
+        name: int(np.prod(spec["shape"], dtype=np.int64)) * np.dtype(spec["dtype"]).itemsize
+        for name, spec in specs.items()
+    }
+
+    # Offsets depend on the header length, which depends on the offsets'
+    # digits; settle by reserving room until the layout stops moving.
+    reserve = 0
+    while True:
+        offset = _aligned(len(_MAGIC) + 8 + reserve)
+        for name, _ in arrays:
+            specs[name]["offset"] = offset
+            offset = _aligned(offset + sizes[name])
+        blob = json.dumps(
+            {"version": 1, "meta": header, "agent_ids": list(trajectories.agent_ids), "arrays": specs}
+        ).encode("utf-8")
+        if len(blob) <= reserve:
+            break
+        reserve = len(blob) + 64
+
+    with open(path, "wb") as f:
+        f.write(_MAGIC)
+        f.write(struct.pack("<Q", len(blob)))
+        f.write(blob)
+        for name, arr in arrays:
+            f.write(b"\0" * (specs[name]["offset"] - f.tell()))
+            if arr is not None:
+                f.write(arr.tobytes())
+                continue
+            for t0 in range(0, length, _CHUNK_STEPS):
+                block = stored[:, t0 : t0 + _CHUNK_STEPS].transpose(1, 0, 2)
+                f.write(np.ascontiguousarray(block, dtype=pos_dtype).tobytes())
+
+
+def _aligned(offset: int) -> int:
+    return (offset + _ALIGN - 1) // _ALIGN * _ALIGN
+
+
+def _optional(value: Optional[int]) -> int:
+    return -1 if value is None else value
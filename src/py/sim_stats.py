@@ -0,0 +1,119 @@
+"""Streaming statistics for the full simulators.
+
+``StatsCollector`` is fed as the simulation runs: task events from
+``TaskStore``, robot moves as trajectories grow and planning latency per
+round. Each update is O(1). The task backlog is kept as +1/-1 deltas at
+spawn and pickup times, so the whole backlog curve is summarised by one
+sweep over the event times at the end instead of a scan over every
+(timestep, task) pair.
+"""
+
+import math
+from typing import Dict, List, Optional
+
+PERCENTILES = (50, 90, 99)
+
+
+def _avg(values: List[float]) -> Optional[float]:
+    if not values:
+        return None
+    return sum(values) / len(values)
+
+
+def percentiles(values: List[float], points=PERCENTILES) -> Dict[str, Optional[float]]:
+    """Nearest-rank percentiles, ``{"p50": ..., ...}``; ``None`` when ``values`` is empty."""
+    ordered = sorted(values)
+    out: Dict[str, Optional[float]] = {}
+    for p in points:
+        if not ordered:
+            out[f"p{p}"] = None
+            continue
+        rank = max(1, math.ceil(p / 100 * len(ordered)))
+        out[f"p{p}"] = ordered[rank - 1]
+    return out
+
+
+class StatsCollector:
+    def __init__(self):
+        self.tasks_total = 0
+        self.tasks_picked = 0
+        self.tasks_delivered = 0
+        self.pickup_waits: List[int] = []
+        self.delivery_times: List[int] = []
+        self.carry_times: List[int] = []
+        self.plan_latencies: List[float] = []
+        self.total_steps = 0
+        self.idle_steps = 0
+        self._backlog_delta: Dict[int, int] = {}
+
+    def task_spawned(self, task: Dict) -> None:
+        self.tasks_total += 1
+        self._shift_backlog(task["spawn_time"], 1)
+
+    def task_picked(self, task: Dict) -> None:
+        self.tasks_picked += 1
+        self.pickup_waits.append(task["picked_time"] - task["spawn_time"])
+        self._shift_backlog(task["picked_time"], -1)
+
+    def task_delivered(self, task: Dict) -> None:
+        self.tasks_delivered += 1
+        self.delivery_times.append(task["delivered_time"] - task["spawn_time"])
+        self.carry_times.append(task["delivered_time"] - task["picked_time"])
+
+    def robot_step(self, prev, curr) -> None:
+        self.total_steps += 1
+        if prev == curr:
+            self.idle_steps += 1
+
+    def robot_steps(self, total: int, idle: int) -> None:
+        """Batch form of ``robot_step``: ``total`` agent-steps, ``idle`` of them waiting."""
+        self.total_steps += total
+        self.idle_steps += idle
+
+    def plan_latency(self, seconds: float) -> None:
+        self.plan_latencies.append(seconds)
+
+    def backlog_summary(self, sim_end_timestep: int) -> Dict[str, float]:
+        """Mean and max of the open-task count over timesteps ``0..sim_end_timestep``."""
+        backlog = 0
+        area = 0
+        peak = 0
+        last = 0
+        for t in sorted(self._backlog_delta):
+            if t > sim_end_timestep:
+                break
+            area += backlog * (t - last)
+            backlog += self._backlog_delta[t]
+            peak = max(peak, backlog)
+            last = t
+        area += backlog * (sim_end_timestep + 1 - last)
+        return {"avg_backlog": area / (sim_end_timestep + 1), "max_backlog": peak}
+
+    def summary(self, sim_end_timestep: int, agents: int) -> Dict:
+        horizon = max(1, sim_end_timestep)
+        backlog = self.backlog_summary(sim_end_timestep)
+        return {
+            "sim_end_timestep": sim_end_timestep,
+            "agents": agents,
+            "tasks_total": self.tasks_total,
+            "tasks_picked": self.tasks_picked,
+            "tasks_delivered": self.tasks_delivered,
+            "tasks_unpicked": self.tasks_total - self.tasks_picked,
+            "tasks_undelivered": self.tasks_total - self.tasks_delivered,
+            "throughput_picked_per_timestep": self.tasks_picked / horizon,
+            "throughput_delivered_per_timestep": self.tasks_delivered / horizon,
+            "avg_pickup_wait": _avg(self.pickup_waits),
+            "avg_delivery_time": _avg(self.delivery_times),
+            "avg_carry_time": _avg(self.carry_times),
+            "avg_backlog": backlog["avg_backlog"],
+            "max_backlog": backlog["max_backlog"],
+            "idle_ratio": self.idle_steps / self.total_steps if self.total_steps > 0 else None,
+            "move_ratio": (self.total_steps - self.idle_steps) / self.total_steps if self.total_steps > 0 else None,
+            "pickup_wait_percentiles": percentiles(self.pickup_waits),
+            "delivery_time_percentiles": percentiles(self.delivery_times),
+            "avg_plan_latency_s": _avg(self.plan_latencies),
+            "plan_latency_percentiles_s": percentiles(self.plan_latencies),
+        }
+
+    def _shift_backlog(self, t: int, delta: int) -> None:
+        self._backlog_delta[t] = self._backlog_delta.get(t, 0) + delta
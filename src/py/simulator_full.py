@@ -4,12 +4,23 @@ import math
 import os
 import random
 import sys
-from typing import Dict, List, Tuple
+import time
+from typing import Dict, List, Optional, Tuple
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), ".")))
 
+from collision_check import TrajectoryValidator
 from data_types import RobotState, DIR_EAST
-from planner import plan_round, plan_round_rot
+from planner import cache_stats, plan_round, plan_round_rot, repair_round
+from planner_cache import KeyedGrid
+from round_log import RoundLog
+from sim_output import write_sim_output
+from sim_stats import StatsCollector
+from task_store import TaskStore
+from trajectory_buffer import TrajectoryBuffer
+
+
+REPLAN_POLICIES = ("event", "window", "count", "latency")
 
 
 def load_map(map_path: str) -> Dict:
@@ -34,41 +45,8 @@ def random_free_positions(cells: List[List[int]], count: int, avoid: List[Tuple[
     return random.sample(candidates, count)
 
 
-def ensure_tasks(
-    tasks: List[Dict],
-    shelf_cells: List[Tuple[int, int]],
-    current_timestep: int,
-    agent_count: int,
-    next_task_id: int,
-) -> int:
-    available_positions = {
-        tuple(t["pos"])
-        for t in tasks
-        if t["spawn_time"] <= current_timestep and t["picked_time"] is None
-    }
-    min_required = max(agent_count, math.ceil(len(shelf_cells) * 0.2))
-    if len(available_positions) < min_required:
-        need = min_required - len(available_positions)
-        candidates = [p for p in shelf_cells if p not in available_positions]
-        if need > len(candidates):
-            raise RuntimeError("Not enough unique shelf cells to allocate tasks")
-        for _ in range(need):
-            x, y = random.choice(candidates)
-            candidates.remove((x, y))
-            available_positions.add((x, y))
-            tasks.append(
-                {
-                    "id": next_task_id,
-                    "pos": (x, y),
-                    "spawn_time": current_timestep,
-                    "picked_time": None,
-                    "delivered_time": None,
-                    "picked_by": None,
-                    "delivered_by": None,
-                }
-            )
-            next_task_id += 1
-    return next_task_id
+def ensure_tasks(store: TaskStore, shelf_cells: List[Tuple[int, int]], current_timestep: int, agent_count: int) -> None:
+    store.ensure_open(max(agent_count, math.ceil(len(shelf_cells) * 0.2)), current_timestep)
 
 
 def run_simulation(
@@ -80,7 +58,23 @@ def run_simulation(
     solver: str = "dinic",
     debug: bool = False,
     rotation: bool = False,
+    lazy_rotation: bool = False,
+    concurrent_orders: bool = False,
+    t_policy: str = "double",
+    deadline_s: Optional[float] = None,
+    candidate_k: Optional[int] = None,
+    incremental: bool = False,
+    replan_policy: str = "event",
+    replan_window: int = 1,
+    replan_events: int = 1,
+    step_s: float = 1.0,
+    task_archive: Optional[str] = None,
+    round_log: Optional[str] = None,
 ) -> None:
+    if incremental and rotation:
+        raise ValueError("Incremental replanning does not support rotation")
+    if replan_policy not in REPLAN_POLICIES:
+        raise ValueError(f"Unknown replan_policy: {replan_policy}")
     random.seed(seed)
     data = load_map(map_path)
     cells = data.get("cells")
@@ -104,7 +98,6 @@ def run_simulation(
     starts = random_free_positions(cells, agent_count, avoid=goals)
 
     agents: Dict[int, Dict] = {}
-    trajectories: Dict[int, List[Tuple[int, int]]] = {}
     for i, pos in enumerate(starts, start=1):
         agents[i] = {
             "pos": pos,
@@ -112,186 +105,313 @@ def run_simulation(
             "carrying": None,
             "facing": DIR_EAST,
         }
-        trajectories[i] = [pos]
-
-    tasks: List[Dict] = []
-    next_task_id = 1
+    trajectories = TrajectoryBuffer(sorted(agents), starts)
+    # Each round's new steps are checked as they are appended.
+    validator = TrajectoryValidator(sorted(agents), starts, width)
+
+    log = None
+    if round_log:
+        log = RoundLog(
+            round_log,
+            {"map": map_path, "max_timestep": max_timestep, "seed": seed, "solver": solver},
+            sorted(agents),
+            starts,
+        )
+    collector = StatsCollector()
+    store = TaskStore(shelf_cells, archive_path=task_archive, stats=collector, log=log)
     current_timestep = 0
 
-    next_task_id = ensure_tasks(tasks, shelf_cells, current_timestep, agent_count, next_task_id)
+    ensure_tasks(store, shelf_cells, current_timestep, agent_count)
 
-    grid = [[1 if cell == 1 else 0 for cell in row] for row in cells]
+    # Fingerprinted once here rather than by every planner call.
+    grid = KeyedGrid([[1 if cell == 1 else 0 for cell in row] for row in cells])
     drop_caps = {g: 1 for g in goals}
-
-    while current_timestep < max_timestep:
-        next_task_id = ensure_tasks(tasks, shelf_cells, current_timestep, agent_count, next_task_id)
-
-        available_tasks = [t for t in tasks if t["spawn_time"] <= current_timestep and t["picked_time"] is None]
-        unique_tasks: Dict[Tuple[int, int], Dict] = {}
-        for t in available_tasks:
-            pos = tuple(t["pos"])
-            if pos not in unique_tasks:
-                unique_tasks[pos] = t
-        pickup_points = [t["pos"] for t in unique_tasks.values()]
-
-        if debug:
-            print(
-                f"[sim] timestep={current_timestep} empty={sum(1 for a in agents.values() if a['state']=='Empty')} "
-                f"loaded={sum(1 for a in agents.values() if a['state']=='Loaded')} "
-                f"pickups={len(pickup_points)} goals={len(goals)}"
-            )
-
-        robots: List[RobotState] = []
-        for rid in sorted(agents.keys()):
-            agent = agents[rid]
-            robots.append(RobotState(id=rid, pos=agent["pos"], state=agent["state"], facing=agent["facing"]))
-
-        if rotation:
-            T, paths, path_dirs = plan_round_rot(grid, robots, pickup_points, goals, drop_caps, T_max=max_timestep, method=solver)
-        else:
-            T, paths = plan_round(grid, robots, pickup_points, goals, drop_caps, T_max=max_timestep, method=solver)
-            path_dirs = {}
-        if T is None:
-            empty_count = sum(1 for r in robots if r.state == "Empty")
-            loaded_count = sum(1 for r in robots if r.state == "Loaded")
-            unique_pickups = len({tuple(p) for p in pickup_points})
-            from planner import explain_infeasible
-            reasons = explain_infeasible(grid, robots, pickup_points, goals, drop_caps, max_timestep, method=solver)
-            diagnostics = (
-                f"Planning failed at timestep {current_timestep}. "
-                f"empty={empty_count}, loaded={loaded_count}, "
-                f"pickup_points={len(pickup_points)} (unique={unique_pickups}), "
-                f"goals={len(goals)}, max_timestep={max_timestep}, "
-                f"loaded_first={reasons['loaded_first']}, empty_first={reasons['empty_first']}, "
-                f"loaded_only={reasons['loaded_only']}, empty_only={reasons['empty_only']}."
-            )
-            raise RuntimeError(diagnostics)
-
-        arrival_times: Dict[int, int] = {}
-        for r in robots:
-            path = paths.get(r.id, [])
-            if not path:
-                arrival_times[r.id] = len(path)
-                continue
-            target_set = set(pickup_points) if r.state == "Empty" else set(goals)
-            arrival = None
-            for t, pos in enumerate(path):
-                if pos in target_set:
-                    arrival = t
-                    break
-            if arrival is None:
-                arrival = len(path) - 1
-            arrival_times[r.id] = arrival
-
-        delta = min(arrival_times.values()) if arrival_times else 0
-        if delta <= 0:
-            delta = 1
-        exceeds = current_timestep + delta > max_timestep
-
-        if debug:
-            print(f"[sim] plan window T={T}, delta={delta}")
-
-        for rid in sorted(agents.keys()):
-            path = paths.get(rid, [])
-            for step in range(1, delta + 1):
-                if step < len(path):
-                    trajectories[rid].append(path[step])
-                elif path:
-                    trajectories[rid].append(path[-1])
-                else:
-                    trajectories[rid].append(agents[rid]["pos"])
-
-        current_timestep += delta
-
-        for rid in sorted(agents.keys()):
-            path = paths.get(rid, [])
-            if path:
-                agents[rid]["pos"] = path[min(delta, len(path) - 1)]
-            if rotation and rid in path_dirs:
-                dirs = path_dirs[rid]
-                if dirs:
-                    agents[rid]["facing"] = dirs[min(delta, len(dirs) - 1)]
-
-        for rid, arrival in arrival_times.items():
-            if arrival != delta:
-                continue
-            agent = agents[rid]
-            pos = agent["pos"]
-            if agent["state"] == "Empty" and pos in pickup_points:
-                for task in tasks:
-                    if task["picked_time"] is None and task["pos"] == pos and task["spawn_time"] <= current_timestep:
-                        task["picked_time"] = current_timestep
-                        task["picked_by"] = rid
+    plan_status: Dict[str, int] = {}
+    # Incremental mode: remaining paths (index 0 = now) of robots whose plan still holds.
+    kept: Dict[int, List[Tuple[int, int]]] = {}
+    repair_stats = {"repairs": 0, "fallbacks": 0, "replanned": 0}
+    replan_stats = {"replans": 0, "events": 0, "event_wait_steps": 0, "plan_time_s": 0.0, "max_plan_time_s": 0.0}
+
+    try:
+        while current_timestep < max_timestep:
+            ensure_tasks(store, shelf_cells, current_timestep, agent_count)
+
+            # One open task per shelf cell, so the pickups are already unique.
+            pickup_points = [t["pos"] for t in store.open_tasks(current_timestep)]
+
+            if debug:
+                print(
+                    f"[sim] timestep={current_timestep} empty={sum(1 for a in agents.values() if a['state']=='Empty')} "
+                    f"loaded={sum(1 for a in agents.values() if a['state']=='Loaded')} "
+                    f"pickups={len(pickup_points)} goals={len(goals)}"
+                )
+
+            robots: List[RobotState] = []
+            for rid in sorted(agents.keys()):
+                agent = agents[rid]
+                robots.append(RobotState(id=rid, pos=agent["pos"], state=agent["state"], facing=agent["facing"]))
+
+            search_info: Dict = {}
+            plan_start = time.monotonic()
+            if rotation:
+                T, paths, path_dirs = plan_round_rot(
+                    grid, robots, pickup_points, goals, drop_caps, T_max=max_timestep, method=solver, lazy=lazy_rotation,
+                    concurrent_orders=concurrent_orders, t_policy=t_policy,
+                    deadline_s=deadline_s, search_info=search_info, candidate_k=candidate_k,
+                )
+            else:
+                T = None
+                fallback = True
+                round_deadline = plan_start + deadline_s if deadline_s is not None else None
+                if kept:
+                    T, paths = repair_round(
+                        grid, robots, kept, pickup_points, goals, drop_caps, T_max=max_timestep, method=solver,
+                        t_policy=t_policy, deadline_s=deadline_s, search_info=search_info,
+                    )
+                    if T is not None:
+                        repair_stats["repairs"] += 1
+                        repair_stats["replanned"] += search_info["replanned"]
+                        fallback = False
+                    elif search_info.get("status") == "timeout":
+                        # The round's budget is spent: keep the timeout and hold.
+                        fallback = False
+                    else:
+                        repair_stats["fallbacks"] += 1
+                        search_info = {}
+                if fallback:
+                    # The fallback gets what is left of the round's budget, not a fresh one.
+                    remaining = None if round_deadline is None else max(0.0, round_deadline - time.monotonic())
+                    T, paths = plan_round(
+                        grid, robots, pickup_points, goals, drop_caps, T_max=max_timestep, method=solver,
+                        concurrent_orders=concurrent_orders, t_policy=t_policy,
+                        deadline_s=remaining, search_info=search_info, candidate_k=candidate_k,
+                    )
+                path_dirs = {}
+            plan_time = time.monotonic() - plan_start
+            collector.plan_latency(plan_time)
+            replan_stats["replans"] += 1
+            replan_stats["plan_time_s"] += plan_time
+            replan_stats["max_plan_time_s"] = max(replan_stats["max_plan_time_s"], plan_time)
+            status = search_info.get("status", "optimal")
+            plan_status[status] = plan_status.get(status, 0) + 1
+            if T is None and status == "timeout":
+                # No plan within the budget: every robot holds its cell for one step.
+                T = 1
+                paths = {r.id: [r.pos, r.pos] for r in robots}
+                path_dirs = {}
+            if T is None:
+                empty_count = sum(1 for r in robots if r.state == "Empty")
+                loaded_count = sum(1 for r in robots if r.state == "Loaded")
+                unique_pickups = len({tuple(p) for p in pickup_points})
+                from planner import explain_infeasible
+                reasons = explain_infeasible(grid, robots, pickup_points, goals, drop_caps, max_timestep, method=solver)
+                diagnostics = (
+                    f"Planning failed at timestep {current_timestep}. "
+                    f"empty={empty_count}, loaded={loaded_count}, "
+                    f"pickup_points={len(pickup_points)} (unique={unique_pickups}), "
+                    f"goals={len(goals)}, max_timestep={max_timestep}, "
+                    f"loaded_first={reasons['loaded_first']}, empty_first={reasons['empty_first']}, "
+                    f"loaded_only={reasons['loaded_only']}, empty_only={reasons['empty_only']}."
+                )
+                raise RuntimeError(diagnostics)
+
+            arrival_times: Dict[int, int] = {}
+            for r in robots:
+                path = paths.get(r.id, [])
+                if not path:
+                    arrival_times[r.id] = len(path)
+                    continue
+                target_set = set(pickup_points) if r.state == "Empty" else set(goals)
+                arrival = None
+                for t, pos in enumerate(path):
+                    if pos in target_set:
+                        arrival = t
+                        break
+                if arrival is None:
+                    arrival = len(path) - 1
+                arrival_times[r.id] = arrival
+
+            delta = min(arrival_times.values()) if arrival_times else 0
+            if delta <= 0:
+                delta = 1
+            # Each robot stops at its first target; later steps of its path are dropped.
+            paths = {rid: _hold_after(path, arrival_times[rid]) for rid, path in paths.items()}
+            path_dirs = {rid: _hold_after(dirs, arrival_times[rid]) for rid, dirs in path_dirs.items()}
+            steps = _replan_steps(replan_policy, replan_window, replan_events, step_s, arrival_times, delta, plan_time)
+            if steps > delta:
+                steps = _safe_prefix(paths, delta, steps)
+            exceeds = current_timestep + steps > max_timestep
+
+            if debug:
+                print(f"[sim] plan window T={T}, delta={delta}, steps={steps}")
+
+            segments = []
+            for rid in sorted(agents.keys()):
+                path = paths.get(rid, [])
+                if not path:
+                    path = [agents[rid]["pos"]]
+                segments.append([path[min(step, len(path) - 1)] for step in range(1, steps + 1)])
+            trajectories.append(segments)
+            collector.robot_steps(len(segments) * steps, trajectories.idle_steps(steps))
+            validator.extend(trajectories.tail(steps))
+
+            round_start = current_timestep
+            current_timestep += steps
+            if incremental:
+                kept = {rid: paths[rid][steps:] for rid, arrival in arrival_times.items() if arrival > steps}
+
+            for rid in sorted(agents.keys()):
+                path = paths.get(rid, [])
+                if path:
+                    agents[rid]["pos"] = path[min(steps, len(path) - 1)]
+                if rotation and rid in path_dirs:
+                    dirs = path_dirs[rid]
+                    if dirs:
+                        agents[rid]["facing"] = dirs[min(steps, len(dirs) - 1)]
+
+            for rid, arrival in sorted(arrival_times.items(), key=lambda item: (item[1], item[0])):
+                # A robot that started the round on its target arrives at 0 < delta.
+                if arrival > steps:
+                    continue
+                agent = agents[rid]
+                pos = agent["pos"]
+                arrival = max(arrival, 1)
+                event_time = round_start + arrival
+                if agent["state"] == "Empty" and pos in pickup_points:
+                    task = store.open_at(pos, event_time)
+                    if task is not None:
+                        store.pick(task["id"], event_time, rid)
                         agent["carrying"] = task["id"]
                         agent["state"] = "Loaded"
-                        break
-            elif agent["state"] == "Loaded" and pos in goals:
-                task_id = agent["carrying"]
-                if task_id is not None:
-                    for task in tasks:
-                        if task["id"] == task_id:
-                            task["delivered_time"] = current_timestep
-                            task["delivered_by"] = rid
-                            break
-                agent["carrying"] = None
-                agent["state"] = "Empty"
-
-        if exceeds:
-            break
-
-    _validate_collision_free(trajectories)
+                        replan_stats["events"] += 1
+                        replan_stats["event_wait_steps"] += steps - arrival
+                elif agent["state"] == "Loaded" and pos in goals:
+                    task_id = agent["carrying"]
+                    if task_id is not None:
+                        store.deliver(task_id, event_time, rid)
+                    agent["carrying"] = None
+                    agent["state"] = "Empty"
+                    replan_stats["events"] += 1
+                    replan_stats["event_wait_steps"] += steps - arrival
+
+            if log is not None:
+                log.round(round_start, T, None, steps, plan_time, status, segments)
+            if exceeds:
+                break
+    except BaseException:
+        if log is not None:
+            log.close()
+        raise
+
+    delivered = store.counts()["delivered"]
+    replanning = {
+        "policy": replan_policy,
+        "replan_window": replan_window,
+        "replan_events": replan_events,
+        "step_s": step_s,
+        "steps": current_timestep,
+        "replans": replan_stats["replans"],
+        "events": replan_stats["events"],
+        "events_per_replan": replan_stats["events"] / max(1, replan_stats["replans"]),
+        "mean_event_wait": replan_stats["event_wait_steps"] / max(1, replan_stats["events"]),
+        "plan_time_s": replan_stats["plan_time_s"],
+        "mean_plan_time_s": replan_stats["plan_time_s"] / max(1, replan_stats["replans"]),
+        "max_plan_time_s": replan_stats["max_plan_time_s"],
+        "deliveries": delivered,
+        "throughput": delivered / max(1, current_timestep),
+    }
 
     output = {
         "map": map_path,
         "max_timestep": max_timestep,
         "seed": seed,
         "solver": solver,
-        "agents": {
-            str(rid): {
-                "trajectory": trajectories[rid],
-            }
-            for rid in trajectories
-        },
-        "tasks": [
-            {
-                "id": t["id"],
-                "pos": t["pos"],
-                "spawn_time": t["spawn_time"],
-                "picked_time": t["picked_time"],
-                "delivered_time": t["delivered_time"],
-                "picked_by": t["picked_by"],
-                "delivered_by": t["delivered_by"],
-            }
-            for t in tasks
-        ],
+        "deadline_s": deadline_s,
+        "candidate_k": candidate_k,
+        "incremental": repair_stats if incremental else None,
+        "replanning": replanning,
+        "plan_status": plan_status,
+        "planner_cache": cache_stats(),
+        "stats": collector.summary(current_timestep, len(agents)),
     }
-
-    with open(output_path, "w", encoding="utf-8") as f:
-        json.dump(output, f, indent=2)
-
-
-def _validate_collision_free(trajectories: Dict[int, List[Tuple[int, int]]]) -> None:
-    if not trajectories:
-        return
-    max_len = max(len(t) for t in trajectories.values())
-    for t in range(max_len):
-        occupied = {}
-        for rid, traj in trajectories.items():
-            pos = traj[min(t, len(traj) - 1)]
-            if pos in occupied:
-                raise RuntimeError(f"Vertex collision at t={t} between agents {occupied[pos]} and {rid}")
-            occupied[pos] = rid
-        if t == 0:
-            continue
-        edge_used = {}
-        for rid, traj in trajectories.items():
-            prev = traj[min(t - 1, len(traj) - 1)]
-            curr = traj[min(t, len(traj) - 1)]
-            edge = (prev, curr)
-            rev = (curr, prev)
-            if rev in edge_used and edge_used[rev] != rid:
-                raise RuntimeError(f"Edge collision at t={t} between agents {edge_used[rev]} and {rid}")
-            edge_used[edge] = rid
+    tasks = [
+        {
+            "id": t["id"],
+            "pos": t["pos"],
+            "spawn_time": t["spawn_time"],
+            "picked_time": t["picked_time"],
+            "delivered_time": t["delivered_time"],
+            "picked_by": t["picked_by"],
+            "delivered_by": t["delivered_by"],
+        }
+        for t in store.all_tasks()
+    ]
+    store.close()
+
+    if log is not None:
+        log.close(output)
+    write_sim_output(output_path, output, trajectories, tasks)
+
+
+def _hold_after(seq: List, t: int) -> List:
+    """``seq`` with every entry after index ``t`` replaced by ``seq[t]``."""
+    if not seq:
+        return seq
+    t = min(t, len(seq) - 1)
+    return seq[: t + 1] + [seq[t]] * (len(seq) - t - 1)
+
+
+def _replan_steps(
+    policy: str,
+    window: int,
+    events: int,
+    step_s: float,
+    arrival_times: Dict[int, int],
+    delta: int,
+    plan_time: float,
+) -> int:
+    """Steps to execute before the next replan (at least ``delta``, the first event).
+
+    - ``event``: replan at the first event.
+    - ``window``: also take every event within ``window`` steps of the first one.
+    - ``count``: run until ``events`` robots have reached their targets.
+    - ``latency``: a plan that took ``plan_time`` seconds covers
+      ``plan_time / step_s`` simulated steps, so the next replan waits that long.
+    Robots that arrive earlier wait at their targets.
+    """
+    if policy == "window":
+        steps = delta + max(1, window) - 1
+    elif policy == "count":
+        arrivals = sorted(arrival_times.values())
+        steps = arrivals[min(max(1, events), len(arrivals)) - 1] if arrivals else delta
+    elif policy == "latency":
+        steps = math.ceil(plan_time / step_s) if step_s > 0 else delta
+    else:
+        steps = delta
+    latest = max(arrival_times.values(), default=delta)
+    return max(delta, min(steps, latest))
+
+
+def _safe_prefix(paths: Dict[int, List[Tuple[int, int]]], start: int, limit: int) -> int:
+    """Largest ``t`` in ``[start, limit]`` with no vertex or swap conflict in ``paths`` up to ``t``.
+
+    Paths are conflict-free up to the first arrival; beyond it a robot
+    waiting at its target may be in the way of a path that assumed it had
+    left the network.
+    """
+    for t in range(start + 1, limit + 1):
+        occupied = set()
+        moves = set()
+        for path in paths.values():
+            if not path:
+                continue
+            pos = path[min(t, len(path) - 1)]
+            prev = path[min(t - 1, len(path) - 1)]
+            if pos in occupied or (prev != pos and (pos, prev) in moves):
+                return t - 1
+            occupied.add(pos)
+            moves.add((prev, pos))
+    return limit
 
 
 def main() -> None:
@@ -299,11 +419,68 @@ def main() -> None:
     parser.add_argument("--map", required=True, help="Path to map json")
     parser.add_argument("--agents", type=int, required=True, help="Number of agents")
     parser.add_argument("--max_timestep", type=int, required=True, help="Max timestep")
-    parser.add_argument("--output", default="simulation_output.json", help="Output JSON path")
+    parser.add_argument("--output", default="simulation_output.json", help="Output path (.json, or .simbin for the binary format)")
     parser.add_argument("--seed", type=int, default=0, help="Random seed")
-    parser.add_argument("--solver", default="dinic", help="Max-flow solver: dinic or hlpp")
+    parser.add_argument("--solver", default="dinic", help="Max-flow solver: dinic, hlpp or auto")
     parser.add_argument("--debug", action="store_true", help="Print debug info per planning round")
     parser.add_argument("--rotation", action="store_true", help="Enable rotation-aware planning")
+    parser.add_argument(
+        "--lazy_rotation",
+        action="store_true",
+        help="With --rotation: plan positions first, insert turns and repair conflicts locally",
+    )
+    parser.add_argument(
+        "--concurrent_orders",
+        action="store_true",
+        help="Run loaded-first and empty-first orderings in parallel threads",
+    )
+    parser.add_argument(
+        "--t_policy",
+        choices=["double", "flow"],
+        default="double",
+        help="Makespan search: plain doubling, or steps guided by the max-flow deficit",
+    )
+    parser.add_argument(
+        "--deadline_s",
+        type=float,
+        default=None,
+        help="Wall-clock budget per planning round; returns the best plan found so far",
+    )
+    parser.add_argument(
+        "--candidate_k",
+        type=int,
+        default=None,
+        help="Offer the planner only the k nearest pickups per robot (widened when a round fails)",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="On each event re-plan only the robots that reached a target and their neighbours",
+    )
+    parser.add_argument(
+        "--replan_policy",
+        choices=list(REPLAN_POLICIES),
+        default="event",
+        help="When to replan: first event, events within a window, every N events, or planning latency",
+    )
+    parser.add_argument("--replan_window", type=int, default=1, help="Window length in steps for --replan_policy window")
+    parser.add_argument("--replan_events", type=int, default=1, help="Events per replan for --replan_policy count")
+    parser.add_argument(
+        "--step_s",
+        type=float,
+        default=1.0,
+        help="Wall-clock seconds per simulated step for --replan_policy latency",
+    )
+    parser.add_argument(
+        "--task_archive",
+        default=None,
+        help="Append delivered tasks to this JSON-lines file instead of keeping them in memory",
+    )
+    parser.add_argument(
+        "--round_log",
+        default=None,
+        help="Stream one JSON-lines record per planning round to this path (see round_log.py)",
+    )
     args = parser.parse_args()
 
     run_simulation(
@@ -315,6 +492,18 @@ def main() -> None:
         solver=args.solver,
         debug=args.debug,
         rotation=args.rotation,
+        lazy_rotation=args.lazy_rotation,
+        concurrent_orders=args.concurrent_orders,
+        t_policy=args.t_policy,
+        deadline_s=args.deadline_s,
+        candidate_k=args.candidate_k,
+        incremental=args.incremental,
+        replan_policy=args.replan_policy,
+        replan_window=args.replan_window,
+        replan_events=args.replan_events,
+        step_s=args.step_s,
+        task_archive=args.task_archive,
+        round_log=args.round_log,
     )
 
 
@@ -4,13 +4,26 @@ import math
 import os
 import random
 import sys
+import time
 from collections import deque
-from typing import Dict, Iterable, List, Set, Tuple
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Dict, Iterable, List, Optional, Set, Tuple
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), ".")))
 
+from checkpoint import load_checkpoint, save_checkpoint
+from collision_check import TrajectoryValidator, validate_collision_free as _validate_collision_free
 from data_types import RobotState, DIR_EAST
-from planner import plan_round_sync
+from distance_oracle import HAVE_NUMPY, DistanceOracle
+from planner import cache_snapshot, cache_stats, plan_round_sync, restore_cache_snapshot
+from planner_cache import KeyedGrid
+from planner_pool import PlannerPool
+from round_log import RoundLog, load_trajectories
+from sim_output import write_sim_output
+from sim_stats import StatsCollector
+from solver_select import resolved_engine
+from task_store import TaskStore
+from trajectory_buffer import TrajectoryBuffer
 
 
 def load_map(map_path: str) -> Dict:
@@ -49,41 +62,8 @@ def reachable_cells(cells: List[List[int]], sources: Iterable[Tuple[int, int]])
     return visited
 
 
-def ensure_tasks(
-    tasks: List[Dict],
-    shelf_cells: List[Tuple[int, int]],
-    current_timestep: int,
-    agent_count: int,
-    next_task_id: int,
-) -> int:
-    available_positions = {
-        tuple(t["pos"])
-        for t in tasks
-        if t["spawn_time"] <= current_timestep and t["picked_time"] is None
-    }
-    min_required = max(agent_count, math.ceil(len(shelf_cells) * 0.2))
-    if len(available_positions) < min_required:
-        need = min_required - len(available_positions)
-        candidates = [p for p in shelf_cells if p not in available_positions]
-        if need > len(candidates):
-            raise RuntimeError("Not enough unique shelf cells to allocate tasks")
-        for _ in range(need):
-            x, y = random.choice(candidates)
-            candidates.remove((x, y))
-            available_positions.add((x, y))
-            tasks.append(
-                {
-                    "id": next_task_id,
-                    "pos": (x, y),
-                    "spawn_time": current_timestep,
-                    "picked_time": None,
-                    "delivered_time": None,
-                    "picked_by": None,
-                    "delivered_by": None,
-                }
-            )
-            next_task_id += 1
-    return next_task_id
+def ensure_tasks(store: TaskStore, shelf_cells: List[Tuple[int, int]], current_timestep: int, agent_count: int) -> None:
+    store.ensure_open(max(agent_count, math.ceil(len(shelf_cells) * 0.2)), current_timestep)
 
 
 def run_simulation(
@@ -97,7 +77,38 @@ def run_simulation(
     t_workers: int = 1,
     debug: bool = False,
     debug_every: int = 25,
+    t_policy: str = "double",
+    deadline_s: Optional[float] = None,
+    candidate_k: Optional[int] = None,
+    task_archive: Optional[str] = None,
+    round_log: Optional[str] = None,
+    checkpoint: Optional[str] = None,
+    checkpoint_every: int = 1000,
+    resume: bool = False,
+    pipeline: bool = False,
+    step_s: float = 1.0,
+    oracle_dir: Optional[str] = None,
+    no_oracle: bool = False,
 ) -> None:
+    config = {
+        "map": map_path,
+        "agent_count": agent_count,
+        "max_timestep": max_timestep,
+        "seed": seed,
+        "solver": solver,
+        "engine": resolved_engine(solver),
+        "deadline_s": deadline_s,
+        "t_policy": t_policy,
+        "candidate_k": candidate_k,
+        "round_log": round_log,
+        "pipeline": pipeline,
+    }
+    saved = None
+    if resume:
+        if not checkpoint:
+            raise ValueError("resume requires a checkpoint path")
+        if os.path.exists(checkpoint):
+            saved = load_checkpoint(checkpoint, config)
     random.seed(seed)
     data = load_map(map_path)
     cells = data.get("cells")
@@ -139,45 +150,75 @@ def run_simulation(
     starts = random_free_positions(start_candidates, agent_count)
 
     agents: Dict[int, Dict] = {}
-    trajectories: Dict[int, List[Tuple[int, int]]] = {}
     for i, pos in enumerate(starts, start=1):
         agents[i] = {
             "pos": pos,
             "facing": DIR_EAST,
         }
-        trajectories[i] = [pos]
-
-    tasks: List[Dict] = []
-    next_task_id = 1
-    current_timestep = 0
-
-    next_task_id = ensure_tasks(tasks, shelf_cells, current_timestep, agent_count, next_task_id)
-
-    grid = [[1 if cell == 1 else 0 for cell in row] for row in cells]
+    trajectories = TrajectoryBuffer(sorted(agents), starts)
+    if saved is not None:
+        agents = saved["agents"]
+        trajectories = saved["trajectories"]
+        if trajectories is None:
+            # The trajectories live in the round log, up to the checkpointed offset.
+            trajectories = load_trajectories(round_log, saved["round_log"]["offset"])
+    # Each round's new steps are checked as they are appended.
+    validator = TrajectoryValidator(sorted(agents), trajectories.last(), width)
+    validator.t = trajectories.steps
+
+    log = None
+    if round_log:
+        log = RoundLog(
+            round_log,
+            {"map": map_path, "max_timestep": max_timestep, "seed": seed, "solver": solver},
+            sorted(agents),
+            starts,
+            resume=saved["round_log"] if saved is not None else None,
+        )
+    # Fingerprinted once here rather than by every planner call.
+    grid = KeyedGrid([[1 if cell == 1 else 0 for cell in row] for row in cells])
     drop_caps = {g: 1 for g in goals}
-
-    while current_timestep < max_timestep:
-        next_task_id = ensure_tasks(tasks, shelf_cells, current_timestep, agent_count, next_task_id)
-
-        available_tasks = [t for t in tasks if t["spawn_time"] <= current_timestep and t["picked_time"] is None]
-        unique_tasks: Dict[Tuple[int, int], Dict] = {}
-        for t in available_tasks:
-            pos = tuple(t["pos"])
-            if pos not in unique_tasks:
-                unique_tasks[pos] = t
-        pickup_points = [t["pos"] for t in unique_tasks.values()]
-
-        if debug:
-            print(
-                f"[sync] timestep={current_timestep} agents={agent_count} "
-                f"pickups={len(pickup_points)} goals={len(goals)}"
-            )
-
-        robots: List[RobotState] = []
-        for rid in sorted(agents.keys()):
-            agent = agents[rid]
-            robots.append(RobotState(id=rid, pos=agent["pos"], state="Empty"))
-
+    if saved is None:
+        collector = StatsCollector()
+        store = TaskStore(shelf_cells, archive_path=task_archive, stats=collector, log=log)
+        current_timestep = 0
+        ensure_tasks(store, shelf_cells, current_timestep, agent_count)
+        plan_status: Dict[str, int] = {}
+        pipeline_stats = {"speculative": 0, "hits": 0, "misses": 0, "plan_time_s": 0.0, "exposed_s": 0.0, "wait_s": 0.0}
+        # Speculative plan for the coming round: (pickups it assumed, future, seconds it could hide behind).
+        pending = None
+    else:
+        collector = saved["collector"]
+        store = saved["store"]
+        store.stats = collector
+        store.log = log
+        current_timestep = saved["timestep"]
+        plan_status = saved["plan_status"]
+        random.setstate(saved["random"])
+        restore_cache_snapshot(saved["planner_cache"], [grid])
+        pipeline_stats = saved["pipeline"]
+        pending = None
+        if saved["speculation"] is not None:
+            spec_pickups, spec_result, hidden_s = saved["speculation"]
+            future: Future = Future()
+            future.set_result(spec_result)
+            pending = (spec_pickups, future, hidden_s)
+    next_checkpoint = current_timestep + checkpoint_every
+    # Pickups are always shelf cells and drops are goals, so their distance
+    # fields can be computed once per map instead of by BFS every round.
+    # They are persisted under ``oracle_dir`` (default: the planner cache dir).
+    oracle = None
+    if HAVE_NUMPY and not no_oracle:
+        oracle = DistanceOracle.for_map(grid, shelf_cells + goals, oracle_dir)
+
+    # One pool for the whole run: its threads serve every round's probes.
+    pool = PlannerPool(workers) if workers > 1 else None
+    # Pipelined mode plans the next round on this thread while the current one executes.
+    speculator = ThreadPoolExecutor(max_workers=1, thread_name_prefix="sync-speculate") if pipeline else None
+
+    def plan(robots: List[RobotState], pickup_points: List[Tuple[int, int]]):
+        search_info: Dict = {}
+        plan_start = time.monotonic()
         T, tau, paths = plan_round_sync(
             grid,
             robots,
@@ -190,74 +231,173 @@ def run_simulation(
             parallel_T_workers=t_workers,
             verbose=debug,
             progress_every=debug_every,
+            t_policy=t_policy,
+            deadline_s=deadline_s,
+            candidate_k=candidate_k,
+            search_info=search_info,
+            pool=pool,
+            oracle=oracle,
         )
-        if T is None or tau is None:
-            from planner import explain_infeasible_sync
-
-            reasons = explain_infeasible_sync(grid, robots, pickup_points, goals)
-            diagnostics = (
-                f"Sync planning failed at timestep {current_timestep}. "
-                f"agents={agent_count}, pickup_points={len(pickup_points)}, goals={len(goals)}, "
-                f"max_timestep={max_timestep}, unreachable_starts={reasons['unreachable_starts']}, "
-                f"reachable_pickups={reasons['reachable_pickups']}, tau_min={reasons['tau_min']}, "
-                f"min_drop_needed={reasons['min_drop_needed']}."
-            )
-            raise RuntimeError(diagnostics)
-
-        if debug:
-            print(f"[sync] phase tau={tau} total={T}")
-        _validate_sync_round(grid, paths, pickup_points, goals, tau, T)
-
-        delta = max(1, T)
-        exceeds = current_timestep + delta > max_timestep
-
-        for rid in sorted(agents.keys()):
-            path = paths.get(rid, [])
-            for step in range(1, delta + 1):
-                if step < len(path):
-                    trajectories[rid].append(path[step])
-                elif path:
-                    trajectories[rid].append(path[-1])
+        return T, tau, paths, search_info.get("status", "optimal"), time.monotonic() - plan_start
+
+    try:
+        while current_timestep < max_timestep:
+            if checkpoint and current_timestep >= next_checkpoint:
+                speculation = None
+                if pending is not None:
+                    speculation = (pending[0], pending[1].result(), pending[2])
+                save_checkpoint(
+                    checkpoint,
+                    {
+                        "config": config,
+                        "timestep": current_timestep,
+                        "agents": agents,
+                        "store": store,
+                        "collector": collector,
+                        "random": random.getstate(),
+                        "plan_status": plan_status,
+                        "planner_cache": cache_snapshot(),
+                        "trajectories": None if log is not None else trajectories,
+                        "round_log": log.checkpoint() if log is not None else None,
+                        "pipeline": pipeline_stats,
+                        "speculation": speculation,
+                    },
+                )
+                next_checkpoint = current_timestep + checkpoint_every
+            ensure_tasks(store, shelf_cells, current_timestep, agent_count)
+
+            # One open task per shelf cell, so the pickups are already unique.
+            pickup_points = [t["pos"] for t in store.open_tasks(current_timestep)]
+
+            if debug:
+                print(
+                    f"[sync] timestep={current_timestep} agents={agent_count} "
+                    f"pickups={len(pickup_points)} goals={len(goals)}"
+                )
+
+            robots: List[RobotState] = []
+            for rid in sorted(agents.keys()):
+                agent = agents[rid]
+                robots.append(RobotState(id=rid, pos=agent["pos"], state="Empty"))
+
+            result = None
+            if pending is not None:
+                spec_pickups, future, hidden_s = pending
+                pending = None
+                wait_start = time.monotonic()
+                spec = future.result()
+                pipeline_stats["wait_s"] += time.monotonic() - wait_start
+                # The speculation started from the robots' committed end cells and
+                # from this round's tasks, spawned early (see below), so it solved
+                # exactly this round's instance unless the open tasks differ.
+                if spec[0] is not None and spec_pickups == pickup_points:
+                    result = spec
+                    pipeline_stats["hits"] += 1
+                    pipeline_stats["exposed_s"] += max(0.0, spec[4] - hidden_s)
                 else:
-                    trajectories[rid].append(agents[rid]["pos"])
-
-        for rid in sorted(agents.keys()):
-            path = paths.get(rid, [])
-            if path:
-                agents[rid]["pos"] = path[min(delta, len(path) - 1)]
-
-        pickup_time = current_timestep + tau
-        task_by_pos = {tuple(t["pos"]): t for t in available_tasks}
-        assigned: Dict[int, int] = {}
-        for rid in sorted(agents.keys()):
-            path = paths.get(rid, [])
-            if not path:
+                    pipeline_stats["misses"] += 1
+            if result is None:
+                result = plan(robots, pickup_points)
+                pipeline_stats["exposed_s"] += result[4]
+            T, tau, paths, status, plan_time = result
+            pipeline_stats["plan_time_s"] += plan_time
+            collector.plan_latency(plan_time)
+            plan_status[status] = plan_status.get(status, 0) + 1
+            if T is None and status == "timeout":
+                # No plan within the budget: every robot holds its cell for one step.
+                if debug:
+                    print(f"[sync] timestep={current_timestep} planning timed out; holding")
+                hold = [[agents[rid]["pos"]] for rid in sorted(agents.keys())]
+                trajectories.append(hold)
+                collector.robot_steps(len(agents), len(agents))
+                validator.extend(trajectories.tail(1))
+                if log is not None:
+                    log.round(current_timestep, None, None, 1, plan_time, status, hold)
+                current_timestep += 1
                 continue
-            pos_tau = path[min(tau, len(path) - 1)]
-            task = task_by_pos.get(tuple(pos_tau))
-            if task is None:
-                continue
-            if task["picked_time"] is None:
-                task["picked_time"] = pickup_time
-                task["picked_by"] = rid
+            if T is None or tau is None:
+                from planner import explain_infeasible_sync
+
+                reasons = explain_infeasible_sync(grid, robots, pickup_points, goals)
+                diagnostics = (
+                    f"Sync planning failed at timestep {current_timestep}. "
+                    f"agents={agent_count}, pickup_points={len(pickup_points)}, goals={len(goals)}, "
+                    f"max_timestep={max_timestep}, unreachable_starts={reasons['unreachable_starts']}, "
+                    f"reachable_pickups={reasons['reachable_pickups']}, tau_min={reasons['tau_min']}, "
+                    f"min_drop_needed={reasons['min_drop_needed']}."
+                )
+                raise RuntimeError(diagnostics)
+
+            if debug:
+                print(f"[sync] phase tau={tau} total={T}")
+            _validate_sync_round(grid, paths, pickup_points, goals, tau, T)
+
+            delta = max(1, T)
+            exceeds = current_timestep + delta > max_timestep
+
+            segments = []
+            for rid in sorted(agents.keys()):
+                path = paths.get(rid, [])
+                if not path:
+                    path = [agents[rid]["pos"]]
+                segments.append([path[min(step, len(path) - 1)] for step in range(1, delta + 1)])
+            trajectories.append(segments)
+            collector.robot_steps(len(segments) * delta, trajectories.idle_steps(delta))
+            validator.extend(trajectories.tail(delta))
+
+            for rid in sorted(agents.keys()):
+                path = paths.get(rid, [])
+                if path:
+                    agents[rid]["pos"] = path[min(delta, len(path) - 1)]
+
+            pickup_time = current_timestep + tau
+            assigned: Dict[int, int] = {}
+            for rid in sorted(agents.keys()):
+                path = paths.get(rid, [])
+                if not path:
+                    continue
+                pos_tau = path[min(tau, len(path) - 1)]
+                task = store.open_at(pos_tau, current_timestep)
+                if task is None:
+                    continue
+                store.pick(task["id"], pickup_time, rid)
                 assigned[rid] = task["id"]
 
-        drop_time = current_timestep + T
-        for rid, task_id in assigned.items():
-            for task in tasks:
-                if task["id"] == task_id:
-                    task["delivered_time"] = drop_time
-                    task["delivered_by"] = rid
-                    break
-
-        current_timestep += delta
-
-        if exceeds:
-            break
-
-    _validate_collision_free(trajectories)
-
-    stats = _compute_stats(tasks, trajectories)
+            drop_time = current_timestep + T
+            for rid, task_id in assigned.items():
+                store.deliver(task_id, drop_time, rid)
+
+            if log is not None:
+                log.round(current_timestep, T, tau, delta, plan_time, status, segments)
+            current_timestep += delta
+
+            if speculator is not None and current_timestep < max_timestep:
+                # Spawn the next round's tasks now rather than at its start. Nothing
+                # else draws from the RNG in between, so the run is unchanged, and
+                # the speculative plan sees every task the round will have. With
+                # fewer tasks than robots it could not succeed.
+                ensure_tasks(store, shelf_cells, current_timestep, agent_count)
+                next_pickups = [t["pos"] for t in store.open_tasks(current_timestep)]
+                if len(next_pickups) >= len(agents):
+                    next_robots = [RobotState(id=rid, pos=agents[rid]["pos"], state="Empty") for rid in sorted(agents)]
+                    pending = (next_pickups, speculator.submit(plan, next_robots, next_pickups), delta * step_s)
+                    pipeline_stats["speculative"] += 1
+
+            if exceeds:
+                break
+    except BaseException:
+        if log is not None:
+            log.close()
+        raise
+    finally:
+        if speculator is not None:
+            speculator.shutdown(wait=True)
+        if pool is not None:
+            pool.shutdown()
+
+    tasks = store.all_tasks()
+    store.close()
+    stats = collector.summary(trajectories.steps, len(agents))
 
     output = {
         "map": map_path,
@@ -266,113 +406,29 @@ def run_simulation(
         "solver": solver,
         "solver_workers": workers,
         "solver_t_workers": t_workers,
+        "deadline_s": deadline_s,
+        "candidate_k": candidate_k,
+        "plan_status": plan_status,
+        "planner_cache": cache_stats(),
+        "pipeline": dict(pipeline_stats, step_s=step_s) if pipeline else None,
         "stats": stats,
-        "agents": {
-            str(rid): {
-                "trajectory": trajectories[rid],
-            }
-            for rid in trajectories
-        },
-        "tasks": [
-            {
-                "id": t["id"],
-                "pos": t["pos"],
-                "spawn_time": t["spawn_time"],
-                "picked_time": t["picked_time"],
-                "delivered_time": t["delivered_time"],
-                "picked_by": t["picked_by"],
-                "delivered_by": t["delivered_by"],
-            }
-            for t in tasks
-        ],
     }
-
-    with open(output_path, "w", encoding="utf-8") as f:
-        json.dump(output, f, indent=2)
-
-
-def _validate_collision_free(trajectories: Dict[int, List[Tuple[int, int]]]) -> None:
-    if not trajectories:
-        return
-    max_len = max(len(t) for t in trajectories.values())
-    for t in range(max_len):
-        occupied = {}
-        for rid, traj in trajectories.items():
-            pos = traj[min(t, len(traj) - 1)]
-            if pos in occupied:
-                raise RuntimeError(f"Vertex collision at t={t} between agents {occupied[pos]} and {rid}")
-            occupied[pos] = rid
-        if t == 0:
-            continue
-        edge_used = {}
-        for rid, traj in trajectories.items():
-            prev = traj[min(t - 1, len(traj) - 1)]
-            curr = traj[min(t, len(traj) - 1)]
-            edge = (prev, curr)
-            rev = (curr, prev)
-            if rev in edge_used and edge_used[rev] != rid:
-                raise RuntimeError(f"Edge collision at t={t} between agents {edge_used[rev]} and {rid}")
-            edge_used[edge] = rid
-
-
-def _compute_stats(tasks: List[Dict], trajectories: Dict[int, List[Tuple[int, int]]]) -> Dict:
-    def _avg(values: List[int]):
-        if not values:
-            return None
-        return sum(values) / len(values)
-
-    sim_end_timestep = 0
-    if trajectories:
-        sim_end_timestep = max(len(traj) - 1 for traj in trajectories.values())
-
-    tasks_total = len(tasks)
-    picked = [t for t in tasks if t["picked_time"] is not None]
-    delivered = [t for t in tasks if t["delivered_time"] is not None]
-
-    pickup_waits = [t["picked_time"] - t["spawn_time"] for t in picked]
-    delivery_times = [t["delivered_time"] - t["spawn_time"] for t in delivered]
-    carry_times = [
-        t["delivered_time"] - t["picked_time"]
-        for t in delivered
-        if t["picked_time"] is not None
+    tasks = [
+        {
+            "id": t["id"],
+            "pos": t["pos"],
+            "spawn_time": t["spawn_time"],
+            "picked_time": t["picked_time"],
+            "delivered_time": t["delivered_time"],
+            "picked_by": t["picked_by"],
+            "delivered_by": t["delivered_by"],
+        }
+        for t in tasks
     ]
 
-    idle_steps = 0
-    total_steps = 0
-    for traj in trajectories.values():
-        for i in range(1, len(traj)):
-            total_steps += 1
-            if traj[i] == traj[i - 1]:
-                idle_steps += 1
-
-    backlog_over_time: List[int] = []
-    for t in range(sim_end_timestep + 1):
-        backlog = 0
-        for task in tasks:
-            spawn = task["spawn_time"]
-            picked_time = task["picked_time"]
-            if spawn <= t and (picked_time is None or picked_time > t):
-                backlog += 1
-        backlog_over_time.append(backlog)
-
-    return {
-        "sim_end_timestep": sim_end_timestep,
-        "agents": len(trajectories),
-        "tasks_total": tasks_total,
-        "tasks_picked": len(picked),
-        "tasks_delivered": len(delivered),
-        "tasks_unpicked": tasks_total - len(picked),
-        "tasks_undelivered": tasks_total - len(delivered),
-        "throughput_picked_per_timestep": len(picked) / max(1, sim_end_timestep),
-        "throughput_delivered_per_timestep": len(delivered) / max(1, sim_end_timestep),
-        "avg_pickup_wait": _avg(pickup_waits),
-        "avg_delivery_time": _avg(delivery_times),
-        "avg_carry_time": _avg(carry_times),
-        "avg_backlog": _avg(backlog_over_time),
-        "max_backlog": max(backlog_over_time) if backlog_over_time else 0,
-        "idle_ratio": idle_steps / total_steps if total_steps > 0 else None,
-        "move_ratio": (total_steps - idle_steps) / total_steps if total_steps > 0 else None,
-    }
+    if log is not None:
+        log.close(output)
+    write_sim_output(output_path, output, trajectories, tasks)
 
 
 def _validate_sync_round(
@@ -413,13 +469,65 @@ def main() -> None:
     parser.add_argument("--map", required=True, help="Path to map json")
     parser.add_argument("--agents", type=int, required=True, help="Number of agents")
     parser.add_argument("--max_timestep", type=int, required=True, help="Max timestep")
-    parser.add_argument("--output", default="simulation_output.json", help="Output JSON path")
+    parser.add_argument("--output", default="simulation_output.json", help="Output path (.json, or .simbin for the binary format)")
     parser.add_argument("--seed", type=int, default=0, help="Random seed")
-    parser.add_argument("--solver", default="dinic", help="Max-flow solver: dinic or hlpp")
+    parser.add_argument("--solver", default="dinic", help="Max-flow solver: dinic, hlpp or auto")
     parser.add_argument("--workers", type=int, default=1, help="Total worker budget for parallel search")
     parser.add_argument("--t_workers", type=int, default=1, help="Max parallel T workers (threaded)")
     parser.add_argument("--debug", action="store_true", help="Print sync search progress")
     parser.add_argument("--debug_every", type=int, default=25, help="Tau progress print interval")
+    parser.add_argument(
+        "--t_policy",
+        choices=["double", "flow"],
+        default="double",
+        help="Makespan search: plain doubling, or steps guided by the max-flow deficit",
+    )
+    parser.add_argument(
+        "--deadline_s",
+        type=float,
+        default=None,
+        help="Wall-clock budget per planning round; returns the best plan found so far",
+    )
+    parser.add_argument(
+        "--candidate_k",
+        type=int,
+        default=None,
+        help="Offer the planner only the k nearest pickups per robot (widened when a round fails)",
+    )
+    parser.add_argument(
+        "--task_archive",
+        default=None,
+        help="Append delivered tasks to this JSON-lines file instead of keeping them in memory",
+    )
+    parser.add_argument(
+        "--round_log",
+        default=None,
+        help="Stream one JSON-lines record per planning round to this path (see round_log.py)",
+    )
+    parser.add_argument("--checkpoint", default=None, help="Periodically save the full simulator state to this path")
+    parser.add_argument("--checkpoint_every", type=int, default=1000, help="Simulated timesteps between checkpoints")
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue from --checkpoint if it exists (starts fresh otherwise)",
+    )
+    parser.add_argument(
+        "--pipeline",
+        action="store_true",
+        help="Plan the next round in the background from the predicted end state while a round executes",
+    )
+    parser.add_argument(
+        "--step_s",
+        type=float,
+        default=1.0,
+        help="Wall-clock seconds per simulated step, for the exposed-latency estimate of --pipeline",
+    )
+    parser.add_argument(
+        "--oracle_dir",
+        default=None,
+        help="Directory for the persisted distance oracle (default: NETWORKFLOW_MAPF_CACHE or ~/.cache/networkflow_mapf)",
+    )
+    parser.add_argument("--no_oracle", action="store_true", help="Do not build or load a distance oracle (BFS per round)")
     args = parser.parse_args()
 
     run_simulation(
@@ -433,6 +541,18 @@ def main() -> None:
         t_workers=args.t_workers,
         debug=args.debug,
         debug_every=args.debug_every,
+        t_policy=args.t_policy,
+        deadline_s=args.deadline_s,
+        candidate_k=args.candidate_k,
+        task_archive=args.task_archive,
+        round_log=args.round_log,
+        checkpoint=args.checkpoint,
+        checkpoint_every=args.checkpoint_every,
+        resume=args.resume,
+        pipeline=args.pipeline,
+        step_s=args.step_s,
+        oracle_dir=args.oracle_dir,
+        no_oracle=args.no_oracle,
     )
 
 
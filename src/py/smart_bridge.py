@@ -16,9 +16,13 @@ def plan_standard_mapf(
     T_max: int,
     method: str = "dinic",
     verbose: bool = False,
+    compact: bool = False,
 ) -> Tuple[int, Dict[int, List[Tuple[int, int]]]]:
     """Plan collision-free paths using LAMAPF-P's network flow solver.
 
+    With ``compact=True`` the flow uses the compact network, in which agents
+    park on their goal until T (standard MAPF semantics).
+
     Returns (T, paths_dict) where paths_dict maps 0-indexed agent IDs to paths.
     """
     caps = [1] * len(goals)
@@ -27,7 +31,7 @@ def plan_standard_mapf(
 
     T, paths = _find_min_T_single(
         grid, starts, goals, caps, reserved_v, reserved_e, T_max,
-        method=method, verbose=verbose,
+        method=method, verbose=verbose, compact=compact,
     )
 
     if T is None:
@@ -49,8 +53,9 @@ def main():
     parser.add_argument("--agents", type=int, default=None, help="Number of agents (default: all in .scen)")
     parser.add_argument("--output", required=True, help="Output path file (SMART format)")
     parser.add_argument("--T_max", type=int, default=200, help="Maximum makespan (default: 200)")
-    parser.add_argument("--solver", default="dinic", help="Flow solver method (default: dinic)")
+    parser.add_argument("--solver", default="dinic", help="Flow solver method: dinic, hlpp or auto (default: dinic)")
     parser.add_argument("--verbose", action="store_true", help="Print solver progress")
+    parser.add_argument("--compact", action="store_true", help="Use the compact flow network (agents park on goals)")
 
     args = parser.parse_args()
 
@@ -68,7 +73,7 @@ def main():
 
     T, paths = plan_standard_mapf(
         grid, starts, goals, args.T_max,
-        method=args.solver, verbose=args.verbose,
+        method=args.solver, verbose=args.verbose, compact=args.compact,
     )
 
     if T is None:
@@ -0,0 +1,238 @@
+"""Max-flow engine selection for ``method="auto"``.
+
+The choice between Dinic and HLPP depends on the size of the time-expanded
+network. A micro-benchmark (``python src/py/solver_select.py --calibrate``)
+times both engines on synthetic instances and stores the table per machine;
+``choose_method`` then predicts the faster engine from cheap features by
+nearest-neighbour lookup in that table.
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import os
+import platform
+import socket
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+METHODS = ("dinic", "hlpp")
+DEFAULT_METHOD = "dinic"
+FEATURES = ("nodes", "robots", "targets", "T")
+
+# path -> (mtime_ns, table); a missing file is never cached.
+_TABLE_CACHE: Dict[str, Tuple[int, Optional[Dict]]] = {}
+_TABLE_LOCK = threading.Lock()
+
+
+def cache_dir() -> str:
+    """Directory for per-machine planner data (calibration, distance oracles).
+
+    ``NETWORKFLOW_MAPF_CACHE`` overrides the default ``~/.cache/networkflow_mapf`` directory.
+    """
+    root = os.environ.get("NETWORKFLOW_MAPF_CACHE")
+    if not root:
+        root = os.path.join(os.path.expanduser("~"), ".cache", "networkflow_mapf")
+    return root
+
+
+def calibration_path() -> str:
+    """Return the per-machine calibration file path under ``cache_dir()``."""
+    host = socket.gethostname() or "localhost"
+    machine = platform.machine() or "unknown"
+    return os.path.join(cache_dir(), f"solver_calibration_{host}_{machine}.json")
+
+
+def instance_features(active_cells: int, robots: int, targets: int, T: int) -> Dict[str, float]:
+    """Cheap features of one flow probe; ``nodes`` is the time-expanded cell count."""
+    return {
+        "nodes": float(active_cells * (T + 1)),
+        "robots": float(robots),
+        "targets": float(targets),
+        "T": float(T),
+    }
+
+
+def load_calibration(path: Optional[str] = None) -> Optional[Dict]:
+    """The calibration table at ``path``, or ``None``; reread when the file changes."""
+    path = path or calibration_path()
+    with _TABLE_LOCK:
+        try:
+            mtime = os.stat(path).st_mtime_ns
+        except OSError:
+            _TABLE_CACHE.pop(path, None)
+            return None
+        cached = _TABLE_CACHE.get(path)
+        if cached is not None and cached[0] == mtime:
+            return cached[1]
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                table = json.load(f)
+        except (OSError, ValueError):
+            table = None
+        if table is not None and not table.get("samples"):
+            table = None
+        _TABLE_CACHE[path] = (mtime, table)
+        return table
+
+
+def save_calibration(table: Dict, path: Optional[str] = None) -> str:
+    path = path or calibration_path()
+    os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(table, f, indent=2)
+    os.replace(tmp_path, path)
+    with _TABLE_LOCK:
+        _TABLE_CACHE.pop(path, None)
+    return path
+
+
+def _feature_vector(features: Dict[str, float]) -> Tuple[float, ...]:
+    return tuple(math.log1p(max(0.0, float(features.get(name, 0.0)))) for name in FEATURES)
+
+
+def choose_method(features: Dict[str, float], table: Optional[Dict] = None, k: int = 3) -> str:
+    """Predict the fastest engine; falls back to ``DEFAULT_METHOD`` without a calibration table."""
+    if table is None:
+        table = load_calibration()
+    if not table:
+        return DEFAULT_METHOD
+    query = _feature_vector(features)
+    scored = []
+    for sample in table.get("samples", []):
+        times = sample.get("times", {})
+        if not all(times.get(m, 0) > 0 for m in METHODS):
+            continue
+        vec = _feature_vector(sample)
+        dist = sum((a - b) ** 2 for a, b in zip(query, vec))
+        scored.append((dist, times))
+    if not scored:
+        return DEFAULT_METHOD
+    scored.sort(key=lambda item: item[0])
+    nearest = scored[: max(1, k)]
+    best_method = DEFAULT_METHOD
+    best_score = None
+    for method in METHODS:
+        # Mean log-time over the neighbours, weighted towards the closest samples.
+        total = 0.0
+        weight_sum = 0.0
+        for dist, times in nearest:
+            weight = 1.0 / (1e-6 + dist)
+            total += weight * math.log(times[method])
+            weight_sum += weight
+        score = total / weight_sum
+        if best_score is None or score < best_score:
+            best_score = score
+            best_method = method
+    return best_method
+
+
+def resolve_method(method: str, active_cells: int, robots: int, targets: int, T: int) -> str:
+    """Map ``"auto"`` to a concrete engine name; other names pass through unchanged."""
+    if (method or "").lower() != "auto":
+        return method
+    return choose_method(instance_features(active_cells, robots, targets, T))
+
+
+def resolved_engine(method: str) -> str:
+    """What ``method`` runs as on this machine, for recording alongside results.
+
+    Concrete names pass through. ``"auto"`` picks per probe, so it resolves
+    to ``DEFAULT_METHOD`` without a calibration table and otherwise to
+    ``"auto:"`` plus a digest of the table's samples.
+    """
+    if (method or "").lower() != "auto":
+        return method
+    table = load_calibration()
+    if not table:
+        return DEFAULT_METHOD
+    blob = json.dumps(table["samples"], sort_keys=True).encode("utf-8")
+    return "auto:" + hashlib.sha1(blob).hexdigest()[:12]
+
+
+def _benchmark_grid(size: int) -> List[List[int]]:
+    # Warehouse-like floor: shelf columns every third cell with a cross aisle every fifth row.
+    grid = []
+    for y in range(size):
+        row = []
+        for x in range(size):
+            blocked = x % 3 == 1 and y % 5 not in (0, 4) and 0 < y < size - 1
+            row.append(1 if blocked else 0)
+        grid.append(row)
+    return grid
+
+
+def run_calibration(
+    sizes: Tuple[int, ...] = (8, 16, 24, 32),
+    robot_fractions: Tuple[float, ...] = (0.25, 1.0),
+    repeats: int = 2,
+    verbose: bool = False,
+) -> Dict:
+    """Time every engine on synthetic instances and return a calibration table."""
+    from planner import flow_planner_cpp
+
+    samples = []
+    for size in sizes:
+        grid = _benchmark_grid(size)
+        free_left = [(0, y) for y in range(size)]
+        free_right = [(size - 1, y) for y in range(size)]
+        for fraction in robot_fractions:
+            robots = max(1, int(size * fraction))
+            starts = free_left[:robots]
+            targets = free_right[:robots]
+            caps = [1] * len(targets)
+            T = 2 * size
+            times: Dict[str, float] = {}
+            for method in METHODS:
+                best = None
+                for _ in range(max(1, repeats)):
+                    t0 = time.perf_counter()
+                    flow_planner_cpp.plan_flow(grid, starts, targets, caps, T, [], [], method)
+                    elapsed = time.perf_counter() - t0
+                    best = elapsed if best is None else min(best, elapsed)
+                times[method] = best
+            active_cells = sum(1 for row in grid for cell in row if cell == 0)
+            sample = instance_features(active_cells, len(starts), len(targets), T)
+            sample["times"] = times
+            samples.append(sample)
+            if verbose:
+                print(f"[calibrate] size={size} robots={robots} T={T} " + " ".join(
+                    f"{m}={times[m]:.4f}s" for m in METHODS
+                ))
+    return {
+        "version": 1,
+        "host": socket.gethostname(),
+        "machine": platform.machine(),
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "samples": samples,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Calibrate max-flow engine selection for method=auto")
+    parser.add_argument("--calibrate", action="store_true", help="Run the micro-benchmark and store the table")
+    parser.add_argument("--output", default=None, help="Calibration file (default: per-machine cache path)")
+    parser.add_argument("--sizes", default="8,16,24,32", help="Comma-separated grid sizes to benchmark")
+    parser.add_argument("--repeats", type=int, default=2, help="Timing repeats per engine")
+    args = parser.parse_args()
+
+    if not args.calibrate:
+        table = load_calibration(args.output)
+        path = args.output or calibration_path()
+        if table is None:
+            print(f"No calibration at {path}; method=auto uses {DEFAULT_METHOD}")
+        else:
+            print(f"Calibration at {path}: {len(table['samples'])} samples")
+        return
+
+    sizes = tuple(int(s) for s in args.sizes.split(",") if s.strip())
+    table = run_calibration(sizes=sizes, repeats=args.repeats, verbose=True)
+    path = save_calibration(table, args.output)
+    print(f"Saved calibration to {path}")
+
+
+if __name__ == "__main__":
+    main()
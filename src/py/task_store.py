@@ -0,0 +1,202 @@
+"""Task bookkeeping for the lifelong simulators.
+
+Tasks are indexed by id, by the shelf cell of the open task and by status
+(``open`` -> ``carried`` -> ``delivered``), so spawning, picking and
+delivering cost O(1) however long the run gets. Shelf cells without an
+open task are kept in a swap-remove list, which gives an O(1) uniform
+sampler for new tasks. With ``archive_path`` set, delivered tasks are
+appended to a JSON-lines file and dropped from memory; ``all_tasks``
+reads them back for the final output. An optional ``StatsCollector``
+and an optional ``RoundLog`` are told about every spawn, pickup and
+delivery.
+"""
+
+import json
+import os
+import random
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sim_stats import StatsCollector
+
+STATUSES = ("open", "carried", "delivered")
+
+
+class TaskStore:
+    def __init__(
+        self,
+        shelf_cells: Iterable[Tuple[int, int]],
+        archive_path: Optional[str] = None,
+        stats: Optional[StatsCollector] = None,
+        log=None,
+    ):
+        self.archive_path = archive_path
+        self.stats = stats
+        self.log = log
+        self._archive = None
+        self._archived = 0
+        self._next_id = 1
+        self._by_id: Dict[int, Dict] = {}
+        # Insertion-ordered, so each status lists its tasks in id order.
+        self._by_status: Dict[str, Dict[int, Dict]] = {status: {} for status in STATUSES}
+        self._open_at: Dict[Tuple[int, int], Dict] = {}
+        self._free: List[Tuple[int, int]] = []
+        self._free_index: Dict[Tuple[int, int], int] = {}
+        self._shelves = set()
+        for pos in shelf_cells:
+            self._shelves.add(tuple(pos))
+            self._add_free(tuple(pos))
+
+    def __len__(self) -> int:
+        return len(self._by_id) + self._archived
+
+    def get(self, task_id: int) -> Optional[Dict]:
+        return self._by_id.get(task_id)
+
+    def open_at(self, pos: Tuple[int, int], current_timestep: Optional[int] = None) -> Optional[Dict]:
+        """The open task on ``pos`` (spawned by ``current_timestep`` if given)."""
+        task = self._open_at.get(tuple(pos))
+        if task is None or (current_timestep is not None and task["spawn_time"] > current_timestep):
+            return None
+        return task
+
+    def open_tasks(self, current_timestep: Optional[int] = None) -> List[Dict]:
+        """Open tasks in id order, optionally only those spawned by ``current_timestep``."""
+        tasks = self._by_status["open"].values()
+        if current_timestep is None:
+            return list(tasks)
+        return [t for t in tasks if t["spawn_time"] <= current_timestep]
+
+    def counts(self) -> Dict[str, int]:
+        out = {status: len(tasks) for status, tasks in self._by_status.items()}
+        out["delivered"] += self._archived
+        return out
+
+    def free_cells(self) -> int:
+        return len(self._free)
+
+    def spawn(self, pos: Tuple[int, int], current_timestep: int) -> Dict:
+        pos = tuple(pos)
+        if pos in self._open_at:
+            raise ValueError(f"Shelf cell {pos} already has an open task")
+        task = {
+            "id": self._next_id,
+            "pos": pos,
+            "spawn_time": current_timestep,
+            "picked_time": None,
+            "delivered_time": None,
+            "picked_by": None,
+            "delivered_by": None,
+        }
+        self._next_id += 1
+        self._by_id[task["id"]] = task
+        self._by_status["open"][task["id"]] = task
+        self._open_at[pos] = task
+        self._remove_free(pos)
+        if self.stats is not None:
+            self.stats.task_spawned(task)
+        if self.log is not None:
+            self.log.task_spawned(task)
+        return task
+
+    def spawn_random(self, count: int, current_timestep: int) -> List[Dict]:
+        """Spawn ``count`` tasks on distinct shelf cells without an open task."""
+        if count > len(self._free):
+            raise RuntimeError("Not enough unique shelf cells to allocate tasks")
+        return [self.spawn(self._free[random.randrange(len(self._free))], current_timestep) for _ in range(count)]
+
+    def ensure_open(self, min_open: int, current_timestep: int) -> None:
+        """Top the open tasks up to ``min_open`` at random free shelf cells."""
+        need = min_open - len(self._open_at)
+        if need > 0:
+            self.spawn_random(need, current_timestep)
+
+    def pick(self, task_id: int, current_timestep: int, robot_id: int) -> Dict:
+        task = self._by_id[task_id]
+        if task["picked_time"] is not None:
+            raise ValueError(f"Task {task_id} already picked")
+        task["picked_time"] = current_timestep
+        task["picked_by"] = robot_id
+        del self._by_status["open"][task_id]
+        self._by_status["carried"][task_id] = task
+        del self._open_at[task["pos"]]
+        self._add_free(task["pos"])
+        if self.stats is not None:
+            self.stats.task_picked(task)
+        if self.log is not None:
+            self.log.task_picked(task)
+        return task
+
+    def deliver(self, task_id: int, current_timestep: int, robot_id: int) -> Dict:
+        task = self._by_id[task_id]
+        if task["picked_time"] is None or task["delivered_time"] is not None:
+            raise ValueError(f"Task {task_id} is not being carried")
+        task["delivered_time"] = current_timestep
+        task["delivered_by"] = robot_id
+        del self._by_status["carried"][task_id]
+        if self.archive_path is None:
+            self._by_status["delivered"][task_id] = task
+        else:
+            del self._by_id[task_id]
+            if self._archive is None:
+                # A store restored from a checkpoint continues its archive.
+                self._archive = open(self.archive_path, "a" if self._archived else "w", encoding="utf-8")
+            self._archive.write(json.dumps(task) + "\n")
+            self._archived += 1
+        if self.stats is not None:
+            self.stats.task_delivered(task)
+        if self.log is not None:
+            self.log.task_delivered(task)
+        return task
+
+    def all_tasks(self) -> List[Dict]:
+        """Every task ever spawned, archived ones included, in id order."""
+        tasks = list(self._by_id.values())
+        if self._archived:
+            if self._archive is not None:
+                self._archive.flush()
+            with open(self.archive_path, "r", encoding="utf-8") as f:
+                for line in f:
+                    task = json.loads(line)
+                    task["pos"] = tuple(task["pos"])
+                    tasks.append(task)
+        tasks.sort(key=lambda t: t["id"])
+        return tasks
+
+    def close(self) -> None:
+        if self._archive is not None:
+            self._archive.close()
+            self._archive = None
+
+    def __getstate__(self) -> Dict:
+        """Pickle without the archive handle and observers; records the archive length."""
+        state = dict(self.__dict__)
+        state["_archive"] = None
+        state["stats"] = None
+        state["log"] = None
+        state["_archive_bytes"] = 0
+        if self._archive is not None:
+            self._archive.flush()
+            state["_archive_bytes"] = self._archive.tell()
+        return state
+
+    def __setstate__(self, state: Dict) -> None:
+        archive_bytes = state.pop("_archive_bytes")
+        self.__dict__.update(state)
+        if self._archived:
+            # Drop deliveries archived after the checkpoint was taken.
+            os.truncate(self.archive_path, archive_bytes)
+
+    def _add_free(self, pos: Tuple[int, int]) -> None:
+        if pos not in self._shelves or pos in self._free_index:
+            return
+        self._free_index[pos] = len(self._free)
+        self._free.append(pos)
+
+    def _remove_free(self, pos: Tuple[int, int]) -> None:
+        idx = self._free_index.pop(pos, None)
+        if idx is None:
+            return
+        last = self._free.pop()
+        if idx < len(self._free):
+            self._free[idx] = last
+            self._free_index[last] = idx
@@ -0,0 +1,147 @@
+"""Array-backed storage for simulator trajectories.
+
+A dict of Python lists of ``(x, y)`` tuples costs over 100 bytes per
+robot-step. ``TrajectoryBuffer`` keeps every position in one preallocated
+``(agents, capacity, 2)`` int16 array (int32 for maps wider than int16),
+which is 4 bytes per robot-step. The array doubles its capacity when full,
+so appending a round's ``delta`` steps for every agent is one slice
+assignment, and ``tail``/``view`` return views without copying. Without
+NumPy each agent gets a flat ``array.array`` of interleaved coordinates
+instead.
+"""
+
+from array import array
+from typing import Dict, List, Sequence, Tuple
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised only without numpy
+    np = None
+
+_INT16_MAX = 32767
+
+
+class TrajectoryBuffer:
+    def __init__(self, agent_ids: Sequence[int], starts: Sequence[Tuple[int, int]], capacity: int = 256):
+        self.agent_ids = list(agent_ids)
+        self._row = {rid: i for i, rid in enumerate(self.agent_ids)}
+        wide = any(max(p) > _INT16_MAX for p in starts)
+        self._len = 1
+        if np is not None:
+            self._data = np.zeros((len(self.agent_ids), max(2, capacity), 2), dtype=np.int32 if wide else np.int16)
+            self._data[:, 0] = np.asarray(starts, dtype=self._data.dtype).reshape(-1, 2)
+        else:
+            self._data = [array("i" if wide else "h", p) for p in starts]
+
+    def __len__(self) -> int:
+        """Number of stored timesteps (``steps + 1``)."""
+        return self._len
+
+    @property
+    def steps(self) -> int:
+        return self._len - 1
+
+    @property
+    def nbytes(self) -> int:
+        if np is not None:
+            return int(self._data.nbytes)
+        return sum(a.itemsize * len(a) for a in self._data)
+
+    def append(self, segments) -> None:
+        """Append ``k`` steps: one equally long position list per agent, or an ``(agents, k, 2)`` array."""
+        if np is not None:
+            seg = np.asarray(segments).reshape(len(self.agent_ids), -1, 2)
+            k = seg.shape[1]
+            if k == 0:
+                return
+            self._reserve(self._len + k)
+            if self._data.dtype == np.int16 and seg.size and int(seg.max()) > _INT16_MAX:
+                self._data = self._data.astype(np.int32)
+            self._data[:, self._len : self._len + k] = seg
+            self._len += k
+            return
+        k = len(segments[0]) if segments else 0
+        for store, seg in zip(self._data, segments):
+            if len(seg) != k:
+                raise ValueError("All agents must append the same number of steps")
+            for x, y in seg:
+                store.append(x)
+                store.append(y)
+        self._len += k
+
+    def last(self) -> List[Tuple[int, int]]:
+        """Current position of every agent, in ``agent_ids`` order."""
+        return [self.position(rid, self._len - 1) for rid in self.agent_ids]
+
+    def position(self, rid: int, t: int) -> Tuple[int, int]:
+        row = self._row[rid]
+        if t < 0:
+            t += self._len
+        if not 0 <= t < self._len:
+            raise IndexError(t)
+        if np is not None:
+            x, y = self._data[row, t]
+            return int(x), int(y)
+        store = self._data[row]
+        return store[2 * t], store[2 * t + 1]
+
+    def tail(self, k: int):
+        """The last ``k`` steps: an ``(agents, k, 2)`` view, or per-agent lists without NumPy."""
+        start = max(0, self._len - k)
+        if np is not None:
+            return self._data[:, start : self._len]
+        return [self._positions(store, start) for store in self._data]
+
+    def view(self):
+        """All stored steps; an ``(agents, len, 2)`` view (requires NumPy)."""
+        if np is None:
+            raise ImportError("TrajectoryBuffer.view requires numpy")
+        return self._data[:, : self._len]
+
+    def idle_steps(self, k: int) -> int:
+        """Agent-steps among the last ``k`` steps where the agent did not move."""
+        start = max(1, self._len - k)
+        if np is not None:
+            block = self._data[:, start - 1 : self._len]
+            return int((block[:, 1:] == block[:, :-1]).all(axis=2).sum())
+        idle = 0
+        for store in self._data:
+            for t in range(start, self._len):
+                if store[2 * t] == store[2 * t - 2] and store[2 * t + 1] == store[2 * t - 1]:
+                    idle += 1
+        return idle
+
+    def trajectory(self, rid: int) -> List[Tuple[int, int]]:
+        row = self._row[rid]
+        if np is not None:
+            return [tuple(p) for p in self._data[row, : self._len].tolist()]
+        return self._positions(self._data[row], 0)
+
+    def to_dict(self) -> Dict[int, List[List[int]]]:
+        """``{rid: [[x, y], ...]}`` ready for JSON."""
+        if np is not None:
+            rows = self._data[:, : self._len].tolist()
+        else:
+            rows = [[list(p) for p in self._positions(store, 0)] for store in self._data]
+        return dict(zip(self.agent_ids, rows))
+
+    def __getstate__(self) -> Dict:
+        """Pickle only the stored steps, not the spare capacity."""
+        state = dict(self.__dict__)
+        if np is not None:
+            state["_data"] = self._data[:, : self._len].copy()
+        return state
+
+    def _reserve(self, size: int) -> None:
+        capacity = self._data.shape[1]
+        if size <= capacity:
+            return
+        while capacity < size:
+            capacity *= 2
+        grown = np.empty((self._data.shape[0], capacity, 2), dtype=self._data.dtype)
+        grown[:, : self._len] = self._data[:, : self._len]
+        self._data = grown
+
+    @staticmethod
+    def _positions(store: array, start: int) -> List[Tuple[int, int]]:
+        return list(zip(store[2 * start :: 2], store[2 * start + 1 :: 2]))
@@ -7,7 +7,7 @@ from typing import Dict, List, Tuple
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
 from map_store import list_maps, load_map, save_map
-from sim_player import load_sim_output
+from sim_player import load_sim_output, trajectories_of
 from ui_state import UIState, empty_state
 
 CELL_COLORS = {
@@ -367,7 +367,7 @@ class MapEditor:
         self._load_map_list()
 
     def _load_sim(self):
-        path = filedialog.askopenfilename(title="Load simulation output", filetypes=[("JSON", "*.json")])
+        path = filedialog.askopenfilename(title="Load simulation output", filetypes=[("Simulation output", "*.json *.simbin"), ("JSON", "*.json"), ("Simulation binary", "*.simbin")])
         if not path:
             return
         data = load_sim_output(path)
@@ -380,12 +380,7 @@ class MapEditor:
         map_data = load_map(map_dir, map_name)
         self._load_state_from_data(map_data)
         self.sim_tasks = data.get("tasks", [])
-        agents_data = data.get("agents", {})
-        trajectories = {}
-        for rid, info in agents_data.items():
-            traj = [tuple(p) for p in info.get("trajectory", [])]
-            trajectories[int(rid)] = traj
-        self.sim_trajectories = trajectories
+        self.sim_trajectories = trajectories_of(data)
         self.sim_max_timestep = int(data.get("max_timestep", 0))
         self.sim_timestep_var.set(0)
         self.sim_scale.config(state="normal", to=self.sim_max_timestep)
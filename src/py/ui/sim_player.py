@@ -1,6 +1,6 @@
-import json
+import os
+import sys
 
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 
-def load_sim_output(path: str) -> dict:
-    with open(path, "r", encoding="utf-8") as f:
-        return json.load(f)
+from sim_output import load_sim_output, trajectories_of
@@ -0,0 +1,42 @@
+import contextlib
+
+import pytest
+
+
+class Preempted(Exception):
+    pass
+
+
+@pytest.fixture(autouse=True)
+def _isolated_cache_dir(tmp_path, monkeypatch):
+    """Keep calibration tables and distance oracles out of the user's cache."""
+    monkeypatch.setenv("NETWORKFLOW_MAPF_CACHE", str(tmp_path / "cache"))
+
+
+@pytest.fixture
+def preempt_sync_after():
+    """``with preempt_sync_after(n): run_simulation(...)`` preempts the sync simulator at round ``n + 1``.
+
+    The round's ``plan_round_sync`` call raises instead of planning, and the
+    block asserts that the run was interrupted. The patch ends with the block.
+    """
+
+    @contextlib.contextmanager
+    def preempt(rounds):
+        import simulator_full_sync
+
+        real = simulator_full_sync.plan_round_sync
+        calls = {"n": 0}
+
+        def plan(*args, **kwargs):
+            calls["n"] += 1
+            if calls["n"] > rounds:
+                raise Preempted()
+            return real(*args, **kwargs)
+
+        with pytest.MonkeyPatch.context() as m:
+            m.setattr(simulator_full_sync, "plan_round_sync", plan)
+            with pytest.raises(Preempted):
+                yield
+
+    return preempt
@@ -0,0 +1,73 @@
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src", "py")))
+
+import planner
+from data_types import RobotState
+from planner import candidate_targets, plan_round, plan_round_sync
+from utils import validate_paths
+
+
+def _open_grid(width, height):
+    return [[0] * width for _ in range(height)]
+
+
+def test_candidates_are_nearest_per_start():
+    grid = _open_grid(8, 1)
+    targets = [(7, 0), (1, 0), (6, 0), (2, 0)]
+    assert candidate_targets(grid, [(0, 0)], targets, 1) == [(1, 0)]
+    assert candidate_targets(grid, [(0, 0), (7, 0)], targets, 1) == [(7, 0), (1, 0)]
+    assert candidate_targets(grid, [(0, 0)], targets, 4) == targets
+
+
+def test_candidates_widen_until_matching_exists():
+    grid = _open_grid(8, 1)
+    targets = [(1, 0), (6, 0), (7, 0)]
+    # Both robots' nearest target is (1, 0); a distinct one must be added.
+    chosen = candidate_targets(grid, [(0, 0), (2, 0)], targets, 1)
+    assert (1, 0) in chosen
+    assert len(chosen) == 2
+
+
+def test_onward_cost_changes_ranking():
+    grid = _open_grid(8, 1)
+    targets = [(1, 0), (3, 0)]
+    assert candidate_targets(grid, [(2, 0)], targets, 1) == [(1, 0)]
+    assert candidate_targets(grid, [(2, 0)], targets, 1, onward=[5, 0]) == [(3, 0)]
+
+
+def test_plan_round_widens_after_failed_subset(monkeypatch):
+    grid = _open_grid(4, 3)
+    robots = [RobotState(id=1, pos=(0, 0), state="Empty")]
+    pickups = [(3, 2), (1, 0), (2, 2)]
+    search_min_T = planner.search_min_T
+    seen = []
+
+    def full_set_only(grid_, robots_, pickups_, *args, **kwargs):
+        seen.append(len(pickups_))
+        if len(pickups_) < len(pickups):
+            return None, {}
+        return search_min_T(grid_, robots_, pickups_, *args, **kwargs)
+
+    monkeypatch.setattr(planner, "search_min_T", full_set_only)
+    info = {}
+    T, paths = plan_round(grid, robots, pickups, [(0, 2)], {(0, 2): 1}, T_max=10, candidate_k=1, search_info=info)
+    assert seen == [1, 2, 3]
+    assert T == 1
+    assert info["candidates"] == 3
+    assert validate_paths(paths, grid)
+
+
+def test_sync_round_with_candidates_matches_full():
+    grid = _open_grid(5, 3)
+    robots = [RobotState(id=1, pos=(0, 1), state="Empty"), RobotState(id=2, pos=(4, 1), state="Empty")]
+    pickups = [(0, 0), (4, 0), (2, 0), (2, 2), (1, 2)]
+    drops = [(0, 2), (4, 2)]
+    drop_caps = {d: 1 for d in drops}
+    full = plan_round_sync(grid, robots, pickups, drops, drop_caps, T_max=12)
+    info = {}
+    pruned = plan_round_sync(grid, robots, pickups, drops, drop_caps, T_max=12, candidate_k=1, search_info=info)
+    assert pruned[:2] == full[:2]
+    assert info["status"] == "optimal"
+    assert info["candidates"] < len(pickups)
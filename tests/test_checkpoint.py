@@ -0,0 +1,87 @@
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src", "py")))
+
+import simulator_full_sync
+import solver_select
+from planner import clear_caches
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+MAP = os.path.join(ROOT, "maps", "test.json")
+
+
+def _comparable(path):
+    data = json.loads(open(path).read())
+    for key in list(data["stats"]):
+        if "latency" in key:
+            del data["stats"][key]
+    return data
+
+
+@pytest.mark.parametrize("with_log", [False, True])
+def test_resume_after_preemption_is_exact(tmp_path, preempt_sync_after, with_log):
+    archive = str(tmp_path / "archive.jsonl")
+    round_log = str(tmp_path / "rounds.jsonl") if with_log else None
+    clear_caches()
+    simulator_full_sync.run_simulation(
+        MAP, 4, 80, str(tmp_path / "ref.json"), seed=2, task_archive=archive, round_log=round_log
+    )
+    reference = _comparable(tmp_path / "ref.json")
+    ref_log = open(round_log).read() if with_log else None
+
+    ckpt = str(tmp_path / "sim.ckpt")
+    out = str(tmp_path / "out.json")
+    clear_caches()
+    # Rounds start at t=0, 9, 19, 30, 41, 53, ...: the last checkpoint
+    # before the failure is at t=30, so two rounds are replayed.
+    with preempt_sync_after(5):
+        simulator_full_sync.run_simulation(
+            MAP, 4, 80, out, seed=2, task_archive=archive, round_log=round_log,
+            checkpoint=ckpt, checkpoint_every=25,
+        )
+    assert os.path.exists(ckpt)
+    simulator_full_sync.run_simulation(
+        MAP, 4, 80, out, seed=2, task_archive=archive, round_log=round_log,
+        checkpoint=ckpt, checkpoint_every=25, resume=True,
+    )
+    assert _comparable(out) == reference
+    if with_log:
+        records = [json.loads(line) for line in open(round_log)]
+        expected = [json.loads(line) for line in ref_log.splitlines()]
+        strip = lambda r: {k: v for k, v in r.items() if k not in ("plan_s", "output")}
+        assert [strip(r) for r in records] == [strip(r) for r in expected]
+
+
+def test_resume_rejects_other_configuration(tmp_path):
+    ckpt = str(tmp_path / "sim.ckpt")
+    simulator_full_sync.run_simulation(
+        MAP, 4, 40, str(tmp_path / "a.json"), seed=1, checkpoint=ckpt, checkpoint_every=5
+    )
+    with pytest.raises(ValueError, match="seed"):
+        simulator_full_sync.run_simulation(
+            MAP, 4, 40, str(tmp_path / "b.json"), seed=2, checkpoint=ckpt, checkpoint_every=5, resume=True
+        )
+
+
+def test_resume_rejects_other_deadline_or_engine(tmp_path):
+    ckpt = str(tmp_path / "sim.ckpt")
+    simulator_full_sync.run_simulation(
+        MAP, 4, 40, str(tmp_path / "a.json"), seed=1, solver="auto", checkpoint=ckpt, checkpoint_every=5
+    )
+    with pytest.raises(ValueError, match="deadline_s"):
+        simulator_full_sync.run_simulation(
+            MAP, 4, 40, str(tmp_path / "b.json"), seed=1, solver="auto", deadline_s=5.0,
+            checkpoint=ckpt, checkpoint_every=5, resume=True,
+        )
+    # A calibration table written since the checkpoint changes what "auto" runs as.
+    table = {"samples": [{"nodes": 10.0, "robots": 1.0, "targets": 1.0, "T": 2.0, "times": {"dinic": 2.0, "hlpp": 1.0}}]}
+    solver_select.save_calibration(table)
+    with pytest.raises(ValueError, match="engine"):
+        simulator_full_sync.run_simulation(
+            MAP, 4, 40, str(tmp_path / "c.json"), seed=1, solver="auto",
+            checkpoint=ckpt, checkpoint_every=5, resume=True,
+        )
@@ -0,0 +1,96 @@
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src", "py")))
+
+import collision_check
+from collision_check import TrajectoryValidator, validate_collision_free
+
+
+def _reference(trajectories):
+    """Per-timestep dict check the simulators used before."""
+    max_len = max(len(t) for t in trajectories.values())
+    for t in range(max_len):
+        occupied = {}
+        for rid, traj in trajectories.items():
+            pos = traj[min(t, len(traj) - 1)]
+            if pos in occupied:
+                return f"Vertex collision at t={t} between agents {occupied[pos]} and {rid}"
+            occupied[pos] = rid
+        if t == 0:
+            continue
+        edge_used = {}
+        for rid, traj in trajectories.items():
+            prev = traj[min(t - 1, len(traj) - 1)]
+            curr = traj[min(t, len(traj) - 1)]
+            if (curr, prev) in edge_used and edge_used[(curr, prev)] != rid:
+                return f"Edge collision at t={t} between agents {edge_used[(curr, prev)]} and {rid}"
+            edge_used[(prev, curr)] = rid
+    return None
+
+
+def _random_trajectories(rng):
+    width = rng.randint(2, 4)
+    out = {}
+    for rid in range(rng.randint(1, 5)):
+        pos = (rng.randrange(width), rng.randrange(2))
+        traj = [pos]
+        for _ in range(rng.randint(0, 6)):
+            dx, dy = rng.choice([(0, 0), (1, 0), (-1, 0), (0, 1), (0, -1)])
+            pos = (min(width - 1, max(0, pos[0] + dx)), min(1, max(0, pos[1] + dy)))
+            traj.append(pos)
+        out[rid + 10] = traj
+    return out
+
+
+def _check(trajectories):
+    try:
+        validate_collision_free(trajectories)
+    except RuntimeError as exc:
+        return str(exc)
+    return None
+
+
+@pytest.mark.parametrize("use_numpy", [True, False])
+def test_matches_reference_on_random_trajectories(monkeypatch, use_numpy):
+    if use_numpy:
+        pytest.importorskip("numpy")
+    else:
+        monkeypatch.setattr(collision_check, "np", None)
+    rng = random.Random(5)
+    for _ in range(500):
+        trajectories = _random_trajectories(rng)
+        assert _check(trajectories) == _reference(trajectories)
+
+
+def test_incremental_segments_report_global_time():
+    validator = TrajectoryValidator([1, 2], [(0, 0), (3, 0)], width=4)
+    validator.extend([[(1, 0)], [(2, 0)]])
+    assert validator.t == 1
+    with pytest.raises(RuntimeError, match="Edge collision at t=2 between agents 1 and 2"):
+        validator.extend([[(2, 0)], [(1, 0)]])
+    # A failed segment does not advance the validator.
+    assert validator.t == 1
+    validator.extend([[(1, 0), (1, 1)], [(2, 0)]])
+    assert validator.t == 3
+
+
+def test_array_segments():
+    np = pytest.importorskip("numpy")
+    validator = TrajectoryValidator([1, 2], [(0, 0), (0, 1)], width=5)
+    segment = np.zeros((2, 4, 2), dtype=np.int64)
+    segment[:, :, 0] = np.arange(1, 5)[None, :]
+    segment[1, :, 1] = 1
+    validator.extend(segment)
+    assert validator.t == 4
+    segment = np.array([[[4, 1]], [[4, 1]]])
+    with pytest.raises(RuntimeError, match="Vertex collision at t=5"):
+        validator.extend(segment)
+
+
+def test_start_collision_rejected():
+    with pytest.raises(RuntimeError, match="Vertex collision at t=0"):
+        TrajectoryValidator([1, 2], [(0, 0), (0, 0)], width=1)
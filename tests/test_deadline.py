@@ -0,0 +1,134 @@
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src", "py")))
+
+
+def _maybe_add_build_path():
+    root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+    candidates = [
+        os.path.join(root, "build"),
+        os.path.join(root, "build", "Release"),
+        os.path.join(root, "build", "Debug"),
+    ]
+    for path in candidates:
+        if not os.path.isdir(path):
+            continue
+        for name in os.listdir(path):
+            if name.startswith("flow_planner_cpp") and (
+                name.endswith(".so") or name.endswith(".pyd") or name.endswith(".dylib")
+            ):
+                sys.path.append(path)
+                return
+
+
+def _import_flow_planner():
+    try:
+        import flow_planner_cpp  # type: ignore
+        return flow_planner_cpp
+    except ImportError:
+        _maybe_add_build_path()
+        try:
+            import flow_planner_cpp  # type: ignore
+            return flow_planner_cpp
+        except ImportError as exc:
+            raise ImportError("flow_planner_cpp not found; build the C++ module before running tests") from exc
+
+
+import time
+
+import planner
+from data_types import RobotState
+from planner import plan_round, plan_round_sync
+
+flow_planner_cpp = _import_flow_planner()
+
+
+def _open_grid(n):
+    return [[0] * n for _ in range(n)]
+
+
+def test_zero_deadline_times_out_every_binding():
+    grid = _open_grid(3)
+    res = flow_planner_cpp.plan_flow(grid, [(0, 0)], [(2, 2)], [1], 6, [], [], "dinic", deadline_s=0.0)
+    assert res["timed_out"] is True
+    assert res["feasible"] is False
+    res = flow_planner_cpp.plan_flow_rot(grid, [(0, 0)], [0], [(2, 2)], [1], 8, [], [], "dinic", deadline_s=0.0)
+    assert res["timed_out"] is True
+    res = flow_planner_cpp.plan_flow_sync(grid, [(0, 0)], [(2, 2)], [(0, 2)], [1], 8, 4, "dinic", deadline_s=0.0)
+    assert res["timed_out"] is True
+    res = flow_planner_cpp.plan_flow(grid, [(0, 0)], [(2, 2)], [1], 6, [], [], "dinic")
+    assert res["timed_out"] is False
+    assert res["feasible"] is True
+
+
+def test_deadline_interrupts_large_max_flow():
+    n = 80
+    grid = _open_grid(n)
+    starts = [(0, y) for y in range(n)]
+    targets = [(n - 1, y) for y in range(n)]
+    for method in ("dinic", "hlpp"):
+        t0 = time.perf_counter()
+        res = flow_planner_cpp.plan_flow(grid, starts, targets, [1] * n, 2 * n, [], [], method, deadline_s=0.05)
+        elapsed = time.perf_counter() - t0
+        assert res["timed_out"] is True
+        assert res["feasible"] is False
+        assert elapsed < 1.0
+
+
+def test_search_reports_optimal_and_infeasible():
+    grid = [[0] * 12]
+    robots = [RobotState(id=1, pos=(0, 0), state="Loaded")]
+    info = {}
+    T, paths = plan_round(grid, robots, [], [(11, 0)], {(11, 0): 1}, T_max=30, deadline_s=10.0, search_info=info)
+    assert T == 11
+    assert info["status"] == "optimal"
+    assert info["elapsed_s"] >= 0.0
+
+    T, paths = plan_round(grid, robots, [], [(11, 0)], {(11, 0): 1}, T_max=8, search_info=info)
+    assert T is None
+    assert info["status"] == "infeasible"
+
+
+def test_deadline_returns_incumbent_above_optimum(monkeypatch):
+    grid = [[0] * 12]
+    robots = [RobotState(id=1, pos=(0, 0), state="Loaded")]
+    plan_with_order = planner._plan_with_order
+    feasible_seen = []
+
+    def expiring(grid_, robots_, pickups, drops, caps, T, *args):
+        # The budget runs out right after the first feasible makespan.
+        if feasible_seen:
+            raise planner._DeadlineExceeded()
+        result = plan_with_order(grid_, robots_, pickups, drops, caps, T, *args)
+        if result[0]:
+            feasible_seen.append(T)
+        return result
+
+    monkeypatch.setattr(planner, "_plan_with_order", expiring)
+    info = {}
+    T, paths = plan_round(grid, robots, [], [(11, 0)], {(11, 0): 1}, T_max=30, search_info=info)
+    assert info["status"] == "feasible"
+    assert T == feasible_seen[0] == 16
+    assert len(paths[1]) == T + 1
+    assert paths[1][-1] == (11, 0)
+
+
+def test_expired_deadline_without_plan_is_timeout():
+    grid = _open_grid(3)
+    robots = [RobotState(id=1, pos=(0, 0), state="Empty")]
+    info = {}
+    T, paths = plan_round(grid, robots, [(2, 2)], [(0, 2)], {(0, 2): 1}, T_max=10, deadline_s=0.0, search_info=info)
+    assert (T, paths) == (None, {})
+    assert info["status"] == "timeout"
+
+    info = {}
+    T, tau, paths = plan_round_sync(
+        grid, robots, [(2, 2)], [(0, 2)], {(0, 2): 1}, T_max=10, deadline_s=0.0, search_info=info
+    )
+    assert (T, tau, paths) == (None, None, {})
+    assert info["status"] == "timeout"
+
+    T, tau, paths = plan_round_sync(grid, robots, [(2, 2)], [(0, 2)], {(0, 2): 1}, T_max=10, search_info=info)
+    assert T == 6
+    assert info["status"] == "optimal"
@@ -0,0 +1,79 @@
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src", "py")))
+
+np = pytest.importorskip("numpy")
+
+import planner
+from data_types import RobotState
+from distance_oracle import DistanceOracle, oracle_path
+from planner import search_min_T_sync
+
+
+def _random_grid(rng, width=9, height=7, blocked=0.25):
+    return [[1 if rng.random() < blocked else 0 for _ in range(width)] for _ in range(height)]
+
+
+def test_oracle_matches_multi_source_bfs():
+    rng = random.Random(3)
+    grid = _random_grid(rng)
+    free = [(x, y) for y in range(len(grid)) for x in range(len(grid[0])) if grid[y][x] == 0]
+    sources = rng.sample(free, 10)
+    oracle = DistanceOracle.build(grid, sources)
+    grid_cache = planner._get_grid_cache(grid)
+    width = grid_cache["width"]
+    for _ in range(20):
+        subset = rng.sample(sources, rng.randint(1, len(sources)))
+        dist = planner._bfs_multi_source(grid_cache, subset, use_cache=False)
+        assert oracle.distances_to(subset, free) == [dist[y * width + x] for x, y in free]
+
+
+def test_oracle_persists_and_memory_maps(tmp_path):
+    grid = [
+        [0, 0, 1],
+        [0, 1, 0],
+        [0, 0, 0],
+    ]
+    sources = [(0, 0), (2, 1)]
+    built = DistanceOracle.for_map(grid, sources, directory=str(tmp_path))
+    assert os.path.exists(oracle_path(grid, sorted(sources), str(tmp_path)))
+    loaded = DistanceOracle.for_map(grid, list(reversed(sources)), directory=str(tmp_path))
+    assert isinstance(loaded.fields, np.memmap)
+    assert loaded.fields.dtype == np.uint16
+    assert np.array_equal(loaded.fields, built.fields)
+    # (2, 0) is a wall cell, so it has no distance.
+    assert loaded.distances_to([(0, 0)], [(2, 2), (2, 0)]) == [4, -1]
+
+
+def test_sync_search_with_oracle_matches_bfs():
+    grid = [
+        [0, 0, 0, 0],
+        [0, 1, 1, 0],
+        [0, 0, 0, 0],
+    ]
+    shelves = [(1, 0), (2, 0), (1, 2), (2, 2)]
+    goals = [(0, 1), (3, 1)]
+    oracle = DistanceOracle.build(grid, shelves + goals)
+    robots = [RobotState(id=1, pos=(0, 0), state="Empty"), RobotState(id=2, pos=(3, 2), state="Empty")]
+    pickups = [(2, 0), (1, 2)]
+    drop_caps = {g: 1 for g in goals}
+    expected = search_min_T_sync(grid, robots, pickups, goals, drop_caps, T_max=10)
+    assert expected[0] is not None
+    assert search_min_T_sync(grid, robots, pickups, goals, drop_caps, T_max=10, oracle=oracle)[:2] == expected[:2]
+
+
+def test_simulator_oracle_dir_and_opt_out(tmp_path):
+    import simulator_full_sync
+
+    root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+    map_path = os.path.join(root, "maps", "test.json")
+    oracle_dir = tmp_path / "oracles"
+    simulator_full_sync.run_simulation(map_path, 2, 10, str(tmp_path / "a.json"), seed=1, oracle_dir=str(oracle_dir))
+    assert [p.suffix for p in oracle_dir.iterdir()] == [".npy"]
+    cache = tmp_path / "cache"
+    simulator_full_sync.run_simulation(map_path, 2, 10, str(tmp_path / "b.json"), seed=1, no_oracle=True)
+    assert not cache.exists() or not list(cache.glob("distance_oracle_*"))
@@ -5,7 +5,7 @@ import pytest
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src", "py")))
 
-from simulator_full import _validate_collision_free
+from collision_check import validate_collision_free as _validate_collision_free
 
 
 def test_edge_swap_forbidden():
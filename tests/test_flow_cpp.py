@@ -1,5 +1,9 @@
 import os
+import random
 import sys
+from collections import deque
+
+import pytest
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src", "py")))
 
@@ -95,6 +99,20 @@ def test_same_target_different_times():
     assert all(path[-1] == (1, 0) for path in paths)
 
 
+def test_flow_value_reports_routed_agents():
+    grid = [
+        [0, 0, 0],
+    ]
+    starts = [(0, 0), (2, 0)]
+    targets = [(1, 0)]
+    short = flow_planner_cpp.plan_flow(grid, starts, targets, [1], 1, [], [])
+    assert short["feasible"] is False
+    assert short["flow"] == 1
+    enough = flow_planner_cpp.plan_flow(grid, starts, targets, [1], 2, [], [])
+    assert enough["feasible"] is True
+    assert enough["flow"] == 2
+
+
 def test_unreachable_target_infeasible():
     grid = [
         [0, 1, 0],
@@ -118,3 +136,154 @@ def test_hlpp_solver_feasible():
     assert result["feasible"] is True
     paths = result["paths"]
     assert len(paths) == 2
+
+
+def test_reserved_corridor_infeasible():
+    grid = [
+        [0, 0, 0, 0],
+    ]
+    starts = [(0, 0)]
+    targets = [(3, 0)]
+    reserved = [(2, 0, t) for t in range(6)]
+    result = flow_planner_cpp.plan_flow(grid, starts, targets, [1], 5, reserved, [])
+    assert result["feasible"] is False
+
+
+def test_reserved_vertices_force_wait():
+    grid = [
+        [0, 0, 0],
+    ]
+    starts = [(0, 0)]
+    targets = [(2, 0)]
+    reserved = [(1, 0, 1), (1, 0, 2)]
+    assert flow_planner_cpp.plan_flow(grid, starts, targets, [1], 3, reserved, [])["feasible"] is False
+    result = flow_planner_cpp.plan_flow(grid, starts, targets, [1], 4, reserved, [])
+    assert result["feasible"] is True
+    path = result["paths"][0]
+    assert path[1] == (0, 0) and path[2] == (0, 0)
+    assert path[-1] == (2, 0)
+
+
+def test_reserved_edge_blocks_both_directions():
+    grid = [
+        [0, 0],
+    ]
+    starts = [(0, 0)]
+    targets = [(1, 0)]
+    reserved_edges = [(1, 0, 0, 0, 0)]
+    assert flow_planner_cpp.plan_flow(grid, starts, targets, [1], 1, [], reserved_edges)["feasible"] is False
+    result = flow_planner_cpp.plan_flow(grid, starts, targets, [1], 2, [], reserved_edges)
+    assert result["feasible"] is True
+    assert result["paths"][0] == [(0, 0), (0, 0), (1, 0)]
+
+
+def test_compact_network_is_smaller_and_collision_free():
+    from utils import has_edge_conflict, pad_path, validate_paths
+
+    grid = [
+        [0, 0, 0, 0, 0],
+        [0, 1, 0, 1, 0],
+        [0, 0, 0, 0, 0],
+        [0, 1, 0, 1, 0],
+        [0, 0, 0, 0, 0],
+    ]
+    starts = [(0, 0), (4, 0), (0, 4), (4, 4)]
+    targets = [(4, 4), (0, 4), (4, 0), (0, 0)]
+    caps = [1] * len(targets)
+    T = 10
+    full = flow_planner_cpp.plan_flow(grid, starts, targets, caps, T, [], [])
+    compact = flow_planner_cpp.plan_flow(grid, starts, targets, caps, T, [], [], "dinic", True)
+    assert full["feasible"] is True
+    assert compact["feasible"] is True
+    assert compact["num_nodes"] < full["num_nodes"]
+    assert compact["num_arcs"] < full["num_arcs"]
+
+    paths = {i: pad_path(p, T) for i, p in enumerate(compact["paths"])}
+    assert all(len(p) == T + 1 for p in compact["paths"])
+    assert validate_paths(paths, grid)
+    assert not has_edge_conflict(paths)
+    assert sorted(p[-1] for p in paths.values()) == sorted(targets)
+
+
+def test_compact_target_parks_until_T():
+    grid = [
+        [0, 0, 0],
+    ]
+    starts = [(0, 0), (2, 0)]
+    targets = [(1, 0)]
+    # Per-time absorption lets both robots use the target; parking allows only one.
+    compact = flow_planner_cpp.plan_flow(grid, starts, targets, [1], 2, [], [], "hlpp", True)
+    assert compact["feasible"] is False
+    single = flow_planner_cpp.plan_flow(grid, [(0, 0)], targets, [1], 2, [], [], "hlpp", True)
+    assert single["feasible"] is True
+    path = single["paths"][0]
+    assert len(path) == 3
+    assert path[-1] == (1, 0)
+
+
+def test_compact_rejects_multi_cap_targets():
+    grid = [[0, 0, 0]]
+    with pytest.raises(ValueError):
+        flow_planner_cpp.plan_flow(grid, [(0, 0), (2, 0)], [(1, 0)], [2], 2, [], [], "dinic", True)
+    full = flow_planner_cpp.plan_flow(grid, [(0, 0), (2, 0)], [(1, 0)], [2], 2, [], [], "dinic", False)
+    assert full["feasible"] is True
+
+
+def test_cancel_token_aborts_probe():
+    grid = [[0, 0, 0]]
+    token = flow_planner_cpp.CancelToken()
+    result = flow_planner_cpp.plan_flow(grid, [(0, 0)], [(2, 0)], [1], 4, [], [], cancel_token=token)
+    assert result["feasible"] is True
+    assert result["cancelled"] is False
+
+    token.cancel()
+    assert token.cancelled
+    result = flow_planner_cpp.plan_flow(grid, [(0, 0)], [(2, 0)], [1], 4, [], [], cancel_token=token)
+    assert result["feasible"] is False
+    assert result["cancelled"] is True
+    assert result["timed_out"] is False
+    result = flow_planner_cpp.plan_flow_sync(grid, [(0, 0)], [(2, 0)], [(1, 0)], [1], 4, 2, cancel_token=token)
+    assert result["cancelled"] is True
+    result = flow_planner_cpp.plan_flow_rot(grid, [(0, 0)], [0], [(2, 0)], [1], 4, [], [], cancel_token=token)
+    assert result["cancelled"] is True
+
+
+def _queue_bfs(grid, sources):
+    height, width = len(grid), len(grid[0])
+    dist = [-1] * (width * height)
+    q = deque()
+    for x, y in sources:
+        dist[y * width + x] = 0
+        q.append((x, y))
+    while q:
+        x, y = q.popleft()
+        for nx, ny in ((x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)):
+            if 0 <= nx < width and 0 <= ny < height and grid[ny][nx] == 0 and dist[ny * width + nx] < 0:
+                dist[ny * width + nx] = dist[y * width + x] + 1
+                q.append((nx, ny))
+    return dist
+
+
+def test_bitgrid_matches_queue_bfs():
+    rng = random.Random(7)
+    # Widths around the 64-bit word boundary exercise the cross-word carries.
+    for width, height in ((1, 1), (5, 4), (63, 3), (64, 5), (65, 6), (130, 4)):
+        grid = [[1 if rng.random() < 0.3 else 0 for _ in range(width)] for _ in range(height)]
+        free = [(x, y) for y in range(height) for x in range(width) if grid[y][x] == 0]
+        bits = flow_planner_cpp.BitGrid(grid)
+        assert (bits.width, bits.height) == (width, height)
+        for _ in range(3):
+            sources = rng.sample(free, min(len(free), rng.randint(1, 3)))
+            assert bits.distances(sources) == _queue_bfs(grid, sources)
+    assert flow_planner_cpp.BitGrid([[0, 0]]).distances([]) == [-1, -1]
+
+
+def test_bitgrid_rejects_bad_sources():
+    bits = flow_planner_cpp.BitGrid([[0, 1]])
+    for source in ((1, 0), (2, 0), (-1, 0)):
+        try:
+            bits.distances([source])
+        except ValueError:
+            continue
+        raise AssertionError(f"expected ValueError for {source}")
+
@@ -222,3 +222,15 @@ def test_hlpp_solver():
     )
     assert res["feasible"] is True
     assert res["paths"][0][-1] == (2, 0)
+
+
+def test_orientation_pruning_keeps_only_feasible_headings():
+    """With a tight window only the east-facing diagonal can lie on a path."""
+    grid = [[0, 0, 0]]
+    res = flow_planner_cpp.plan_flow_rot(
+        grid, [(0, 0)], [DIR_EAST], [(2, 0)], [1], 2, [], []
+    )
+    assert res["feasible"] is True
+    # 3 (cell, dir, t) states split in/out, 2 move gadgets, source and sink.
+    assert res["num_nodes"] <= 3 * 2 + 2 * 2 + 2
+    assert res["path_dirs"][0] == [DIR_EAST, DIR_EAST, DIR_EAST]
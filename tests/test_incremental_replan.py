@@ -0,0 +1,133 @@
+import json
+import os
+import sys
+import time
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src", "py")))
+
+from collision_check import validate_collision_free as _validate_collision_free
+from data_types import RobotState
+from planner import repair_round
+from simulator_full import run_simulation
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+def _open_grid(width, height):
+    return [[0] * width for _ in range(height)]
+
+
+def test_repair_keeps_unaffected_paths():
+    grid = _open_grid(5, 3)
+    kept_path = [(0, 0), (1, 0), (2, 0), (3, 0), (4, 0)]
+    robots = [
+        RobotState(id=1, pos=(0, 0), state="Loaded"),
+        RobotState(id=2, pos=(0, 2), state="Empty"),
+    ]
+    info = {}
+    T, paths = repair_round(
+        grid, robots, {1: kept_path}, [(4, 2)], [(4, 0)], {(4, 0): 1}, T_max=20, radius=1, search_info=info
+    )
+    assert T is not None
+    assert paths[1][: len(kept_path)] == kept_path
+    assert paths[2][0] == (0, 2) and paths[2][-1] == (4, 2)
+    assert info["status"] == "feasible"
+    assert info["replanned"] == 1
+    _validate_collision_free(paths)
+
+
+def test_repair_releases_blocking_neighbour():
+    # One-wide corridor: robot 1 sits between robot 2 and its only free pickup.
+    grid = _open_grid(5, 1)
+    robots = [
+        RobotState(id=1, pos=(2, 0), state="Empty"),
+        RobotState(id=2, pos=(0, 0), state="Empty"),
+        RobotState(id=3, pos=(4, 0), state="Loaded"),
+    ]
+    kept = {1: [(2, 0)], 3: [(4, 0)]}
+    info = {}
+    T, paths = repair_round(
+        grid, robots, kept, [(2, 0), (3, 0)], [(4, 0)], {(4, 0): 1}, T_max=20, radius=1, search_info=info
+    )
+    assert T is not None
+    assert info["replanned"] == 2
+    assert info["radius"] == 2
+    assert {paths[1][-1], paths[2][-1]} == {(2, 0), (3, 0)}
+    assert set(paths[3]) == {(4, 0)}
+    _validate_collision_free(paths)
+
+
+def test_repair_gives_up_before_whole_fleet():
+    grid = _open_grid(3, 1)
+    robots = [
+        RobotState(id=1, pos=(2, 0), state="Empty"),
+        RobotState(id=2, pos=(0, 0), state="Empty"),
+    ]
+    info = {}
+    T, paths = repair_round(
+        grid, robots, {1: [(2, 0)]}, [(2, 0)], [(1, 0)], {(1, 0): 1}, T_max=20, radius=0, search_info=info
+    )
+    assert T is None and paths == {}
+    assert info["status"] == "infeasible"
+
+
+def test_incremental_simulation_is_collision_free(tmp_path):
+    out = tmp_path / "sim.json"
+    run_simulation(os.path.join(ROOT, "maps", "test.json"), 4, 40, str(out), seed=1, incremental=True)
+    data = json.loads(out.read_text())
+    assert data["incremental"]["repairs"] > 0
+    trajectories = {int(rid): [tuple(p) for p in a["trajectory"]] for rid, a in data["agents"].items()}
+    _validate_collision_free(trajectories)
+    assert any(t["delivered_time"] is not None for t in data["tasks"])
+
+
+def test_fallback_gets_remaining_round_budget(tmp_path, monkeypatch):
+    import simulator_full
+
+    plan_round = simulator_full.plan_round
+    fallback_budgets = []
+    repaired = []
+
+    def slow_failed_repair(*args, search_info=None, **kwargs):
+        repaired.append(True)
+        time.sleep(0.05)
+        search_info["status"] = "infeasible"
+        return None, {}
+
+    def recording_plan_round(*args, deadline_s=None, **kwargs):
+        if repaired:
+            fallback_budgets.append(deadline_s)
+        return plan_round(*args, deadline_s=deadline_s, **kwargs)
+
+    monkeypatch.setattr(simulator_full, "repair_round", slow_failed_repair)
+    monkeypatch.setattr(simulator_full, "plan_round", recording_plan_round)
+    out = tmp_path / "sim.json"
+    run_simulation(os.path.join(ROOT, "maps", "test.json"), 4, 20, str(out), seed=1, incremental=True, deadline_s=5.0)
+    assert fallback_budgets
+    assert all(budget <= 5.0 - 0.05 for budget in fallback_budgets)
+
+
+def test_timed_out_repair_holds_without_fallback(tmp_path, monkeypatch):
+    import simulator_full
+
+    calls = {"repair": 0, "plan": 0}
+    plan_round = simulator_full.plan_round
+
+    def timed_out_repair(*args, search_info=None, **kwargs):
+        calls["repair"] += 1
+        search_info["status"] = "timeout"
+        return None, {}
+
+    def counting_plan_round(*args, **kwargs):
+        calls["plan"] += 1
+        return plan_round(*args, **kwargs)
+
+    monkeypatch.setattr(simulator_full, "repair_round", timed_out_repair)
+    monkeypatch.setattr(simulator_full, "plan_round", counting_plan_round)
+    out = tmp_path / "sim.json"
+    run_simulation(os.path.join(ROOT, "maps", "test.json"), 4, 20, str(out), seed=1, incremental=True, deadline_s=5.0)
+    data = json.loads(out.read_text())
+    assert calls["repair"] > 0
+    # Once paths are kept every round is a repair; a timed-out one holds.
+    assert data["plan_status"]["timeout"] == calls["repair"]
+    assert data["incremental"]["fallbacks"] == 0
@@ -0,0 +1,109 @@
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src", "py")))
+
+
+def _maybe_add_build_path():
+    root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+    candidates = [
+        os.path.join(root, "build"),
+        os.path.join(root, "build", "Release"),
+        os.path.join(root, "build", "Debug"),
+    ]
+    for path in candidates:
+        if not os.path.isdir(path):
+            continue
+        for name in os.listdir(path):
+            if name.startswith("flow_planner_cpp") and (
+                name.endswith(".so") or name.endswith(".pyd") or name.endswith(".dylib")
+            ):
+                sys.path.append(path)
+                return
+
+
+def _import_flow_planner():
+    try:
+        import flow_planner_cpp  # type: ignore
+        return flow_planner_cpp
+    except ImportError:
+        _maybe_add_build_path()
+        try:
+            import flow_planner_cpp  # type: ignore
+            return flow_planner_cpp
+        except ImportError as exc:
+            raise ImportError("flow_planner_cpp not found; build the C++ module before running tests") from exc
+
+
+_import_flow_planner()
+
+import planner
+from data_types import DIR_EAST, DIR_NORTH, DIR_SOUTH, DIR_TO_DELTA, DIR_WEST, RobotState
+from planner import expand_turns, plan_round_rot
+from utils import has_edge_conflict, validate_paths
+
+
+def _rotation_consistent(paths, dirs):
+    for rid, path in paths.items():
+        heading = dirs[rid]
+        assert len(heading) == len(path)
+        for t in range(len(path) - 1):
+            (x1, y1), (x2, y2) = path[t], path[t + 1]
+            if (x1, y1) != (x2, y2):
+                if DIR_TO_DELTA[heading[t]] != (x2 - x1, y2 - y1) or heading[t + 1] != heading[t]:
+                    return False
+            elif {heading[t], heading[t + 1]} in ({DIR_EAST, DIR_WEST}, {DIR_SOUTH, DIR_NORTH}):
+                return False
+    return True
+
+
+def test_expand_turns_inserts_delays():
+    path = [(0, 0), (1, 0), (1, 1)]
+    out_path, out_dirs = expand_turns(path, DIR_WEST)
+    # 180 degrees before the first move, 90 degrees before the second.
+    assert out_path == [(0, 0), (0, 0), (0, 0), (1, 0), (1, 0), (1, 1)]
+    assert out_dirs[2] == DIR_EAST and out_dirs[3] == DIR_EAST
+    assert out_dirs[-1] == DIR_SOUTH
+
+
+def test_expand_turns_uses_existing_waits():
+    path = [(0, 0), (0, 0), (1, 0)]
+    out_path, out_dirs = expand_turns(path, DIR_NORTH)
+    assert out_path == path
+    assert out_dirs == [DIR_NORTH, DIR_EAST, DIR_EAST]
+
+
+def test_lazy_rotation_repairs_turn_conflicts(monkeypatch):
+    grid = [
+        [0, 0, 0, 0],
+        [0, 0, 0, 0],
+        [0, 0, 0, 0],
+    ]
+    robots = [
+        RobotState(id=1, pos=(0, 1), state="Loaded", facing=DIR_NORTH),
+        RobotState(id=2, pos=(0, 0), state="Loaded", facing=DIR_NORTH),
+    ]
+    repairs = []
+    original = planner._repair_group_rot
+
+    def counting(*args, **kwargs):
+        repairs.append(args[2])
+        return original(*args, **kwargs)
+
+    monkeypatch.setattr(planner, "_repair_group_rot", counting)
+    T, paths, dirs = plan_round_rot(grid, robots, [], [(1, 0), (2, 1)], {}, T_max=10, lazy=True)
+    assert repairs
+    assert T == 3
+    assert validate_paths(paths, grid)
+    assert not has_edge_conflict(paths)
+    assert _rotation_consistent(paths, dirs)
+
+
+def test_lazy_rotation_matches_exact_without_turns():
+    grid = [[0, 0, 0, 0]]
+    robots = [RobotState(id=1, pos=(0, 0), state="Loaded", facing=DIR_EAST)]
+    T_lazy, paths_lazy, dirs_lazy = plan_round_rot(grid, robots, [], [(3, 0)], {}, T_max=8, lazy=True)
+    T_exact, paths_exact, _ = plan_round_rot(grid, robots, [], [(3, 0)], {}, T_max=8)
+    assert T_lazy == T_exact == 3
+    assert paths_lazy == paths_exact
+    assert dirs_lazy[1] == [DIR_EAST] * 4
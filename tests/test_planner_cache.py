@@ -0,0 +1,97 @@
+import os
+import sys
+import threading
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src", "py")))
+
+import planner
+from planner_cache import KeyedGrid, LRUCache, map_fingerprint
+
+
+def test_lru_evicts_least_recently_used():
+    cache = LRUCache(max_entries=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1
+    cache.put("c", 3)
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    stats = cache.stats()
+    assert (stats["entries"], stats["hits"], stats["misses"], stats["evictions"]) == (2, 3, 1, 1)
+
+
+def test_lru_byte_bound():
+    cache = LRUCache(max_bytes=10, sizeof=len)
+    cache.put("a", "xxxx")
+    cache.put("b", "xxxx")
+    cache.put("c", "xxxx")
+    assert cache.get("a") is None
+    assert cache.stats()["bytes"] == 8
+    cache.put("huge", "x" * 11)
+    assert cache.get("huge") is None
+    assert len(cache) == 2
+
+
+def test_lru_concurrent_access_stays_bounded():
+    cache = LRUCache(max_entries=8, max_bytes=64, sizeof=lambda v: 4)
+
+    def worker(offset):
+        for i in range(2000):
+            key = (offset + i) % 32
+            if cache.get(key) is None:
+                cache.put(key, key)
+
+    threads = [threading.Thread(target=worker, args=(k * 7,)) for k in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    stats = cache.stats()
+    assert stats["entries"] <= 8
+    assert stats["bytes"] == 4 * stats["entries"]
+    assert stats["hits"] + stats["misses"] == 8000
+
+
+def test_map_fingerprint_tracks_layout():
+    grid = [[0, 1], [0, 0]]
+    assert map_fingerprint(grid) == map_fingerprint([list(row) for row in grid])
+    assert map_fingerprint(grid) != map_fingerprint([[0, 0], [0, 1]])
+    assert map_fingerprint(grid)[:2] == (2, 2)
+
+
+def test_distance_cache_is_bounded(monkeypatch):
+    monkeypatch.setattr(planner, "_DIST_CACHE", LRUCache(max_entries=3))
+    grid = [[0] * 6 for _ in range(6)]
+    grid_cache = planner._get_grid_cache(grid)
+    for x in range(6):
+        planner._bfs_multi_source(grid_cache, [(x, 0)])
+    planner._bfs_multi_source(grid_cache, [(5, 0)])
+    stats = planner.cache_stats()["dist"]
+    assert stats["entries"] == 3
+    assert stats["evictions"] == 3
+    assert stats["hits"] == 1
+
+
+def test_keyed_grid_is_hashed_once(monkeypatch):
+    import planner_cache
+    from data_types import RobotState
+
+    grid = KeyedGrid([[0] * 4 for _ in range(3)])
+    assert map_fingerprint(grid) == map_fingerprint([[0] * 4 for _ in range(3)])
+
+    def no_rehash(*args, **kwargs):
+        raise AssertionError("KeyedGrid was hashed again")
+
+    monkeypatch.setattr(planner_cache.hashlib, "blake2b", no_rehash)
+    robots = [RobotState(id=1, pos=(0, 0), state="Empty")]
+    T, paths = planner.plan_round(grid, robots, [(3, 2)], [(0, 2)], {(0, 2): 1}, T_max=10, method="auto")
+    assert T == 5
+    assert paths[1][-1] == (3, 2)
+
+
+def test_list_bytes_counts_unshared_ints():
+    small = [0, 1, 256, -1]
+    large = [257, 1000, 100000, 5]
+    assert planner._list_bytes(small) == 56 + 8 * 4
+    assert planner._list_bytes(large) == 56 + 8 * 4 + 28 * 3
@@ -0,0 +1,73 @@
+import os
+import sys
+import threading
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src", "py")))
+
+from data_types import RobotState
+from planner import search_min_T_sync
+from planner_pool import PlannerPool
+
+
+def test_pool_runs_lowest_priority_first():
+    gate = threading.Event()
+    order = []
+    with PlannerPool(1) as pool:
+        blocker = pool.submit(gate.wait)
+        futures = [pool.submit(order.append, p, priority=(p,)) for p in (3, 1, 2)]
+        gate.set()
+        blocker.result()
+        for fut in futures:
+            fut.result()
+    assert order == [1, 2, 3]
+
+
+def test_pool_drops_cancelled_queued_work():
+    gate = threading.Event()
+    ran = []
+    with PlannerPool(1) as pool:
+        blocker = pool.submit(gate.wait)
+        dropped = pool.submit(ran.append, "dropped")
+        kept = pool.submit(ran.append, "kept")
+        assert dropped.cancel()
+        gate.set()
+        blocker.result()
+        kept.result()
+    assert ran == ["kept"]
+    assert dropped.cancelled()
+
+
+def test_shutdown_cancels_queued_work():
+    gate = threading.Event()
+    pool = PlannerPool(1)
+    blocker = pool.submit(gate.wait)
+    queued = pool.submit(lambda: None)
+    gate.set()
+    pool.shutdown()
+    assert blocker.done()
+    assert queued.done()
+
+
+def test_pool_reused_across_searches_matches_serial():
+    grid = [
+        [0, 0, 0],
+        [0, 0, 0],
+    ]
+    pickups = [(0, 1), (2, 1)]
+    drops = [(0, 0), (2, 0)]
+    drop_caps = {d: 1 for d in drops}
+    rounds = [
+        [RobotState(id=1, pos=(1, 0), state="Empty"), RobotState(id=2, pos=(2, 0), state="Empty")],
+        [RobotState(id=1, pos=(0, 1), state="Empty"), RobotState(id=2, pos=(1, 1), state="Empty")],
+    ]
+    with PlannerPool(3) as pool:
+        for robots in rounds:
+            serial = search_min_T_sync(grid, robots, pickups, drops, drop_caps, T_max=8)
+            for t_workers in (1, 2):
+                pooled = search_min_T_sync(
+                    grid, robots, pickups, drops, drop_caps, T_max=8,
+                    parallel_T_workers=t_workers, pool=pool,
+                )
+                assert pooled[:2] == serial[:2]
+                assert pooled[0] is not None
+        assert pool.pending() == 0
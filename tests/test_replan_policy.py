@@ -0,0 +1,62 @@
+import json
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src", "py")))
+
+from simulator_full import _hold_after, _replan_steps, _safe_prefix, run_simulation
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+
+def test_replan_steps_per_policy():
+    arrivals = {1: 2, 2: 3, 3: 5, 4: 9}
+    assert _replan_steps("event", 1, 1, 1.0, arrivals, 2, 0.0) == 2
+    assert _replan_steps("window", 3, 1, 1.0, arrivals, 2, 0.0) == 4
+    assert _replan_steps("count", 1, 3, 1.0, arrivals, 2, 0.0) == 5
+    assert _replan_steps("count", 1, 10, 1.0, arrivals, 2, 0.0) == 9
+    assert _replan_steps("latency", 1, 1, 0.5, arrivals, 2, 3.1) == 7
+    # Never before the first event, never past the last arrival.
+    assert _replan_steps("latency", 1, 1, 0.5, arrivals, 2, 0.1) == 2
+    assert _replan_steps("window", 50, 1, 1.0, arrivals, 2, 0.0) == 9
+
+
+def test_hold_after_stops_at_first_target():
+    assert _hold_after([(0, 0), (1, 0), (2, 0), (3, 0)], 1) == [(0, 0), (1, 0), (1, 0), (1, 0)]
+    assert _hold_after([], 3) == []
+
+
+def test_safe_prefix_stops_before_waiting_robot():
+    # Robot 1 waits at (1, 0) from t=1; robot 2 would reach that cell at t=3.
+    paths = {
+        1: [(0, 0), (1, 0), (1, 0), (1, 0), (1, 0)],
+        2: [(3, 0), (3, 0), (2, 0), (1, 0), (0, 0)],
+    }
+    assert _safe_prefix(paths, 1, 4) == 2
+    assert _safe_prefix({1: paths[1]}, 1, 4) == 4
+
+
+def test_swap_is_a_conflict():
+    paths = {1: [(0, 0), (0, 0), (1, 0)], 2: [(2, 0), (1, 0), (0, 0)]}
+    assert _safe_prefix(paths, 0, 2) == 1
+
+
+@pytest.mark.parametrize("policy", ["window", "count"])
+def test_batched_policy_replans_less(tmp_path, policy):
+    map_path = os.path.join(ROOT, "maps", "test.json")
+    stats = {}
+    for name in ("event", policy):
+        out = tmp_path / f"{name}.json"
+        run_simulation(map_path, 4, 40, str(out), seed=1, replan_policy=name, replan_window=4, replan_events=3)
+        stats[name] = json.loads(out.read_text())["replanning"]
+    assert stats[policy]["policy"] == policy
+    assert stats[policy]["replans"] < stats["event"]["replans"]
+    assert stats[policy]["events_per_replan"] > stats["event"]["events_per_replan"]
+    assert stats["event"]["mean_event_wait"] == 0
+
+
+def test_unknown_policy_rejected(tmp_path):
+    with pytest.raises(ValueError):
+        run_simulation(os.path.join(ROOT, "maps", "test.json"), 2, 5, str(tmp_path / "x.json"), 0, replan_policy="never")
@@ -0,0 +1,58 @@
+import json
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src", "py")))
+
+from round_log import RoundLog, reassemble
+from simulator_full import run_simulation as run_full
+from simulator_full_sync import run_simulation as run_sync
+from task_store import TaskStore
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+MAP = os.path.join(ROOT, "maps", "test.json")
+
+
+def test_round_records_carry_task_events(tmp_path):
+    path = str(tmp_path / "log.jsonl")
+    log = RoundLog(path, {"map": "m", "seed": 0}, [1, 2], [(0, 0), (1, 0)])
+    store = TaskStore([(3, 0)], log=log)
+    task = store.spawn((3, 0), 0)
+    store.pick(task["id"], 2, robot_id=1)
+    log.round(0, 2, None, 2, 0.01, "optimal", [[(0, 1), (0, 2)], [(1, 0), (1, 0)]])
+    store.deliver(task["id"], 3, robot_id=1)
+    log.close({"map": "m", "stats": {}})
+    records = [json.loads(line) for line in open(path)]
+    assert [r["kind"] for r in records] == ["start", "round", "end"]
+    assert records[0]["agent_ids"] == [1, 2] and records[0]["starts"] == [[0, 0], [1, 0]]
+    assert records[1]["events"] == [["spawn", 1, 3, 0, 0], ["pick", 1, 1, 2]]
+    assert records[1]["segments"] == [[[0, 1], [0, 2]], [[1, 0], [1, 0]]]
+    assert records[2]["events"] == [["deliver", 1, 1, 3]]
+
+
+def test_reassemble_matches_direct_output(tmp_path):
+    for run in (run_full, run_sync):
+        out = tmp_path / "sim.json"
+        log = tmp_path / "sim.jsonl"
+        run(MAP, 3, 30, str(out), seed=1, round_log=str(log))
+        rebuilt = tmp_path / "rebuilt.json"
+        reassemble(str(log), str(rebuilt))
+        assert rebuilt.read_bytes() == out.read_bytes()
+
+
+def test_reassemble_truncated_stream(tmp_path):
+    out = tmp_path / "sim.json"
+    log = tmp_path / "sim.jsonl"
+    run_sync(MAP, 3, 30, str(out), seed=1, round_log=str(log))
+    lines = log.read_text().splitlines()
+    # Keep the start record and two rounds, plus a torn third round.
+    log.write_text("\n".join(lines[:3]) + "\n" + lines[3][:20])
+    header = reassemble(str(log), str(tmp_path / "partial.json"))
+    full = json.loads(out.read_text())
+    partial = json.loads((tmp_path / "partial.json").read_text())
+    assert header["truncated"] is True
+    steps = header["sim_end_timestep"]
+    assert 0 < steps < full["stats"]["sim_end_timestep"]
+    for rid, agent in partial["agents"].items():
+        assert agent["trajectory"] == full["agents"][rid]["trajectory"][: steps + 1]
+    assert {t["id"] for t in partial["tasks"]} <= {t["id"] for t in full["tasks"]}
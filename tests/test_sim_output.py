@@ -0,0 +1,76 @@
+import json
+import os
+import sys
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src", "py")))
+
+from sim_output import SimBin, load_sim_output, trajectories_of, write_sim_output
+from simulator_full_sync import run_simulation
+from trajectory_buffer import TrajectoryBuffer
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+
+TASKS = [
+    {"id": 1, "pos": [0, 1], "spawn_time": 0, "picked_time": 2, "delivered_time": 5, "picked_by": 2, "delivered_by": 2},
+    {"id": 2, "pos": [3, 1], "spawn_time": 1, "picked_time": None, "delivered_time": None, "picked_by": None, "delivered_by": None},
+]
+
+
+def _buffer():
+    buf = TrajectoryBuffer([2, 5], [(0, 0), (3, 0)], capacity=2)
+    buf.append([[(0, 1), (0, 1), (1, 1)], [(3, 1), (2, 1), (2, 0)]])
+    return buf
+
+
+def test_simbin_round_trip_matches_json(tmp_path):
+    header = {"map": "maps/test.json", "max_timestep": 3, "stats": {"tasks_total": 2, "avg_pickup_wait": None}}
+    write_sim_output(str(tmp_path / "out.json"), header, _buffer(), TASKS)
+    write_sim_output(str(tmp_path / "out.simbin"), header, _buffer(), TASKS)
+    plain = load_sim_output(str(tmp_path / "out.json"))
+    binary = load_sim_output(str(tmp_path / "out.simbin"))
+    assert list(plain) == list(header) + ["agents", "tasks"]
+    for key in header:
+        assert binary[key] == plain[key]
+    assert binary["tasks"] == plain["tasks"]
+    plain_traj = trajectories_of(plain)
+    binary_traj = trajectories_of(binary)
+    assert set(binary_traj) == {2, 5}
+    for rid in plain_traj:
+        assert len(binary_traj[rid]) == 4
+        assert list(binary_traj[rid]) == plain_traj[rid]
+        assert binary_traj[rid][-1] == plain_traj[rid][-1]
+
+
+def test_random_access_by_timestep(tmp_path):
+    path = str(tmp_path / "out.simbin")
+    write_sim_output(path, {"max_timestep": 3}, _buffer(), [])
+    run = SimBin(path)
+    assert run.steps == 3
+    assert isinstance(run.positions, np.memmap)
+    assert run.positions.dtype == np.int16
+    assert run.positions_at(2) == {2: (0, 1), 5: (2, 1)}
+    assert run.positions_at(99) == {2: (1, 1), 5: (2, 0)}
+    assert run.trajectory(5) == [(3, 0), (3, 1), (2, 1), (2, 0)]
+    assert run.tasks() == []
+
+
+def test_rejects_other_files(tmp_path):
+    path = tmp_path / "bad.simbin"
+    path.write_bytes(b"{}")
+    with pytest.raises(ValueError):
+        SimBin(str(path))
+
+
+def test_simulator_writes_simbin(tmp_path):
+    map_path = os.path.join(ROOT, "maps", "test.json")
+    run_simulation(map_path, 3, 20, str(tmp_path / "sim.json"), seed=1)
+    run_simulation(map_path, 3, 20, str(tmp_path / "sim.simbin"), seed=1)
+    plain = json.loads((tmp_path / "sim.json").read_text())
+    binary = load_sim_output(str(tmp_path / "sim.simbin"))
+    assert binary["tasks"] == plain["tasks"]
+    assert binary["stats"]["tasks_total"] == plain["stats"]["tasks_total"]
+    assert {rid: list(t) for rid, t in trajectories_of(binary).items()} == trajectories_of(plain)
@@ -0,0 +1,64 @@
+import os
+import random
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src", "py")))
+
+from sim_stats import StatsCollector, percentiles
+from task_store import TaskStore
+
+
+def _brute_backlog(tasks, sim_end):
+    curve = []
+    for t in range(sim_end + 1):
+        curve.append(
+            sum(1 for task in tasks if task["spawn_time"] <= t and (task["picked_time"] is None or task["picked_time"] > t))
+        )
+    return sum(curve) / len(curve), max(curve)
+
+
+def test_backlog_sweep_matches_per_timestep_scan():
+    rng = random.Random(3)
+    for _ in range(20):
+        collector = StatsCollector()
+        tasks = []
+        sim_end = rng.randint(0, 40)
+        for _ in range(rng.randint(0, 30)):
+            spawn = rng.randint(0, 45)
+            picked = spawn + rng.randint(0, 20) if rng.random() < 0.7 else None
+            task = {"spawn_time": spawn, "picked_time": picked}
+            tasks.append(task)
+            collector.task_spawned(task)
+            if picked is not None:
+                collector.task_picked(task)
+        avg, peak = _brute_backlog(tasks, sim_end)
+        summary = collector.backlog_summary(sim_end)
+        assert abs(summary["avg_backlog"] - avg) < 1e-9
+        assert summary["max_backlog"] == peak
+
+
+def test_percentiles_nearest_rank():
+    assert percentiles([5, 1, 3, 2, 4]) == {"p50": 3, "p90": 5, "p99": 5}
+    assert percentiles(list(range(1, 101)), (1, 50, 100)) == {"p1": 1, "p50": 50, "p100": 100}
+    assert percentiles([]) == {"p50": None, "p90": None, "p99": None}
+
+
+def test_task_store_feeds_collector():
+    collector = StatsCollector()
+    store = TaskStore([(0, 0), (1, 0)], stats=collector)
+    store.spawn((0, 0), 0)
+    store.spawn((1, 0), 2)
+    store.pick(1, 3, robot_id=1)
+    store.deliver(1, 7, robot_id=1)
+    collector.robot_step((0, 0), (0, 0))
+    collector.robot_step((0, 0), (1, 0))
+    collector.plan_latency(0.5)
+    stats = collector.summary(10, agents=1)
+    assert stats["tasks_total"] == 2
+    assert stats["tasks_picked"] == 1 and stats["tasks_delivered"] == 1
+    assert stats["avg_pickup_wait"] == 3
+    assert stats["avg_delivery_time"] == 7
+    assert stats["avg_carry_time"] == 4
+    assert stats["idle_ratio"] == 0.5
+    assert stats["avg_plan_latency_s"] == 0.5
+    assert stats["pickup_wait_percentiles"]["p50"] == 3
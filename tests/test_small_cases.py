@@ -1,5 +1,6 @@
 import os
 import sys
+import time
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src", "py")))
 
@@ -34,6 +35,12 @@ def _import_flow_planner():
 
 flow_planner_cpp = _import_flow_planner()
 
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import planner
 from data_types import RobotState
 from planner import plan_round
 from utils import validate_paths
@@ -82,3 +89,102 @@ def test_plan_round_all_empty():
     assert validate_paths(paths, grid)
     assert paths[1][-1] in pickup_points
     assert paths[2][-1] in pickup_points
+
+
+def test_search_reuses_stage_results(monkeypatch):
+    grid = [[0] * 12 for _ in range(2)]
+    robots = [
+        RobotState(id=1, pos=(0, 0), state="Loaded"),
+        RobotState(id=2, pos=(0, 1), state="Empty"),
+    ]
+    probes = []
+    plan_flow = flow_planner_cpp.plan_flow
+
+    def counting(grid_, starts, targets, caps, T, reserved_v, reserved_e, *args, **kwargs):
+        probes.append((tuple(starts), tuple(reserved_v), tuple(reserved_e), T))
+        return plan_flow(grid_, starts, targets, caps, T, reserved_v, reserved_e, *args, **kwargs)
+
+    monkeypatch.setattr(planner.flow_planner_cpp, "plan_flow", counting)
+    T, paths = plan_round(grid, robots, [(1, 1)], [(11, 0)], {(11, 0): 1}, T_max=30)
+    assert T == 11
+    assert validate_paths(paths, grid)
+    # Every (stage, reservations, T) probe runs once across the outer search.
+    assert max(Counter(probes).values()) == 1
+    unreserved_loaded = [p for p in probes if p[0] == ((0, 0),) and not p[1]]
+    assert len(unreserved_loaded) <= 2 * (30).bit_length() + 2
+
+
+def test_concurrent_orders_match_serial():
+    grid = [
+        [0, 0, 0, 0],
+        [0, 0, 0, 0],
+    ]
+    robots = [
+        RobotState(id=1, pos=(2, 1), state="Loaded"),
+        RobotState(id=2, pos=(1, 0), state="Empty"),
+    ]
+    pickup_points = [(3, 0)]
+    drop_points = [(0, 0)]
+    # Loaded-first is infeasible at the optimum, so the empty-first result must be used.
+    ok, _, reason = planner._plan_with_order(grid, robots, pickup_points, drop_points, {}, 3, True)
+    assert not ok and reason == "empty_stage_infeasible"
+
+    serial = plan_round(grid, robots, pickup_points, drop_points, {}, T_max=10)
+    concurrent = plan_round(grid, robots, pickup_points, drop_points, {}, T_max=10, concurrent_orders=True)
+    assert serial[0] == 3
+    assert concurrent == serial
+    assert validate_paths(concurrent[1], grid)
+
+
+
+def test_run_orders_cancels_empty_first_on_any_error():
+    seen = {}
+
+    def plan_order(first_loaded, cancel):
+        if first_loaded:
+            raise ValueError("loaded-first failed")
+        seen["token"] = cancel
+        waited = 0.0
+        while not cancel.cancelled and waited < 5.0:
+            time.sleep(0.01)
+            waited += 0.01
+        raise planner._SearchCancelled()
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        with pytest.raises(ValueError):
+            planner._run_orders(plan_order, pool)
+    assert seen["token"].cancelled
+
+
+def test_run_orders_cancelled_loaded_first_uses_empty_first():
+    def plan_order(first_loaded, cancel):
+        if first_loaded:
+            raise planner._SearchCancelled()
+        return True, {1: [(0, 0)]}, None
+
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        assert planner._run_orders(plan_order, pool) == (True, {1: [(0, 0)]}, None)
+
+
+def test_flow_policy_matches_double_with_fewer_probes(monkeypatch):
+    grid = [[0] * 12 for _ in range(2)]
+    robots = [
+        RobotState(id=1, pos=(0, 0), state="Loaded"),
+        RobotState(id=2, pos=(0, 1), state="Empty"),
+    ]
+    probes = []
+    plan_flow = flow_planner_cpp.plan_flow
+
+    def counting(*args, **kwargs):
+        probes.append((tuple(args[1]), args[4]))
+        return plan_flow(*args, **kwargs)
+
+    monkeypatch.setattr(planner.flow_planner_cpp, "plan_flow", counting)
+    baseline = plan_round(grid, robots, [(1, 1)], [(11, 0)], {(11, 0): 1}, T_max=30)
+    double_probes = len(probes)
+    probes.clear()
+    guided = plan_round(grid, robots, [(1, 1)], [(11, 0)], {(11, 0): 1}, T_max=30, t_policy="flow")
+    assert guided == baseline
+    assert len(probes) < double_probes
+    # The loaded robot is 11 cells from its drop; nothing below that is probed.
+    assert all(T >= 11 for starts, T in probes if starts == ((0, 0),))
@@ -80,3 +80,20 @@ def test_bridge_with_obstacles():
     assert validate_paths(paths, grid)
     final_positions = {paths[i][-1] for i in paths}
     assert final_positions == set(goals)
+
+
+def test_bridge_compact_agents_park_on_goals():
+    """Compact network: every path has length T+1 and ends parked on a goal."""
+    grid = [
+        [0, 0, 0, 0],
+        [0, 1, 0, 0],
+        [0, 0, 0, 0],
+    ]
+    starts = [(0, 0), (3, 0), (0, 2)]
+    goals = [(3, 2), (0, 2), (2, 0)]
+
+    T, paths = plan_standard_mapf(grid, starts, goals, T_max=20, compact=True)
+    assert T is not None
+    assert all(len(p) == T + 1 for p in paths.values())
+    assert validate_paths(paths, grid)
+    assert {p[-1] for p in paths.values()} == set(goals)
@@ -0,0 +1,109 @@
+import json
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src", "py")))
+
+
+def _maybe_add_build_path():
+    root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+    candidates = [
+        os.path.join(root, "build"),
+        os.path.join(root, "build", "Release"),
+        os.path.join(root, "build", "Debug"),
+    ]
+    for path in candidates:
+        if not os.path.isdir(path):
+            continue
+        for name in os.listdir(path):
+            if name.startswith("flow_planner_cpp") and (
+                name.endswith(".so") or name.endswith(".pyd") or name.endswith(".dylib")
+            ):
+                sys.path.append(path)
+                return
+
+
+def _import_flow_planner():
+    try:
+        import flow_planner_cpp  # type: ignore
+        return flow_planner_cpp
+    except ImportError:
+        _maybe_add_build_path()
+        try:
+            import flow_planner_cpp  # type: ignore
+            return flow_planner_cpp
+        except ImportError as exc:
+            raise ImportError("flow_planner_cpp not found; build the C++ module before running tests") from exc
+
+
+_import_flow_planner()
+
+import solver_select
+from data_types import RobotState
+from planner import plan_round
+from utils import validate_paths
+
+
+def _table(fast_small: str, fast_large: str):
+    slow = {"dinic": 1.0, "hlpp": 1.0}
+    small = dict(slow)
+    small[fast_small] = 0.1
+    large = dict(slow)
+    large[fast_large] = 0.1
+    return {
+        "version": 1,
+        "samples": [
+            dict(solver_select.instance_features(50, 4, 4, 10), times=small),
+            dict(solver_select.instance_features(5000, 200, 200, 400), times=large),
+        ],
+    }
+
+
+def test_choose_method_uses_nearest_samples():
+    table = _table("dinic", "hlpp")
+    small = solver_select.instance_features(60, 5, 5, 12)
+    large = solver_select.instance_features(4000, 150, 180, 350)
+    assert solver_select.choose_method(small, table=table, k=1) == "dinic"
+    assert solver_select.choose_method(large, table=table, k=1) == "hlpp"
+
+
+def test_choose_method_defaults_without_calibration(tmp_path, monkeypatch):
+    monkeypatch.setenv("NETWORKFLOW_MAPF_CACHE", str(tmp_path))
+    features = solver_select.instance_features(100, 3, 3, 10)
+    assert solver_select.choose_method(features) == solver_select.DEFAULT_METHOD
+
+
+def test_calibration_roundtrip(tmp_path, monkeypatch):
+    monkeypatch.setenv("NETWORKFLOW_MAPF_CACHE", str(tmp_path))
+    table = solver_select.run_calibration(sizes=(6,), robot_fractions=(0.5,), repeats=1)
+    assert len(table["samples"]) == 1
+    assert set(table["samples"][0]["times"]) == set(solver_select.METHODS)
+    path = solver_select.save_calibration(table)
+    assert path.startswith(str(tmp_path))
+    assert solver_select.load_calibration()["samples"] == table["samples"]
+
+
+def test_calibration_miss_is_not_cached(tmp_path):
+    path = str(tmp_path / "calibration.json")
+    assert solver_select.load_calibration(path) is None
+    table = {"samples": [{"nodes": 10.0, "robots": 1.0, "targets": 1.0, "T": 2.0, "times": {"dinic": 1.0, "hlpp": 2.0}}]}
+    # Written by another process: no save_calibration call to invalidate the cache.
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(table, f)
+    assert solver_select.load_calibration(path) == table
+
+
+def test_plan_round_auto_method(tmp_path, monkeypatch):
+    monkeypatch.setenv("NETWORKFLOW_MAPF_CACHE", str(tmp_path))
+    grid = [
+        [0, 0, 0],
+        [0, 0, 0],
+        [0, 0, 0],
+    ]
+    robots = [
+        RobotState(id=1, pos=(0, 0), state="Loaded"),
+        RobotState(id=2, pos=(2, 2), state="Empty"),
+    ]
+    T, paths = plan_round(grid, robots, [(0, 2)], [(2, 0)], {(2, 0): 1}, T_max=6, method="auto")
+    assert T == 2
+    assert validate_paths(paths, grid)
@@ -1,8 +1,10 @@
 import os
 import sys
+import time
 
 sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src", "py")))
 
+import planner
 from data_types import RobotState
 from planner import search_min_T_sync
 
@@ -61,3 +63,104 @@ def test_parallel_search_infeasible():
     assert T is None
     assert tau is None
     assert paths == {}
+
+
+def test_feasible_tau_cancels_later_probes(monkeypatch):
+    grid, robots, pickups, drops, drop_caps = _basic_sync_instance()
+    plan_flow_sync = planner.flow_planner_cpp.plan_flow_sync
+    cancelled_taus = []
+
+    def dominated_probes_block(grid_, starts, pickups_, drops_, caps, T, tau, *args, **kwargs):
+        if T < 4:
+            result = dict(plan_flow_sync(grid_, starts, pickups_, drops_, caps, T, tau, *args, **kwargs))
+            result.update(feasible=False, paths=[])
+            return result
+        token = kwargs.get("cancel_token")
+        if tau > 1:
+            # Only a cancel from the feasible tau=1 probe releases these.
+            waited = 0.0
+            while not token.cancelled and waited < 5.0:
+                time.sleep(0.01)
+                waited += 0.01
+            if token.cancelled:
+                cancelled_taus.append(tau)
+        return plan_flow_sync(grid_, starts, pickups_, drops_, caps, T, tau, *args, **kwargs)
+
+    monkeypatch.setattr(planner.flow_planner_cpp, "plan_flow_sync", dominated_probes_block)
+    T, tau, paths = search_min_T_sync(
+        grid, robots, pickups, drops, drop_caps, T_max=6, parallel_workers=4, parallel_T_workers=1
+    )
+    assert (T, tau) == (4, 1)
+    assert set(cancelled_taus) == {2, 3}
+    assert set(paths) == {1, 2}
+
+
+def test_parallel_T_probes_T_max_after_overshoot(monkeypatch):
+    grid, robots, pickups, drops, drop_caps = _basic_sync_instance()
+    plan_flow_sync = planner.flow_planner_cpp.plan_flow_sync
+
+    def feasible_from_5(grid_, starts, pickups_, drops_, caps, T, tau, *args, **kwargs):
+        result = dict(plan_flow_sync(grid_, starts, pickups_, drops_, caps, T, tau, *args, **kwargs))
+        if T < 5:
+            result.update(feasible=False, paths=[])
+        return result
+
+    monkeypatch.setattr(planner.flow_planner_cpp, "plan_flow_sync", feasible_from_5)
+    # Doubling from T=2 with two T workers probes 2 and 4, then must clamp 8 to T_max.
+    for workers, t_workers in ((1, 1), (4, 2)):
+        T, tau, _ = search_min_T_sync(
+            grid, robots, pickups, drops, drop_caps, T_max=6,
+            parallel_workers=workers, parallel_T_workers=t_workers,
+        )
+        assert (T, tau) == (5, 1)
+
+
+def test_parallel_T_doubling_does_not_skip_a_step(monkeypatch):
+    grid, robots, pickups, drops, drop_caps = _basic_sync_instance()
+    plan_flow_sync = planner.flow_planner_cpp.plan_flow_sync
+    probed = set()
+
+    def feasible_from_5(grid_, starts, pickups_, drops_, caps, T, tau, *args, **kwargs):
+        probed.add(T)
+        result = dict(plan_flow_sync(grid_, starts, pickups_, drops_, caps, T, tau, *args, **kwargs))
+        if T < 5:
+            result.update(feasible=False, paths=[])
+        return result
+
+    monkeypatch.setattr(planner.flow_planner_cpp, "plan_flow_sync", feasible_from_5)
+    # Batches of two from T=2 are {2, 4} then {8, 16}; 32 is never needed.
+    T, tau, _ = search_min_T_sync(
+        grid, robots, pickups, drops, drop_caps, T_max=40, parallel_workers=4, parallel_T_workers=2
+    )
+    assert (T, tau) == (5, 1)
+    assert 8 in probed
+    assert 32 not in probed
+
+
+def test_flow_policy_accepts_smallest_feasible_tau(monkeypatch):
+    grid, robots, pickups, drops, drop_caps = _basic_sync_instance()
+    plan_flow_sync = planner.flow_planner_cpp.plan_flow_sync
+    order = []
+
+    def larger_tau_routes_more(grid_, starts, pickups_, drops_, caps, T, tau, *args, **kwargs):
+        order.append((T, tau))
+        result = dict(plan_flow_sync(grid_, starts, pickups_, drops_, caps, T, tau, *args, **kwargs))
+        if T < 5:
+            # Guides the flow policy towards large taus at the next T.
+            result.update(feasible=False, paths=[], flow=tau)
+        return result
+
+    monkeypatch.setattr(planner.flow_planner_cpp, "plan_flow_sync", larger_tau_routes_more)
+    expected = search_min_T_sync(grid, robots, pickups, drops, drop_caps, T_max=12)[:2]
+    assert expected == (5, 1)
+    for workers, t_workers in ((1, 1), (4, 1), (4, 2)):
+        order.clear()
+        T, tau, _ = search_min_T_sync(
+            grid, robots, pickups, drops, drop_caps, T_max=12,
+            parallel_workers=workers, parallel_T_workers=t_workers, t_policy="flow",
+        )
+        assert (T, tau) == expected
+    order.clear()
+    search_min_T_sync(grid, robots, pickups, drops, drop_caps, T_max=12, t_policy="flow")
+    # The guided order still tries a larger tau first at the deciding T.
+    assert [tau for T, tau in order if T == 5][0] > 1
@@ -0,0 +1,82 @@
+import json
+import os
+import sys
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src", "py")))
+
+import simulator_full_sync
+from collision_check import validate_collision_free
+from planner import clear_caches
+
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
+MAP = os.path.join(ROOT, "maps", "test.json")
+
+
+def _load(path):
+    return json.loads(open(path).read())
+
+
+def test_pipelined_rounds_use_speculative_plans(tmp_path):
+    out = str(tmp_path / "sim.json")
+    simulator_full_sync.run_simulation(MAP, 3, 100, out, seed=1, pipeline=True)
+    data = _load(out)
+    pipeline = data["pipeline"]
+    assert pipeline["speculative"] > 0
+    assert pipeline["hits"] + pipeline["misses"] == pipeline["speculative"]
+    assert pipeline["hits"] > 0
+    assert pipeline["exposed_s"] <= pipeline["plan_time_s"] + 1e-9
+    trajectories = {int(rid): [tuple(p) for p in a["trajectory"]] for rid, a in data["agents"].items()}
+    validate_collision_free(trajectories)
+    for task in data["tasks"]:
+        if task["picked_time"] is not None:
+            traj = trajectories[task["picked_by"]]
+            assert traj[task["picked_time"]] == tuple(task["pos"])
+
+
+def test_step_time_bounds_exposed_latency(tmp_path):
+    out = str(tmp_path / "sim.json")
+    # Rounds that take hours hide every speculative plan completely.
+    simulator_full_sync.run_simulation(MAP, 3, 60, out, seed=1, pipeline=True, step_s=3600.0)
+    pipeline = _load(out)["pipeline"]
+    assert pipeline["hits"] > 0
+    assert pipeline["exposed_s"] < pipeline["plan_time_s"]
+
+
+def test_pipeline_off_by_default(tmp_path):
+    out = str(tmp_path / "sim.json")
+    simulator_full_sync.run_simulation(MAP, 3, 30, out, seed=1)
+    assert _load(out)["pipeline"] is None
+
+
+def test_resume_keeps_pending_speculation(tmp_path, preempt_sync_after):
+    clear_caches()
+    simulator_full_sync.run_simulation(MAP, 3, 100, str(tmp_path / "ref.json"), seed=1, pipeline=True)
+    reference = _load(tmp_path / "ref.json")
+
+    ckpt = str(tmp_path / "sim.ckpt")
+    out = str(tmp_path / "out.json")
+    clear_caches()
+    with preempt_sync_after(6):
+        simulator_full_sync.run_simulation(
+            MAP, 3, 100, out, seed=1, pipeline=True, checkpoint=ckpt, checkpoint_every=20
+        )
+    simulator_full_sync.run_simulation(
+        MAP, 3, 100, out, seed=1, pipeline=True, checkpoint=ckpt, checkpoint_every=20, resume=True
+    )
+    resumed = _load(out)
+    assert resumed["agents"] == reference["agents"]
+    assert resumed["tasks"] == reference["tasks"]
+    for key in ("speculative", "hits", "misses"):
+        assert resumed["pipeline"][key] == reference["pipeline"][key]
+
+
+def test_pipeline_does_not_change_the_run(tmp_path):
+    plain = str(tmp_path / "plain.json")
+    piped = str(tmp_path / "piped.json")
+    simulator_full_sync.run_simulation(MAP, 3, 100, plain, seed=1)
+    simulator_full_sync.run_simulation(MAP, 3, 100, piped, seed=1, pipeline=True)
+    expected, actual = _load(plain), _load(piped)
+    # Next-round tasks are spawned before speculating, so no arrival is missed.
+    assert actual["pipeline"]["hits"] > 0
+    assert actual["agents"] == expected["agents"]
+    assert actual["tasks"] == expected["tasks"]
@@ -66,6 +66,7 @@ def test_sync_two_stage_infeasible_when_pickups_too_few():
     drops = [(0, 0), (1, 0)]
     result = flow_planner_cpp.plan_flow_sync(grid, starts, pickups, drops, [1, 1], 2, 1)
     assert result["feasible"] is False
+    assert result["flow"] == 1
 
 
 def test_sync_tau_too_small_infeasible():
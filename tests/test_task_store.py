@@ -0,0 +1,76 @@
+import json
+import os
+import random
+import sys
+
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src", "py")))
+
+from task_store import TaskStore
+
+SHELVES = [(0, 0), (1, 0), (2, 0), (3, 0)]
+
+
+def test_lifecycle_updates_indexes():
+    store = TaskStore(SHELVES)
+    task = store.spawn((1, 0), 0)
+    assert task["id"] == 1
+    assert store.open_at((1, 0)) is task
+    assert store.free_cells() == 3
+    store.pick(task["id"], 4, robot_id=7)
+    assert store.open_at((1, 0)) is None
+    assert store.free_cells() == 4
+    assert store.counts() == {"open": 0, "carried": 1, "delivered": 0}
+    store.deliver(task["id"], 9, robot_id=7)
+    assert store.counts() == {"open": 0, "carried": 0, "delivered": 1}
+    assert store.get(1)["delivered_time"] == 9
+    with pytest.raises(ValueError):
+        store.deliver(task["id"], 10, robot_id=7)
+
+
+def test_open_at_respects_spawn_time():
+    store = TaskStore(SHELVES)
+    store.spawn((2, 0), 5)
+    assert store.open_at((2, 0), 4) is None
+    assert store.open_at((2, 0), 5) is not None
+    assert store.open_tasks(4) == []
+
+
+def test_ensure_open_uses_distinct_free_cells():
+    random.seed(0)
+    store = TaskStore(SHELVES)
+    store.ensure_open(3, 0)
+    positions = [t["pos"] for t in store.open_tasks()]
+    assert len(set(positions)) == 3
+    assert store.free_cells() == 1
+    store.ensure_open(3, 1)
+    assert len(store.open_tasks()) == 3
+    with pytest.raises(RuntimeError):
+        store.spawn_random(2, 1)
+
+
+def test_open_tasks_in_id_order():
+    store = TaskStore(SHELVES)
+    for pos in [(3, 0), (0, 0), (2, 0)]:
+        store.spawn(pos, 0)
+    store.pick(2, 1, robot_id=1)
+    assert [t["id"] for t in store.open_tasks()] == [1, 3]
+
+
+def test_archive_moves_delivered_tasks_to_disk(tmp_path):
+    archive = tmp_path / "tasks.jsonl"
+    store = TaskStore(SHELVES, archive_path=str(archive))
+    for pos in SHELVES[:3]:
+        store.spawn(pos, 0)
+    store.pick(1, 2, robot_id=1)
+    store.deliver(1, 5, robot_id=1)
+    assert store.get(1) is None
+    assert len(store) == 3
+    assert store.counts()["delivered"] == 1
+    tasks = store.all_tasks()
+    assert [t["id"] for t in tasks] == [1, 2, 3]
+    assert tasks[0]["pos"] == (0, 0) and tasks[0]["delivered_by"] == 1
+    store.close()
+    lines = archive.read_text().splitlines()
+    assert [json.loads(line)["id"] for line in lines] == [1]
@@ -0,0 +1,58 @@
+import os
+import sys
+
+import pytest
+
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "src", "py")))
+
+import trajectory_buffer
+from trajectory_buffer import TrajectoryBuffer
+
+
+@pytest.fixture(params=["numpy", "fallback"])
+def backend(request, monkeypatch):
+    if request.param == "numpy":
+        if trajectory_buffer.np is None:
+            pytest.skip("numpy not installed")
+    else:
+        monkeypatch.setattr(trajectory_buffer, "np", None)
+    return request.param
+
+
+def test_append_grows_past_capacity(backend):
+    buf = TrajectoryBuffer([3, 7], [(0, 0), (5, 1)], capacity=2)
+    for t in range(1, 6):
+        buf.append([[(t, 0)], [(5, 1)]])
+    buf.append([[(6, 0), (6, 1)], [(4, 1), (4, 1)]])
+    assert len(buf) == 8 and buf.steps == 7
+    assert buf.position(3, 5) == (5, 0)
+    assert buf.position(7, -1) == (4, 1)
+    assert buf.last() == [(6, 1), (4, 1)]
+    assert buf.trajectory(3)[:3] == [(0, 0), (1, 0), (2, 0)]
+
+
+def test_tail_and_idle_steps(backend):
+    buf = TrajectoryBuffer([1, 2], [(0, 0), (2, 2)])
+    buf.append([[(1, 0), (1, 0), (1, 1)], [(2, 2), (2, 2), (2, 1)]])
+    tail = buf.tail(2)
+    assert [[tuple(map(int, p)) for p in seg] for seg in tail] == [[(1, 0), (1, 1)], [(2, 2), (2, 1)]]
+    assert buf.idle_steps(3) == 3
+    assert buf.idle_steps(1) == 0
+    assert buf.idle_steps(10) == 3
+
+
+def test_to_dict_matches_list_trajectories(backend):
+    buf = TrajectoryBuffer([1, 2], [(0, 0), (1, 1)])
+    buf.append([[(0, 1)], [(1, 0)]])
+    assert buf.to_dict() == {1: [[0, 0], [0, 1]], 2: [[1, 1], [1, 0]]}
+
+
+def test_array_segments_and_view():
+    np = pytest.importorskip("numpy")
+    buf = TrajectoryBuffer([1, 2], [(0, 0), (1, 0)], capacity=2)
+    seg = np.array([[[0, 1], [0, 2], [0, 3]], [[1, 1], [1, 2], [1, 3]]])
+    buf.append(seg)
+    assert buf.view().shape == (2, 4, 2)
+    assert buf.view().dtype == np.int16
+    assert np.shares_memory(buf.tail(2), buf.view())
+    assert buf.nbytes == 2 * 4 * 2 * 2